@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Backfill a deployment over a date range or a list of partitions
+
+The range is split into chunks, one flow run each. A date chunk passes its
+first and last day (ISO dates, inclusive) as --start-param/--end-param. A
+partition chunk passes its partitions as --partition-param: a single value
+when --chunk-size is 1, otherwise a list. At most --max-in-flight runs are
+queued or running at once. The default is the pool's concurrency limit, else
+its number of online workers.
+
+Progress is checkpointed to ~/.prefect/backfills/<id>.json after every change.
+The id is derived from the deployment and the chunks, so re-running the same
+command resumes: finished chunks are skipped, and runs still in flight are
+waited for instead of submitted twice. Chunks whose parameters already have a
+COMPLETED run of the deployment (from any earlier run) are skipped too.
+
+    python backfill.py my-flow/my-deployment --start 2024-01-01 --end 2024-06-30 --chunk-days 7
+    python backfill.py my-flow/my-deployment --partitions eu us apac --partition-param region
+    python backfill.py ... --param full_refresh=true --max-in-flight 2 --dry-run
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from prefect_pagination import collect, deployments_named, iter_flow_runs, iter_workers
+
+BACKFILL_DIR_ENV = "GELLC_BACKFILL_DIR"
+DEFAULT_BACKFILL_DIR = Path.home() / ".prefect" / "backfills"
+DEFAULT_POLL_SECONDS = 5.0
+
+
+def canonical(parameters: dict) -> str:
+    return json.dumps(parameters, sort_keys=True, default=str)
+
+
+def date_chunks(start: date, end: date, days: int) -> List[tuple]:
+    """Consecutive (first, last) day ranges covering start..end inclusive"""
+    chunks, first = [], start
+    while first <= end:
+        last = min(first + timedelta(days=days - 1), end)
+        chunks.append((first, last))
+        first = last + timedelta(days=1)
+    return chunks
+
+
+def build_chunks(args) -> Dict[str, dict]:
+    """{chunk key: chunk parameters}, in submission order"""
+    base = {}
+    for item in args.param:
+        key, _, value = item.partition("=")
+        try:
+            base[key] = json.loads(value)
+        except json.JSONDecodeError:
+            base[key] = value
+    chunks = {}
+    if args.partitions:
+        for i in range(0, len(args.partitions), args.chunk_size):
+            group = args.partitions[i:i + args.chunk_size]
+            chunks[",".join(group)] = {**base, args.partition_param: group[0] if args.chunk_size == 1 else group}
+    else:
+        for first, last in date_chunks(args.start, args.end, args.chunk_days):
+            chunks[f"{first}..{last}"] = {**base, args.start_param: first.isoformat(), args.end_param: last.isoformat()}
+    return chunks
+
+
+def backfill_id(deployment: str, chunks: Dict[str, dict]) -> str:
+    digest = hashlib.sha256(canonical({"deployment": deployment, "chunks": chunks}).encode()).hexdigest()
+    return digest[:12]
+
+
+class Checkpoint:
+    """Chunk progress in a JSON file, replaced atomically so an interruption never leaves it half-written"""
+
+    def __init__(self, path: Path, deployment: str, chunks: Dict[str, dict]):
+        self.path = path
+        state = json.loads(path.read_text()) if path.exists() else {}
+        self.chunks = state.get("chunks", {})
+        for key, parameters in chunks.items():
+            self.chunks.setdefault(key, {"parameters": parameters, "status": "pending", "attempt": 0, "flow_run_id": None})
+        self.deployment = deployment
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"deployment": self.deployment, "chunks": self.chunks}, indent=2))
+        os.replace(tmp, self.path)
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for chunk in self.chunks.values():
+            counts[chunk["status"]] = counts.get(chunk["status"], 0) + 1
+        return counts
+
+
+async def pool_capacity(client, pool_name: Optional[str]) -> int:
+    """The pool's concurrency limit, else its online workers, and at least 1"""
+    if not pool_name:
+        return 1
+    pool = await client.read_work_pool(pool_name)
+    if pool.concurrency_limit:
+        return pool.concurrency_limit
+    workers = await collect(iter_workers(client, pool_name))
+    online = [w for w in workers if str(getattr(w.status, "value", w.status)).upper() == "ONLINE"]
+    return max(1, len(online))
+
+
+async def completed_parameters(client, deployment_id) -> Set[str]:
+    """Canonical parameters of every COMPLETED run of the deployment"""
+    from prefect.client.schemas.filters import (
+        DeploymentFilter,
+        DeploymentFilterId,
+        FlowRunFilter,
+        FlowRunFilterState,
+        FlowRunFilterStateType,
+    )
+
+    runs = iter_flow_runs(
+        client,
+        deployment_filter=DeploymentFilter(id=DeploymentFilterId(any_=[deployment_id])),
+        flow_run_filter=FlowRunFilter(state=FlowRunFilterState(type=FlowRunFilterStateType(any_=["COMPLETED"]))),
+    )
+    return {canonical(run.parameters) async for run in runs}
+
+
+async def read_states(client, flow_run_ids: List[str]) -> Dict[str, str]:
+    from prefect.client.schemas.filters import FlowRunFilter, FlowRunFilterId
+
+    runs = await collect(iter_flow_runs(client, flow_run_filter=FlowRunFilter(id=FlowRunFilterId(any_=flow_run_ids))))
+    return {str(run.id): run.state.type.value for run in runs if run.state}
+
+
+async def run_backfill(args, chunks: Dict[str, dict]) -> int:
+    from prefect import get_client
+
+    async with get_client() as client:
+        if "/" in args.deployment:
+            deployment = await client.read_deployment_by_name(args.deployment)
+        else:
+            found = await deployments_named(client, args.deployment)
+            if len(found) != 1:
+                print(f"❌ {len(found)} deployments are called {args.deployment}; use flow/deployment")
+                return 1
+            deployment = found[0]
+
+        run_id = backfill_id(str(deployment.id), chunks)
+        checkpoint = Checkpoint(Path(args.checkpoint_dir) / f"{run_id}.json", args.deployment, chunks)
+        window, already_done = await asyncio.gather(
+            pool_capacity(client, deployment.work_pool_name), completed_parameters(client, deployment.id)
+        )
+        window = args.max_in_flight or window
+        print(f"🔁 Backfill {run_id}: {len(chunks)} chunks of {args.deployment}, "
+              f"at most {window} in flight (checkpoint {checkpoint.path})")
+
+        for chunk in checkpoint.chunks.values():
+            expected = {**(deployment.parameters or {}), **chunk["parameters"]}
+            if chunk["status"] in ("pending", "failed") and canonical(expected) in already_done:
+                chunk["status"] = "skipped"
+        print(f"⏭️  {checkpoint.counts().get('skipped', 0)} chunks already have a COMPLETED run with the same parameters")
+
+        queue = [key for key, chunk in checkpoint.chunks.items() if chunk["status"] in ("pending", "failed")]
+        in_flight = [key for key, chunk in checkpoint.chunks.items() if chunk["status"] == "submitted"]
+        if args.dry_run:
+            for key in queue:
+                print(f"   would submit {key}: {canonical(checkpoint.chunks[key]['parameters'])}")
+            return 0
+        checkpoint.save()
+
+        started = time.monotonic()
+        tries: Dict[str, int] = {}
+        while queue or in_flight:
+            if in_flight:
+                states = await read_states(client, [checkpoint.chunks[key]["flow_run_id"] for key in in_flight])
+                for key in list(in_flight):
+                    chunk = checkpoint.chunks[key]
+                    state = states.get(chunk["flow_run_id"])
+                    if state == "COMPLETED":
+                        chunk["status"] = "completed"
+                    elif state in ("FAILED", "CRASHED", "CANCELLED") or state is None:
+                        chunk.update(status="failed", last_state=state or "DELETED")
+                        if tries.get(key, 0) <= args.retries:
+                            queue.append(key)
+                    else:
+                        continue
+                    in_flight.remove(key)
+
+            while queue and len(in_flight) < window:
+                key = queue.pop(0)
+                chunk = checkpoint.chunks[key]
+                tries[key] = tries.get(key, 0) + 1
+                # attempt is only saved with the submitted run: after an interruption between the two, the
+                # resumed attempt reuses the idempotency key and gets the run that was already created
+                chunk["attempt"] += 1
+                flow_run = await client.create_flow_run_from_deployment(
+                    deployment.id,
+                    parameters=chunk["parameters"],
+                    tags=["backfill", f"backfill:{run_id}"],
+                    idempotency_key=f"backfill:{run_id}:{key}:{chunk['attempt']}",
+                )
+                chunk.update(status="submitted", flow_run_id=str(flow_run.id))
+                in_flight.append(key)
+            checkpoint.save()
+
+            counts = checkpoint.counts()
+            print(f"⏳ [{time.monotonic() - started:5.0f}s] {counts.get('completed', 0)} completed, "
+                  f"{counts.get('skipped', 0)} skipped, {len(in_flight)} in flight, {len(queue)} queued, "
+                  f"{counts.get('failed', 0)} failed")
+            if queue or in_flight:
+                await asyncio.sleep(args.poll_seconds)
+
+    counts = checkpoint.counts()
+    failed = [key for key, chunk in checkpoint.chunks.items() if chunk["status"] == "failed"]
+    for key in failed[:10]:
+        print(f"❌ {key}: {checkpoint.chunks[key].get('last_state')} (run {checkpoint.chunks[key]['flow_run_id']})")
+    print(f"✅ Backfill {run_id}: {counts.get('completed', 0)} completed, {counts.get('skipped', 0)} skipped, "
+          f"{len(failed)} failed" + ("; re-run the same command to retry them" if failed else ""))
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill a deployment over dates or partitions")
+    parser.add_argument("deployment", help="flow/deployment, or a deployment name that is unique")
+    dates = parser.add_argument_group("dates")
+    dates.add_argument("--start", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    dates.add_argument("--end", type=date.fromisoformat, help="Last day, inclusive")
+    dates.add_argument("--chunk-days", type=int, default=1, help="Days per run")
+    dates.add_argument("--start-param", default="start_date", help="Parameter for a chunk's first day")
+    dates.add_argument("--end-param", default="end_date", help="Parameter for a chunk's last day")
+    partitions = parser.add_argument_group("partitions")
+    partitions.add_argument("--partitions", nargs="+", help="Partition values, in submission order")
+    partitions.add_argument("--chunk-size", type=int, default=1, help="Partitions per run")
+    partitions.add_argument("--partition-param", default="partition", help="Parameter for a chunk's partitions")
+    parser.add_argument("--param", nargs="+", default=[], metavar="KEY=VALUE", help="Extra parameters (JSON values)")
+    parser.add_argument("--max-in-flight", type=int, help="Default: the pool's concurrency limit or online workers")
+    parser.add_argument("--retries", type=int, default=0, help="Resubmit a failed chunk this many times")
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    parser.add_argument("--checkpoint-dir", default=os.environ.get(BACKFILL_DIR_ENV, str(DEFAULT_BACKFILL_DIR)))
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be submitted")
+    args = parser.parse_args()
+
+    if bool(args.partitions) == bool(args.start or args.end):
+        parser.error("give either --start/--end or --partitions")
+    if not args.partitions and not (args.start and args.end):
+        parser.error("--start and --end go together")
+    if args.start and args.end and args.start > args.end:
+        parser.error("--start is after --end")
+    raise SystemExit(asyncio.run(run_backfill(args, build_chunks(args))))
+
+
+if __name__ == "__main__":
+    main()
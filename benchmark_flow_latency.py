@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+End-to-end flow-run latency benchmark across code storage backends
+
+Triggers runs of a trivial flow through a process worker with the code coming
+from each storage backend we have used for deployments:
+
+- local:  the repo checkout, via set_working_directory
+- s3:     prefect_aws pull_from_s3, against a moto S3 server (s3_deployment*.py, prefect-deploy.yaml)
+- git:    git_clone from a local bare remote (github_deployment*.py)
+- git-mirror: the same remote through git_mirror_pull.py's cached mirror
+- image:  code copied into a directory ahead of time, as in the baked image from
+          create_image_deployment.py (no pull; container start is not measured)
+
+Every run is broken down into phases that add up to the total:
+
+    scheduling  trigger -> run scheduled and due
+    pickup      due -> flow-run process started (worker poll, claim, process start)
+    pull        pull steps
+    import      end of pull -> flow body starts (entrypoint import, Running transition)
+    execution   flow body -> Completed
+
+Phase boundaries inside the flow-run process are recorded by mark_phase pull
+steps and by the flow itself. Everything runs locally: a temporary Prefect
+server (unless --api-url is given), a moto S3 server and a file:// git remote.
+
+Against a real API the runs go to a separate pool (--pool, created when missing)
+so production workers never pick them up, and the latency-* deployments, plus
+the pool when the benchmark created it, are deleted afterwards.
+
+    pip install "moto[server]" prefect-aws
+    python benchmark_flow_latency.py --runs 20 --backends local s3 git git-mirror image
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from prefect import flow
+
+from prefect_test_support import ensure_work_pool, prefect_cli, start_moto_server, start_prefect_server
+
+WORK_POOL = "gellc-latency-benchmark"
+FLOW_FILE = Path(__file__).name
+ENTRYPOINT = f"{FLOW_FILE}:latency_probe_flow"
+S3_BUCKET = "gellc-prefect-flows"
+S3_FOLDER = "latency-benchmark"
+MARKS_DIR_ENV = "GELLC_LATENCY_MARKS_DIR"
+BACKENDS = ["local", "s3", "git", "git-mirror", "image"]
+PHASES = ["scheduling", "pickup", "pull", "import", "execution"]
+PERCENTILES = [50, 95, 99]
+
+
+def mark_phase(phase: str) -> dict:
+    """Pull step (and flow helper) recording when the flow-run process reached `phase`"""
+    marks_dir = os.environ.get(MARKS_DIR_ENV)
+    flow_run_id = os.environ.get("PREFECT__FLOW_RUN_ID")
+    if marks_dir and flow_run_id:
+        with open(Path(marks_dir) / f"{flow_run_id}.jsonl", "a") as f:
+            f.write(json.dumps({"phase": phase, "ts": time.time()}) + "\n")
+    return {}
+
+
+@flow(name="latency-probe")
+def latency_probe_flow(sleep_seconds: float = 0.0):
+    """Trivial flow: the benchmark only measures what happens around it"""
+    mark_phase("flow_start")
+    if sleep_seconds:
+        time.sleep(sleep_seconds)
+    return "ok"
+
+
+def prepare_s3(endpoint_url: str) -> List[dict]:
+    import boto3
+
+    s3 = boto3.client("s3", endpoint_url=endpoint_url, region_name="us-east-1")
+    s3.create_bucket(Bucket=S3_BUCKET)
+    s3.upload_file(__file__, S3_BUCKET, f"{S3_FOLDER}/{FLOW_FILE}")
+    return [
+        {
+            "prefect_aws.deployments.steps.pull_from_s3": {
+                "bucket": S3_BUCKET,
+                "folder": S3_FOLDER,
+                "client_parameters": {"endpoint_url": endpoint_url},
+            }
+        }
+    ]
+
+
+def make_git_remote(workdir: Path) -> Path:
+    """A file:// remote holding the probe flow, created once per benchmark"""
+    remote = workdir / "git-remote" / "flows.git"
+    if remote.exists():
+        return remote
+    checkout = workdir / "git-checkout"
+    subprocess.run(["git", "init", "--bare", "-q", str(remote)], check=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(checkout)], check=True)
+    shutil.copy(__file__, checkout / FLOW_FILE)
+    git = ["git", "-C", str(checkout), "-c", "user.name=benchmark", "-c", "user.email=benchmark@localhost"]
+    subprocess.run(git + ["add", FLOW_FILE], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "Latency probe flow"], check=True)
+    subprocess.run(git + ["push", "-q", str(remote), "main"], check=True)
+    return remote
+
+
+def prepare_git(workdir: Path) -> List[dict]:
+    remote = make_git_remote(workdir)
+    # The engine changes into the directory git_clone returns
+    return [{"prefect.deployments.steps.git_clone": {"repository": f"file://{remote}", "branch": "main"}}]
+
+
+def prepare_git_mirror(workdir: Path) -> List[dict]:
+    remote = make_git_remote(workdir)
+    return [
+        {
+            "git_mirror_pull.pull_from_git_mirror": {
+                "repository": f"file://{remote}",
+                "branch": "main",
+                "entrypoint": ENTRYPOINT,
+                "cache_dir": str(workdir / "git-mirrors"),
+            }
+        }
+    ]
+
+
+def prepare_image(workdir: Path) -> List[dict]:
+    baked = workdir / "image" / "opt" / "prefect" / "flows"
+    baked.mkdir(parents=True)
+    shutil.copy(__file__, baked / FLOW_FILE)
+    return [{"prefect.deployments.steps.set_working_directory": {"directory": str(baked)}}]
+
+
+def prepare_local() -> List[dict]:
+    return [{"prefect.deployments.steps.set_working_directory": {"directory": str(Path(__file__).resolve().parent)}}]
+
+
+def timed_pull_steps(steps: List[dict]) -> List[dict]:
+    """Bracket a backend's pull steps with phase marks"""
+    mark = f"{Path(__file__).stem}.mark_phase"
+    return [{mark: {"phase": "pull_start"}}, *steps, {mark: {"phase": "pull_end"}}]
+
+
+def start_worker(
+    api_url: str,
+    home: Path,
+    log_path: Path,
+    query_seconds: float,
+    env: Optional[Dict[str, str]] = None,
+    limit: Optional[int] = None,
+    pool: str = WORK_POOL,
+) -> subprocess.Popen:
+    """Start a process worker on `pool` against `api_url`"""
+    worker_env = {
+        **os.environ,
+        **(env or {}),
+        "PREFECT_API_URL": api_url,
+        "PREFECT_HOME": str(home),
+        "PREFECT_WORKER_QUERY_SECONDS": str(query_seconds),
+        "PREFECT_WORKER_PREFETCH_SECONDS": "0",
+        # The flow-run process imports mark_phase for the pull steps from here
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent), os.environ.get("PYTHONPATH")])),
+    }
+    command = prefect_cli() + ["worker", "start", "--pool", pool, "--type", "process"]
+    if limit:
+        command += ["--limit", str(limit)]
+    return subprocess.Popen(command, env=worker_env, stdout=open(log_path, "w"), stderr=subprocess.STDOUT)
+
+
+def read_marks(marks_dir: Path, flow_run_id) -> Dict[str, float]:
+    path = marks_dir / f"{flow_run_id}.jsonl"
+    if not path.exists():
+        return {}
+    marks = {}
+    for line in path.read_text().splitlines():
+        mark = json.loads(line)
+        marks.setdefault(mark["phase"], mark["ts"])
+    return marks
+
+
+def phase_breakdown(triggered: float, flow_run, states, marks: Dict[str, float]) -> Optional[Dict[str, float]]:
+    """Split trigger -> Completed into PHASES, or None if a boundary is missing"""
+    timestamps = {state.type.value: state.timestamp.timestamp() for state in states}
+    due = max(flow_run.expected_start_time.timestamp(), timestamps.get("SCHEDULED", triggered))
+    completed = timestamps.get("COMPLETED")
+    if completed is None or not {"pull_start", "pull_end", "flow_start"} <= set(marks):
+        return None
+    boundaries = [triggered, due, marks["pull_start"], marks["pull_end"], marks["flow_start"], completed]
+    phases = {phase: round(end - start, 4) for phase, start, end in zip(PHASES, boundaries, boundaries[1:])}
+    phases["total"] = round(completed - triggered, 4)
+    return phases
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0-100)"""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(runs: List[dict]) -> List[dict]:
+    rows = []
+    for backend in dict.fromkeys(run["backend"] for run in runs):
+        backend_runs = [run for run in runs if run["backend"] == backend]
+        for phase in PHASES + ["total"]:
+            values = [run[phase] for run in backend_runs]
+            rows.append({
+                "backend": backend,
+                "phase": phase,
+                "runs": len(values),
+                **{f"p{q}": round(percentile(values, q), 3) for q in PERCENTILES},
+            })
+    return rows
+
+
+async def prepare_work_pool(pool: str) -> bool:
+    """ensure_work_pool with its own client, for use before the workers start"""
+    from prefect.client.orchestration import get_client
+
+    async with get_client() as client:
+        return await ensure_work_pool(client, pool)
+
+
+async def delete_work_pool(pool: str):
+    """Delete a pool the benchmark created; call it once its workers have stopped"""
+    from prefect.client.orchestration import get_client
+    from prefect.exceptions import ObjectNotFound
+
+    async with get_client() as client:
+        try:
+            await client.delete_work_pool(pool)
+            print(f"🧹 Deleted work pool {pool}")
+        except ObjectNotFound:
+            pass
+
+
+async def run_benchmark(
+    pull_steps: Dict[str, List[dict]], runs: int, marks_dir: Path, timeout: float, pool: str = WORK_POOL
+) -> List[dict]:
+    from prefect.client.orchestration import get_client
+    from prefect.exceptions import ObjectNotFound
+
+    async with get_client() as client:
+        deployments = {}
+        try:
+            flow_id = await client.create_flow(latency_probe_flow)
+            for backend, steps in pull_steps.items():
+                deployments[backend] = await client.create_deployment(
+                    flow_id=flow_id,
+                    name=f"latency-{backend}",
+                    work_pool_name=pool,
+                    entrypoint=ENTRYPOINT,
+                    pull_steps=timed_pull_steps(steps),
+                    tags=["benchmark", "latency", backend],
+                )
+            return await measure_runs(client, deployments, runs, marks_dir, timeout)
+        finally:
+            for deployment_id in deployments.values():
+                try:
+                    await client.delete_deployment(deployment_id)
+                except ObjectNotFound:
+                    pass
+            print(f"🧹 Deleted {len(deployments)} latency-* deployments")
+
+
+async def measure_runs(client, deployments: Dict[str, object], runs: int, marks_dir: Path, timeout: float) -> List[dict]:
+    """Trigger `runs` runs per deployment and return their phase breakdowns"""
+    results = []
+    # Round-robin across backends so drift on the machine affects them equally
+    for i in range(runs):
+        for backend, deployment_id in deployments.items():
+            triggered = time.time()
+            flow_run = await client.create_flow_run_from_deployment(deployment_id)
+            deadline = time.monotonic() + timeout
+            while True:
+                flow_run = await client.read_flow_run(flow_run.id)
+                if flow_run.state and flow_run.state.is_final():
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{backend} run {flow_run.id} did not finish within {timeout:.0f}s")
+                await asyncio.sleep(0.1)
+
+            states = await client.read_flow_run_states(flow_run.id)
+            phases = phase_breakdown(triggered, flow_run, states, read_marks(marks_dir, flow_run.id))
+            if not flow_run.state.is_completed() or phases is None:
+                print(f"❌ {backend} run {i + 1}: {flow_run.state.type.value} {flow_run.state.message or ''}")
+                continue
+            results.append({"backend": backend, "run": i + 1, "flow_run_id": str(flow_run.id), **phases})
+            print(f"⏱️  {backend:<10} run {i + 1:>3}: {phases['total']:.2f}s "
+                  + " ".join(f"{phase}={phases[phase]:.2f}" for phase in PHASES))
+    return results
+
+
+def write_results(output_dir: Path, runs: List[dict], summary: List[dict]):
+    with open(output_dir / "latency_runs.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["backend", "run", "flow_run_id", *PHASES, "total"])
+        writer.writeheader()
+        writer.writerows(runs)
+    with open(output_dir / "latency_summary.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["backend", "phase", "runs", *[f"p{q}" for q in PERCENTILES]])
+        writer.writeheader()
+        writer.writerows(summary)
+
+
+def print_summary(summary: List[dict]):
+    print(f"\n{'backend':<10} {'phase':<11} " + " ".join(f"{f'p{q}':>8}" for q in PERCENTILES))
+    for row in summary:
+        print(f"{row['backend']:<10} {row['phase']:<11} " + " ".join(f"{row[f'p{q}']:>8.3f}" for q in PERCENTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20, help="Runs per backend")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--api-url", help="Use this Prefect API instead of starting a temporary server")
+    parser.add_argument("--pool", default=WORK_POOL, help="Process pool for the benchmark runs, created when missing")
+    parser.add_argument("--query-seconds", type=float, default=2.0, help="Worker polling interval")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for each run")
+    parser.add_argument("--output-dir", default="latency-benchmark", help="Where the CSV results go")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="latency-benchmark-"))
+    marks_dir = workdir / "marks"
+    marks_dir.mkdir()
+    processes = []
+    moto_server = None
+    created_pool = False
+    aws_env = {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }
+    try:
+        api_url = args.api_url
+        if not api_url:
+            print("🚀 Starting a temporary Prefect server...")
+            server, api_url = start_prefect_server(workdir)
+            processes.append(server)
+        os.environ["PREFECT_API_URL"] = api_url
+
+        pull_steps = {}
+        for backend in args.backends:
+            if backend == "local":
+                pull_steps[backend] = prepare_local()
+            elif backend == "s3":
+                os.environ.update(aws_env)
+                moto_server, endpoint_url = start_moto_server()
+                pull_steps[backend] = prepare_s3(endpoint_url)
+            elif backend == "git":
+                pull_steps[backend] = prepare_git(workdir)
+            elif backend == "git-mirror":
+                pull_steps[backend] = prepare_git_mirror(workdir)
+            elif backend == "image":
+                pull_steps[backend] = prepare_image(workdir)
+            print(f"📦 Prepared {backend} storage")
+
+        # Reload settings so the client talks to the benchmark API
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            created_pool = asyncio.run(prepare_work_pool(args.pool))
+            print(f"👷 Starting a process worker on {args.pool} (polling every {args.query_seconds}s)")
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            processes.append(
+                start_worker(
+                    api_url,
+                    workdir / "worker-home",
+                    output_dir / "worker.log",
+                    args.query_seconds,
+                    env={**aws_env, MARKS_DIR_ENV: str(marks_dir)},
+                    pool=args.pool,
+                )
+            )
+            runs = asyncio.run(run_benchmark(pull_steps, args.runs, marks_dir, args.timeout, args.pool))
+
+        summary = summarize(runs)
+        print_summary(summary)
+        write_results(output_dir, runs, summary)
+        print(f"\n💾 Results written to {args.output_dir}/latency_runs.csv and latency_summary.csv")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        # Only after the worker has stopped, or it would recreate the pool on its next poll
+        if created_pool and args.api_url:
+            from prefect.settings import PREFECT_API_URL, temporary_settings
+
+            with temporary_settings({PREFECT_API_URL: args.api_url}):
+                asyncio.run(delete_work_pool(args.pool))
+        if moto_server:
+            moto_server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
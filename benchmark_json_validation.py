@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-table JSON column validation on a Parquet stand-in
+
+Usage:
+    python benchmark_json_validation.py             # 10M rows
+    python benchmark_json_validation.py 1000000     # 1M rows
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+from json_column_validator import validate_table
+
+
+def write_stand_in(folder: Path, table: str, rows: int):
+    """Write `rows` deduped-style rows with ~1% invalid JSON to <table>.parquet"""
+    path = folder / f"{table}.parquet"
+    duckdb.execute(f"""
+        copy (
+            select
+                uuid()::varchar as uuid,
+                case when i % 100 = 0 then '{{"hubspot": "hs-' || i || '"'
+                     else '{{"hubspot": "hs-' || i || '", "salesforce": "sf-' || i || '"}}' end as external_ids,
+                case when i % 250 = 0 then null
+                     else '["src-' || i || '", "src-' || (i + 1) || '"]' end as source_uuids
+            from range({rows}) t(i)
+        ) to '{path}' (format parquet)
+    """)
+    return path
+
+
+def run_benchmark(rows: int = 10_000_000):
+    print("⏱️  JSON COLUMN VALIDATION BENCHMARK")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        start = time.perf_counter()
+        path = write_stand_in(folder, "deduped_people", rows)
+        print(f"📦 Wrote {rows:,} rows ({path.stat().st_size / 2**20:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+        result = validate_table.fn("people", f"parquet://{folder}", "deduped_people")
+        expected = rows // 100 + (1 if rows % 100 else 0)
+        assert result["invalid_external_ids"] == expected, result
+        assert result["invalid_source_uuids"] == 0, result
+        print(f"🚀 {result['rows']:,} rows validated in {result['seconds']}s "
+              f"({result['rows'] / max(result['seconds'], 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark s3_io against the one-client-per-call, one-object-at-a-time pattern
+
+Two workloads, each written, read back and deleted:
+- many small objects (--small-count objects of --small-kb KiB)
+- a few huge objects (--huge-count objects of --huge-mb MiB)
+
+The baseline does what our deployment scripts did: a fresh boto3.client('s3')
+per call, and put_object/get_object/delete_object one object at a time.
+
+By default it runs against a moto server in this process. moto keeps objects
+in memory and has no network latency, so the speedups are a lower bound. Use
+--endpoint-url for a MinIO container, or leave it empty with --bucket to
+measure real S3:
+
+    pip install "moto[server]"
+    python benchmark_s3_io.py
+    docker run -d -p 9000:9000 minio/minio server /data
+    AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin \\
+        python benchmark_s3_io.py --endpoint-url http://localhost:9000
+"""
+import argparse
+import os
+import time
+import uuid
+from typing import Callable, Dict
+
+from s3_io import MiB, delete_objects, download, get_objects, put_objects, s3_client, upload
+
+
+def fresh_client(endpoint_url):
+    import boto3
+
+    return boto3.client("s3", endpoint_url=endpoint_url)
+
+
+def baseline(endpoint_url, bucket: str, objects: Dict[str, bytes]) -> Dict[str, float]:
+    timings = {}
+    started = time.perf_counter()
+    for key, body in objects.items():
+        fresh_client(endpoint_url).put_object(Bucket=bucket, Key=key, Body=body)
+    timings["write"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key, body in objects.items():
+        assert fresh_client(endpoint_url).get_object(Bucket=bucket, Key=key)["Body"].read() == body
+    timings["read"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in objects:
+        fresh_client(endpoint_url).delete_object(Bucket=bucket, Key=key)
+    timings["delete"] = time.perf_counter() - started
+    return timings
+
+
+def toolkit(endpoint_url, bucket: str, objects: Dict[str, bytes], concurrency: int, part_size: int) -> Dict[str, float]:
+    client = s3_client(endpoint_url=endpoint_url)
+    timings = {}
+    started = time.perf_counter()
+    if len(objects) > concurrency:
+        put_objects(bucket, objects, concurrency=concurrency, client=client)
+    else:
+        for key, body in objects.items():
+            upload(bucket, key, body, part_size=part_size, concurrency=concurrency, client=client)
+    timings["write"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if len(objects) > concurrency:
+        assert get_objects(bucket, objects, concurrency=concurrency, client=client) == objects
+    else:
+        for key, body in objects.items():
+            assert download(bucket, key, part_size=part_size, concurrency=concurrency, client=client) == body
+    timings["read"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assert delete_objects(bucket, objects, concurrency=concurrency, client=client) == []
+    timings["delete"] = time.perf_counter() - started
+    return timings
+
+
+def report(name: str, objects: Dict[str, bytes], run: Callable[[], Dict[str, float]], base: Dict[str, float]):
+    timings = run()
+    total_mb = sum(len(body) for body in objects.values()) / MiB
+    for op in ("write", "read", "delete"):
+        rate = f"{total_mb / timings[op]:8.1f} MB/s" if op != "delete" else " " * 13
+        speedup = f"{base[op] / timings[op]:5.1f}x" if base else "     "
+        print(f"   {name:<8} {op:<7} {timings[op]:8.2f}s {rate} {len(objects) / timings[op]:9.0f} obj/s  {speedup}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark s3_io against sequential per-call clients")
+    parser.add_argument("--endpoint-url", help="MinIO or another S3 endpoint; default: an in-process moto server")
+    parser.add_argument("--bucket", default="s3-io-benchmark", help="Created if missing; objects are removed after")
+    parser.add_argument("--small-count", type=int, default=1000)
+    parser.add_argument("--small-kb", type=int, default=4)
+    parser.add_argument("--huge-count", type=int, default=2)
+    parser.add_argument("--huge-mb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--part-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if endpoint_url is None and not os.environ.get("AWS_ENDPOINT_URL_S3", os.environ.get("AWS_ENDPOINT_URL")):
+        from prefect_test_support import start_moto_server
+
+        os.environ.update({"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing"})
+        server, endpoint_url = start_moto_server()
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    try:
+        client = s3_client(endpoint_url=endpoint_url)
+        try:
+            client.head_bucket(Bucket=args.bucket)
+        except Exception:
+            client.create_bucket(Bucket=args.bucket)
+        run_id = uuid.uuid4().hex[:8]
+        workloads = {
+            "small": {f"benchmark/{run_id}/small/{i:06d}": os.urandom(args.small_kb * 1024)
+                      for i in range(args.small_count)},
+            "huge": {f"benchmark/{run_id}/huge/{i:03d}": os.urandom(args.huge_mb * MiB)
+                     for i in range(args.huge_count)},
+        }
+        print(f"📦 S3 I/O benchmark against {endpoint_url or 'AWS'} (bucket {args.bucket}, "
+              f"concurrency {args.concurrency}, {args.part_mb} MiB parts)")
+        for workload, objects in workloads.items():
+            size = args.small_kb * 1024 if workload == "small" else args.huge_mb * MiB
+            print(f"\n🧪 {len(objects)} objects of {size / 1024:.0f} KiB")
+            print(f"   {'':<8} {'op':<7} {'time':>9} {'throughput':>13} {'rate':>13}  speedup")
+            base = report("baseline", objects, lambda: baseline(endpoint_url, args.bucket, objects), {})
+            report("s3_io", objects, lambda: toolkit(endpoint_url, args.bucket, objects, args.concurrency,
+                                                      args.part_mb * MiB), base)
+        print("\n✅ Benchmark finished")
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark result serializers on realistic payloads
+
+Usage:
+    python benchmark_serializers.py            # ~100 MB of rows
+    python benchmark_serializers.py 20         # ~20 MB of rows
+"""
+import datetime
+import gc
+import sys
+import time
+import uuid
+
+from prefect.serializers import Serializer
+
+from result_serializers import get_result_serializer
+
+SERIALIZER_NAMES = ["json", "pickle", "orjson", "msgpack", "pickle5"]
+
+
+def make_rows(target_mb: int):
+    """Build a list of row dicts roughly `target_mb` megabytes in size"""
+    # Each row below is ~200 bytes once encoded
+    row_count = target_mb * 1024 * 1024 // 200
+    created = datetime.datetime(2024, 1, 1).isoformat()
+    rows = []
+    for i in range(row_count):
+        rows.append({
+            "id": i,
+            "uuid": str(uuid.UUID(int=i)),
+            "table_name": ("people", "deals", "loans", "payments")[i % 4],
+            "amount": i * 1.25,
+            "is_valid": i % 7 != 0,
+            "created_at": created,
+            "external_ids": {"hubspot": f"hs-{i}", "salesforce": f"sf-{i}"},
+        })
+    return rows
+
+
+def make_blob(target_mb: int):
+    """Build a single large binary payload plus some metadata"""
+    return {"name": "export.parquet", "data": bytes(target_mb * 1024 * 1024)}
+
+
+def make_array(target_mb: int):
+    """Build a numpy array payload if numpy is installed"""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np.arange(target_mb * 1024 * 1024 // 8, dtype="float64")
+
+
+def time_call(fn, *args):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_payload(label: str, payload, names):
+    print(f"\n📦 {label}")
+    print(f"  {'serializer':<10} {'dumps (s)':>10} {'loads (s)':>10} {'size (MB)':>10}")
+    for name in names:
+        serializer: Serializer = get_result_serializer(name)
+        try:
+            blob, dump_seconds = time_call(serializer.dumps, payload)
+            _, load_seconds = time_call(serializer.loads, blob)
+        except Exception as e:
+            print(f"  {name:<10} ❌ {type(e).__name__}: {e}")
+            continue
+        size_mb = len(blob) / (1024 * 1024)
+        print(f"  {name:<10} {dump_seconds:>10.3f} {load_seconds:>10.3f} {size_mb:>10.1f}")
+        del blob
+
+
+def run_benchmarks(target_mb: int = 100):
+    print("⏱️  RESULT SERIALIZER BENCHMARK")
+    print("=" * 50)
+
+    rows = make_rows(target_mb)
+    benchmark_payload(f"{len(rows):,} rows (~{target_mb} MB)", rows, SERIALIZER_NAMES)
+    del rows
+
+    # JSON serializers can't carry raw bytes, so only binary formats are compared
+    blob = make_blob(target_mb)
+    benchmark_payload(f"{target_mb} MB bytes payload", blob, ["pickle", "msgpack", "pickle5"])
+    del blob
+
+    array = make_array(target_mb)
+    if array is not None:
+        benchmark_payload(f"{target_mb} MB float64 array", array, ["pickle", "orjson", "pickle5"])
+    else:
+        print("\n⚠️  numpy not installed, skipping array payload")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    run_benchmarks(size)
@@ -4,6 +4,7 @@ Check the status of the REAL deployment and why it shows as "Late"
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import collect, iter_flow_runs, iter_workers
 
 async def check_deployment_status():
     """Check deployment and work pool status"""
@@ -22,17 +23,47 @@ async def check_deployment_status():
         print(f"⏸️ Paused: {deployment.paused}")
         print(f"📅 Schedule Active: {deployment.is_schedule_active}")
         
+        # The pool, its workers, recent runs and pending runs only depend on the deployment: read them at once
+        from prefect.client.schemas.filters import (
+            DeploymentFilter,
+            DeploymentFilterId,
+            FlowRunFilter,
+            FlowRunFilterState,
+            FlowRunFilterStateType,
+        )
+        from prefect.client.schemas.sorting import FlowRunSort
+        
+        deployment_filter = DeploymentFilter(id=DeploymentFilterId(any_=[deployment.id]))
+        work_pool, workers, flow_runs, pending_runs = await asyncio.gather(
+            client.read_work_pool(deployment.work_pool_name),
+            collect(iter_workers(client, deployment.work_pool_name)),
+            collect(iter_flow_runs(
+                client, deployment_filter=deployment_filter, sort=FlowRunSort.EXPECTED_START_TIME_DESC, limit=5
+            )),
+            collect(iter_flow_runs(
+                client,
+                flow_run_filter=FlowRunFilter(
+                    state=FlowRunFilterState(type=FlowRunFilterStateType(any_=["SCHEDULED", "PENDING"]))
+                ),
+                deployment_filter=deployment_filter,
+                limit=10
+            )),
+            return_exceptions=True,
+        )
+        
         # Check work pool status
         print(f"\n🏊 Work Pool Status:")
         try:
-            work_pool = await client.read_work_pool(deployment.work_pool_name)
+            if isinstance(work_pool, Exception):
+                raise work_pool
             print(f"  Name: {work_pool.name}")
             print(f"  Type: {work_pool.type}")
             print(f"  Paused: {work_pool.is_paused}")
             print(f"  Default Queue: {work_pool.default_queue_id}")
             
             # Check for workers
-            workers = await client.read_workers_for_work_pool(work_pool.name)
+            if isinstance(workers, Exception):
+                raise workers
             print(f"  Active Workers: {len(workers)}")
             
             if not workers:
@@ -47,25 +78,16 @@ async def check_deployment_status():
         
         # Check recent flow runs
         print(f"\n🏃 Recent Flow Runs:")
-        flow_runs = await client.read_flow_runs(
-            deployment_filter={"id": {"any_": [deployment_id]}},
-            limit=5
-        )
-        
-        if not flow_runs:
+        if isinstance(flow_runs, Exception):
+            print(f"  ❌ Error reading flow runs: {flow_runs}")
+        elif not flow_runs:
             print("  No flow runs found")
         else:
             for run in flow_runs:
                 print(f"  - {run.name}: {run.state.type} ({run.created})")
         
         # Check if there are pending/scheduled runs
-        pending_runs = await client.read_flow_runs(
-            state_filter={"type": {"any_": ["SCHEDULED", "PENDING"]}},
-            deployment_filter={"id": {"any_": [deployment_id]}},
-            limit=10
-        )
-        
-        if pending_runs:
+        if pending_runs and not isinstance(pending_runs, Exception):
             print(f"\n⏰ Pending/Scheduled Runs: {len(pending_runs)}")
             for run in pending_runs:
                 print(f"  - {run.name}: {run.state.type} (Expected: {run.expected_start_time})")
@@ -1,53 +1,60 @@
 #!/usr/bin/env python3
 """
 Check all deployments and their visibility status
+
+Reads from the local workspace cache (workspace_cache.py), which syncs only what
+changed once it is older than a minute. Pass --refresh to sync right away.
 """
 import asyncio
-from prefect import get_client
+import sys
+
+from workspace_cache import cached_workspace
 
-async def check_all_deployments():
+async def check_all_deployments(refresh: bool = False):
     """List all deployments with detailed information"""
     
     print("🔍 Checking all deployments...")
     print("=" * 60)
     
-    async with get_client() as client:
+    cache = await cached_workspace(["deployments", "flows", "work_pools"], refresh=refresh)
+    flows = cache.flows_by_id()
+    work_pools = {pool.name: pool for pool in cache.work_pools()}
+    
+    # Get all deployments
+    deployments = cache.deployments()
+    
+    if not deployments:
+        print("❌ No deployments found!")
+        return
+    
+    print(f"📋 Found {len(deployments)} deployment(s):")
+    print()
+    
+    for i, deployment in enumerate(deployments, 1):
+        print(f"{i}. Deployment: {deployment.name}")
+        print(f"   ID: {deployment.id}")
+        print(f"   Work Pool: {deployment.work_pool_name}")
+        print(f"   Status: {'🟢 Active' if not deployment.is_schedule_active else '🔴 Inactive'}")
+        print(f"   Tags: {deployment.tags}")
+        print(f"   Created: {deployment.created}")
+        print(f"   Updated: {deployment.updated}")
         
-        # Get all deployments
-        deployments = await client.read_deployments()
+        # Check if flow exists
+        flow = flows.get(str(deployment.flow_id))
+        if flow:
+            print(f"   Flow: ✅ {flow.name}")
+        else:
+            print(f"   Flow: ❌ Error: flow {deployment.flow_id} not found")
         
-        if not deployments:
-            print("❌ No deployments found!")
-            return
+        # Check work pool
+        work_pool = work_pools.get(deployment.work_pool_name)
+        if work_pool:
+            print(f"   Work Pool Status: ✅ {work_pool.type} pool exists")
+        else:
+            print(f"   Work Pool Status: ❌ Error: work pool {deployment.work_pool_name} not found")
         
-        print(f"📋 Found {len(deployments)} deployment(s):")
+        print(f"   URL: https://app.prefect.cloud/account/ab61b83d-af98-4940-ac58-024d88160a03/workspace/e31cc9e9-de96-4558-acdc-1ded94493b8d/deployments/deployment/{deployment.id}")
         print()
-        
-        for i, deployment in enumerate(deployments, 1):
-            print(f"{i}. Deployment: {deployment.name}")
-            print(f"   ID: {deployment.id}")
-            print(f"   Work Pool: {deployment.work_pool_name}")
-            print(f"   Status: {'🟢 Active' if not deployment.is_schedule_active else '🔴 Inactive'}")
-            print(f"   Tags: {deployment.tags}")
-            print(f"   Created: {deployment.created}")
-            print(f"   Updated: {deployment.updated}")
-            
-            # Check if flow exists
-            try:
-                flow = await client.read_flow(deployment.flow_id)
-                print(f"   Flow: ✅ {flow.name}")
-            except Exception as e:
-                print(f"   Flow: ❌ Error: {e}")
-            
-            # Check work pool
-            try:
-                work_pool = await client.read_work_pool(deployment.work_pool_name)
-                print(f"   Work Pool Status: ✅ {work_pool.type} pool exists")
-            except Exception as e:
-                print(f"   Work Pool Status: ❌ Error: {e}")
-            
-            print(f"   URL: https://app.prefect.cloud/account/ab61b83d-af98-4940-ac58-024d88160a03/workspace/e31cc9e9-de96-4558-acdc-1ded94493b8d/deployments/deployment/{deployment.id}")
-            print()
 
 if __name__ == "__main__":
-    asyncio.run(check_all_deployments())
+    asyncio.run(check_all_deployments(refresh="--refresh" in sys.argv))
@@ -4,6 +4,7 @@ Check the specific flow run that's showing as LATE
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import collect, iter_work_queues
 
 async def check_flow_run_status():
     """Check the specific flow run details"""
@@ -29,23 +30,33 @@ async def check_flow_run_status():
             print(f"  Expected start time: {flow_run.expected_start_time}")
             print(f"  Start time: {flow_run.start_time}")
             
+            # The deployment and the pool's queues both only depend on the flow run: read them together
+            async def no_result():
+                return None
+            
+            deployment, work_queues = await asyncio.gather(
+                client.read_deployment(flow_run.deployment_id) if flow_run.deployment_id else no_result(),
+                collect(iter_work_queues(client, flow_run.work_pool_name))
+                if flow_run.work_pool_name and flow_run.work_queue_name else no_result(),
+                return_exceptions=True,
+            )
+            
             if flow_run.deployment_id:
                 print(f"\n📦 DEPLOYMENT DETAILS:")
-                deployment = await client.read_deployment(flow_run.deployment_id)
+                if isinstance(deployment, Exception):
+                    raise deployment
                 print(f"  Deployment Name: {deployment.name}")
                 print(f"  Work Pool: {deployment.work_pool_name}")
                 print(f"  Work Queue: {deployment.work_queue_name}")
-                print(f"  Is paused: {deployment.is_paused}")
-                print(f"  Schedule active: {deployment.schedule_active}")
+                print(f"  Is paused: {deployment.paused}")
+                print(f"  Schedule active: {deployment.is_schedule_active}")
             
             # Check if work queue has any issues
             if flow_run.work_pool_name and flow_run.work_queue_name:
                 print(f"\n🔍 WORK QUEUE STATUS:")
                 try:
-                    work_queues = await client.read_work_queues(
-                        work_pool_name=flow_run.work_pool_name,
-                        limit=10
-                    )
+                    if isinstance(work_queues, Exception):
+                        raise work_queues
                     
                     target_queue = None
                     for wq in work_queues:
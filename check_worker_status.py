@@ -4,6 +4,7 @@ Check the current status of workers and work pool
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import collect, iter_flow_runs, iter_workers
 
 async def check_worker_status():
     """Check workers and work pool status"""
@@ -12,11 +13,21 @@ async def check_worker_status():
     print("=" * 40)
     
     async with get_client() as client:
+        from prefect.client.schemas.sorting import FlowRunSort
+        
+        # The pool, its workers and the recent runs don't depend on each other: read them at once
+        work_pool, workers, flow_runs = await asyncio.gather(
+            client.read_work_pool("gellc-process-pool"),
+            collect(iter_workers(client, "gellc-process-pool")),
+            collect(iter_flow_runs(client, sort=FlowRunSort.START_TIME_DESC, limit=5)),
+            return_exceptions=True,
+        )
         
         # Check work pool
         print("🏊 WORK POOL STATUS:")
         try:
-            work_pool = await client.read_work_pool("gellc-process-pool")
+            if isinstance(work_pool, Exception):
+                raise work_pool
             print(f"  Name: {work_pool.name}")
             print(f"  Type: {work_pool.type}")
             print(f"  Is paused: {work_pool.is_paused}")
@@ -27,7 +38,8 @@ async def check_worker_status():
         # Check workers
         print(f"\n👷 WORKERS:")
         try:
-            workers = await client.read_workers_for_work_pool("gellc-process-pool")
+            if isinstance(workers, Exception):
+                raise workers
             print(f"Total workers: {len(workers)}")
             
             if workers:
@@ -57,13 +69,8 @@ async def check_worker_status():
         # Check recent flow runs
         print(f"\n📋 RECENT FLOW RUNS:")
         try:
-            from prefect.client.schemas.filters import FlowRunFilter, FlowRunFilterWorkPoolName
-            from prefect.client.schemas.sorting import FlowRunSort
-            
-            flow_runs = await client.read_flow_runs(
-                limit=5,
-                sort=FlowRunSort.START_TIME_DESC
-            )
+            if isinstance(flow_runs, Exception):
+                raise flow_runs
             
             if flow_runs:
                 for run in flow_runs:
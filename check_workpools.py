@@ -1,30 +1,39 @@
 #!/usr/bin/env python3
 """
 Check available work pools and create the missing one
+
+Pool metadata comes from the local workspace cache (workspace_cache.py); worker
+counts are live. Pass --refresh to sync the cache right away.
 """
 import asyncio
+import sys
 from prefect import get_client
 
-async def check_and_create_workpools():
+from workspace_cache import cached_workspace
+from workspace_inspection import read_workers_by_pool
+
+async def check_and_create_workpools(refresh: bool = False):
     """Check available work pools and create missing ones"""
     
     print("🏊 Checking work pools...")
     print("=" * 50)
     
+    cache = await cached_workspace(["work_pools"], refresh=refresh)
+
     async with get_client() as client:
         
         # List all work pools
         print("\n📋 Available work pools:")
-        work_pools = await client.read_work_pools()
+        work_pools = cache.work_pools()
         
         pool_names = [pool.name for pool in work_pools]
         
         if not work_pools:
             print("  ❌ No work pools found!")
         else:
+            workers = await read_workers_by_pool(client, [pool.name for pool in work_pools])
             for pool in work_pools:
-                workers = await client.read_workers_for_work_pool(pool.name)
-                print(f"  - {pool.name} (Type: {pool.type}, Workers: {len(workers)})")
+                print(f"  - {pool.name} (Type: {pool.type}, Workers: {len(workers[pool.name])})")
         
         # Check if gellc-process-pool exists
         if "gellc-process-pool" not in pool_names:
@@ -39,7 +48,7 @@ async def check_and_create_workpools():
             return False
 
 if __name__ == "__main__":
-    needs_creation = asyncio.run(check_and_create_workpools())
+    needs_creation = asyncio.run(check_and_create_workpools(refresh="--refresh" in sys.argv))
     
     if needs_creation:
         print("\n🔧 Need to create the work pool...")
@@ -6,6 +6,9 @@ import asyncio
 from prefect import get_client
 import os
 
+from prefect_pagination import collect, iter_deployments, iter_work_pools
+from workspace_inspection import read_flows_by_id
+
 async def deep_workspace_check():
     """Deep check of workspace and deployments"""
     
@@ -24,16 +27,29 @@ async def deep_workspace_check():
         print(f"🔗 Client API URL: {client.api_url}")
         print()
         
-        # List ALL deployments without filters
+        # List ALL deployments without filters, and the work pools alongside
         print("📋 ALL DEPLOYMENTS (no filters):")
         try:
-            all_deployments = await client.read_deployments(limit=100)
+            all_deployments, work_pools = await asyncio.gather(
+                collect(iter_deployments(client)),
+                collect(iter_work_pools(client)),
+                return_exceptions=True,
+            )
+            if isinstance(all_deployments, Exception):
+                raise all_deployments
             print(f"Total deployments found: {len(all_deployments)}")
             
             if not all_deployments:
                 print("❌ NO DEPLOYMENTS FOUND!")
                 return
             
+            # One request for every deployment's flow instead of one per deployment
+            try:
+                flows = await read_flows_by_id(client, [dep.flow_id for dep in all_deployments])
+            except Exception as e:
+                print(f"❌ Error reading flows: {e}")
+                flows = {}
+            
             for i, dep in enumerate(all_deployments, 1):
                 print(f"\n{i}. 📦 {dep.name}")
                 print(f"   🆔 ID: {dep.id}")
@@ -44,11 +60,8 @@ async def deep_workspace_check():
                 print(f"   📅 Schedule Active: {dep.is_schedule_active}")
                 
                 # Show the flow name too
-                try:
-                    flow = await client.read_flow(dep.flow_id)
-                    print(f"   🌊 Flow Name: {flow.name}")
-                except:
-                    print(f"   🌊 Flow Name: [Error reading flow]")
+                flow = flows.get(dep.flow_id)
+                print(f"   🌊 Flow Name: {flow.name if flow else '[Error reading flow]'}")
         
         except Exception as e:
             print(f"❌ Error reading deployments: {e}")
@@ -56,12 +69,11 @@ async def deep_workspace_check():
         
         # Check work pools
         print(f"\n🏊 WORK POOLS:")
-        try:
-            work_pools = await client.read_work_pools()
+        if isinstance(work_pools, Exception):
+            print(f"❌ Error reading work pools: {work_pools}")
+        else:
             for pool in work_pools:
                 print(f"   - {pool.name} (Type: {pool.type})")
-        except Exception as e:
-            print(f"❌ Error reading work pools: {e}")
         
         # Show exact URLs for each deployment
         print(f"\n🔗 EXACT URLS FOR EACH DEPLOYMENT:")
@@ -8,6 +8,7 @@ import subprocess
 from pathlib import Path
 from prefect.deployments import Deployment
 from prefect import get_client, flow, task
+from prefect_pagination import deployments_named
 
 @task
 def diagnostic_task():
@@ -153,11 +154,9 @@ async def create_diagnostic_deployment():
     # Delete any existing diagnostic deployment
     async with get_client() as client:
         try:
-            deployments = await client.read_deployments()
-            for dep in deployments:
-                if dep.name == "DIAGNOSTIC-deployment":
-                    print(f"🗑️ Deleting existing diagnostic deployment: {dep.id}")
-                    await client.delete_deployment(dep.id)
+            for dep in await deployments_named(client, "DIAGNOSTIC-deployment"):
+                print(f"🗑️ Deleting existing diagnostic deployment: {dep.id}")
+                await client.delete_deployment(dep.id)
         except Exception as e:
             print(f"⚠️ Error cleaning up: {e}")
     
@@ -6,6 +6,7 @@ import asyncio
 from prefect.deployments import Deployment
 from prefect import get_client
 from app_flow import app_flow
+from prefect_pagination import deployments_named
 
 async def create_modern_github_deployment():
     """Create deployment using modern GitHub storage"""
@@ -38,11 +39,9 @@ async def create_modern_github_deployment():
     # Delete any existing deployment with same name
     async with get_client() as client:
         try:
-            deployments = await client.read_deployments()
-            for dep in deployments:
-                if dep.name == "MODERN-github-deployment":
-                    print(f"🗑️ Deleting existing deployment: {dep.id}")
-                    await client.delete_deployment(dep.id)
+            for dep in await deployments_named(client, "MODERN-github-deployment"):
+                print(f"🗑️ Deleting existing deployment: {dep.id}")
+                await client.delete_deployment(dep.id)
         except Exception as e:
             print(f"⚠️ Error cleaning up: {e}")
     
@@ -65,17 +65,12 @@ async def test_working_deployment():
     """Test the working deployment immediately"""
     
     from prefect.client.orchestration import get_client
+    from prefect_pagination import deployments_named
     
     async with get_client() as client:
         try:
             # Find the working deployment
-            deployments = await client.read_deployments()
-            
-            working_deployment = None
-            for deployment in deployments:
-                if deployment.name == "working-ecs-flow":
-                    working_deployment = deployment
-                    break
+            working_deployment = next(iter(await deployments_named(client, "working-ecs-flow")), None)
             
             if not working_deployment:
                 print("❌ Could not find 'working-ecs-flow' deployment")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Generate one dbt model per claymore business object
+
+dbt_project.yml lists the business objects in the `claymore_core:all_business_objects`
+var. For each of them a small model file, models/json_validation/test_json_<plural>.sql,
+is written that only calls the json_validation_model macro; all the SQL lives in
+macros/json_validation.sql. The models are independent of each other, so the flow
+builds them concurrently, and test_json is a view over all of them.
+
+Adding a business object to the var is enough: the flow regenerates the model files
+before parsing and removes files for objects that are no longer listed.
+
+    python dbt_business_objects.py [project_dir]
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+BUSINESS_OBJECTS_VAR = "claymore_core:all_business_objects"
+GENERATED_DIR = Path("models") / "json_validation"
+MODEL_PREFIX = "test_json_"
+GENERATED_HEADER = "-- Generated by dbt_business_objects.py from the claymore_core:all_business_objects var, do not edit"
+
+MODEL_TEMPLATE = """{header}
+{{{{ json_validation_model('{package}', '{plural}') }}}}
+"""
+
+
+def business_objects(project_dir) -> List[Dict[str, str]]:
+    """The business objects declared in dbt_project.yml ([] when the var is missing)"""
+    config = yaml.safe_load((Path(project_dir) / "dbt_project.yml").read_text()) or {}
+    return (config.get("vars") or {}).get(BUSINESS_OBJECTS_VAR) or []
+
+
+def generate_business_object_models(project_dir) -> List[str]:
+    """Write a model per business object and remove stale ones, returning the model names"""
+    project_dir = Path(project_dir)
+    objects = business_objects(project_dir)
+    model_dir = project_dir / GENERATED_DIR
+    if not objects and not model_dir.exists():
+        return []
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+    for business_object in objects:
+        name = f"{MODEL_PREFIX}{business_object['record_type_plural']}"
+        content = MODEL_TEMPLATE.format(
+            header=GENERATED_HEADER,
+            package=business_object["package"],
+            plural=business_object["record_type_plural"],
+        )
+        path = model_dir / f"{name}.sql"
+        if not path.exists() or path.read_text() != content:
+            # Concurrent flow runs regenerate the same files; a rename never exposes a partial one
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(content)
+            os.replace(tmp, path)
+        names.append(name)
+
+    for path in model_dir.glob(f"{MODEL_PREFIX}*.sql"):
+        try:
+            stale = path.stem not in names and path.read_text().startswith(GENERATED_HEADER)
+        except FileNotFoundError:
+            continue
+        if stale:
+            path.unlink(missing_ok=True)
+    return names
+
+
+if __name__ == "__main__":
+    from dbt_flow import DBT_PROJECT_DIR
+
+    project = sys.argv[1] if len(sys.argv) > 1 else DBT_PROJECT_DIR
+    for model in generate_business_object_models(project):
+        print(f"📝 {model}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Model DAG built from a dbt manifest.json
+
+Only model nodes are kept; dependencies on seeds, sources and snapshots are
+dropped because those are not run by the model flow.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class ModelDag:
+    """Models keyed by unique_id with their upstream and downstream model ids"""
+
+    def __init__(self, nodes: Dict[str, dict]):
+        self.nodes = nodes
+        self.parents: Dict[str, Set[str]] = {}
+        self.children: Dict[str, Set[str]] = {uid: set() for uid in nodes}
+        for uid, node in nodes.items():
+            upstream = {
+                dep for dep in node.get("depends_on", {}).get("nodes", []) if dep in nodes
+            }
+            self.parents[uid] = upstream
+            for dep in upstream:
+                self.children[dep].add(uid)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, uid):
+        return uid in self.nodes
+
+    def name(self, uid: str) -> str:
+        return self.nodes[uid]["name"]
+
+    def roots(self) -> List[str]:
+        return sorted(uid for uid, parents in self.parents.items() if not parents)
+
+    def descendants(self, uids: Iterable[str]) -> Set[str]:
+        """All models downstream of `uids` (not including `uids` themselves)"""
+        found: Set[str] = set()
+        stack = list(uids)
+        while stack:
+            for child in self.children.get(stack.pop(), ()):
+                if child not in found:
+                    found.add(child)
+                    stack.append(child)
+        return found
+
+    def ancestors(self, uids: Iterable[str]) -> Set[str]:
+        """All models upstream of `uids` (not including `uids` themselves)"""
+        found: Set[str] = set()
+        stack = list(uids)
+        while stack:
+            for parent in self.parents.get(stack.pop(), ()):
+                if parent not in found:
+                    found.add(parent)
+                    stack.append(parent)
+        return found
+
+    def topological_order(self) -> List[str]:
+        """Models ordered so every model comes after its parents"""
+        remaining = {uid: len(parents) for uid, parents in self.parents.items()}
+        ready = sorted(uid for uid, count in remaining.items() if count == 0)
+        order = []
+        while ready:
+            uid = ready.pop(0)
+            order.append(uid)
+            for child in sorted(self.children[uid]):
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            cycle = sorted(uid for uid, count in remaining.items() if count > 0)
+            raise ValueError(f"Model graph has a cycle involving: {cycle}")
+        return order
+
+    def subgraph(self, uids: Iterable[str]) -> "ModelDag":
+        """A DAG restricted to `uids`, keeping dependencies between them"""
+        keep = set(uids)
+        return ModelDag({uid: node for uid, node in self.nodes.items() if uid in keep})
+
+
+def load_manifest(manifest_path) -> dict:
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def project_scope(manifest: dict, target: Optional[str]) -> str:
+    """Key for per-project, per-target state: `<project>__<target>` in lowercase letters, digits and _"""
+    project = manifest.get("metadata", {}).get("project_name") or "project"
+    return re.sub(r"[^a-z0-9_]+", "_", f"{project}__{target or 'default'}".lower())
+
+
+def build_model_dag(manifest: dict, package: Optional[str] = None) -> ModelDag:
+    """Build the model DAG, optionally limited to one package's models"""
+    nodes = {
+        uid: node
+        for uid, node in manifest.get("nodes", {}).items()
+        if node.get("resource_type") == "model"
+        and node.get("config", {}).get("enabled", True)
+        and (package is None or node.get("package_name") == package)
+    }
+    return ModelDag(nodes)
+
+
+def load_model_dag(manifest_path, package: Optional[str] = None) -> ModelDag:
+    return build_model_dag(load_manifest(Path(manifest_path)), package)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Run the dbt project across several workers
+
+The model DAG is split into `partitions` balanced lanes using the historical
+durations in the timing warehouse (see dbt_partition.py). Each lane is cut into
+segments at cross-partition dependencies, and every segment is submitted as a
+run of the dbt-models deployment with just its models. Segments start as soon
+as the segments they depend on have completed, so up to `partitions` segment
+runs are in flight on the work pool at once.
+
+Without a deployment the segments run in-process as subflows, which is handy
+for trying a partitioning locally:
+    DBT_TARGET=duckdb python dbt_distributed_flow.py
+
+To spread the work over several local process workers against DuckDB, deploy
+the dbt-models flow, start a few workers on gellc-process-pool, then:
+    python dbt_distributed_flow.py deploy
+    DBT_TARGET=duckdb python dbt_distributed_flow.py "dbt-models/gellc-dbt-models"
+
+DuckDB only allows one writing process, so partition runs against the same
+file take turns through run_model's lock-conflict retries.
+"""
+import os
+import sys
+from typing import Dict, List, Optional
+
+from prefect import flow
+from prefect.artifacts import create_table_artifact
+from prefect.deployments import Deployment, run_deployment
+
+from dbt_dag import build_model_dag, load_manifest
+from dbt_flow import DBT_PROJECT_DIR, dbt_model_flow, execute_model_dag, parse_project
+from dbt_partition import build_segments, partition_models, partition_summary
+from dbt_timings import expected_durations, restore_timings
+
+DEFAULT_PARTITIONS = 3
+DBT_MODELS_DEPLOYMENT = "gellc-dbt-models"
+
+
+@flow(name="dbt-models-distributed")
+def dbt_distributed_flow(
+    partitions: int = DEFAULT_PARTITIONS,
+    project_dir: str = str(DBT_PROJECT_DIR),
+    target: Optional[str] = None,
+    deployment: Optional[str] = None,
+    full_refresh: bool = False,
+):
+    """Partition the model DAG and run each partition segment as its own flow run"""
+    target = target or os.environ.get("DBT_TARGET")
+    print(f"🚀 Distributing dbt models over {partitions} partitions (target: {target or 'default'})")
+
+    dag = build_model_dag(load_manifest(parse_project(project_dir, target)))
+    restored = restore_timings(target)
+    if restored:
+        print(f"♻️  Restored {restored} dbt timing files")
+    durations = expected_durations(target)
+
+    assignment, starts, makespan = partition_models(dag, durations, partitions)
+    segments = build_segments(dag, assignment, starts)
+    print(f"📋 {len(dag)} models in {len(segments)} segments, expected makespan {makespan:.0f}s")
+    create_table_artifact(
+        table=partition_summary(dag, assignment, durations),
+        key="dbt-partitions",
+        description="Models and expected seconds per partition",
+    )
+
+    def run_segment(name: str) -> bool:
+        models = [dag.name(uid) for uid in segments.nodes[name]["models"]]
+        parameters = {
+            "project_dir": project_dir,
+            "target": target,
+            "full_refresh": full_refresh,
+            "models": models,
+        }
+        print(f"📤 {name}: {', '.join(models)}")
+        if deployment:
+            flow_run = run_deployment(
+                name=deployment,
+                parameters=parameters,
+                flow_run_name=f"dbt-{name}",
+                timeout=None,
+            )
+            state = flow_run.state
+        else:
+            state = dbt_model_flow.with_options(flow_run_name=f"dbt-{name}")(
+                **parameters, return_state=True
+            )
+        if state and state.is_completed():
+            print(f"✅ {name}")
+            return True
+        print(f"❌ {name}: {state.message if state else 'no state'}")
+        return False
+
+    statuses = execute_model_dag(segments, run_segment, max_workers=partitions)
+
+    rows: List[Dict] = [
+        {
+            "segment": name,
+            "partition": segments.nodes[name]["partition"],
+            "models": len(segments.nodes[name]["models"]),
+            "depends_on": ", ".join(segments.parents[name]),
+            "status": statuses.get(name, "not run"),
+        }
+        for name in segments.topological_order()
+    ]
+    create_table_artifact(table=rows, key="dbt-partition-runs", description="dbt partition segment results")
+
+    failed = [row["segment"] for row in rows if row["status"] == "error"]
+    skipped = [row["segment"] for row in rows if row["status"] == "skipped"]
+    print(f"🏁 {len(rows) - len(failed) - len(skipped)} segments succeeded, {len(failed)} failed, {len(skipped)} skipped")
+    if failed:
+        raise RuntimeError(f"dbt segments failed: {failed} (skipped downstream: {skipped})")
+    return statuses
+
+
+def deploy_dbt_models():
+    """Deploy the dbt-models flow to the process pool so segments can be spread over workers"""
+    deployment = Deployment.build_from_flow(
+        flow=dbt_model_flow,
+        name=DBT_MODELS_DEPLOYMENT,
+        work_pool_name="gellc-process-pool",
+        description="dbt models (all, or one partition segment)",
+        tags=["dbt", "gellc"],
+    )
+    deployment_id = deployment.apply()
+    print(f"✅ Deployed dbt-models/{DBT_MODELS_DEPLOYMENT} ({deployment_id})")
+    return deployment_id
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["deploy"]:
+        deploy_dbt_models()
+    else:
+        dbt_distributed_flow(deployment=sys.argv[1] if len(sys.argv) > 1 else None)
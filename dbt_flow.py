@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Run the dbt project in src/dbt as one Prefect task per model
+
+The flow parses the project, builds the model DAG from manifest.json and runs
+models concurrently (up to `max_workers` at a time) as soon as their parents
+have succeeded. When a model fails its downstream models are skipped, while
+independent branches keep going.
+
+Incremental models with a watermark in their meta (see dbt_watermarks.py) get
+their last stored watermark passed automatically; `full_refresh=True` rebuilds
+them from scratch.
+
+Per-business-object models are generated from the claymore_core:all_business_objects
+var before parsing (see dbt_business_objects.py).
+
+Parse artifacts are cached on a hash of the project (see dbt_parse_cache.py), so
+unchanged projects skip `dbt parse` and every model run starts from the cached
+partial parse state.
+
+With `selective=True` only models modified since the last fully successful run
+on the same target, and their downstream models, are run (see dbt_state.py).
+
+Pass `models` to run just those models, e.g. one partition segment from
+dbt_distributed_flow.py; such partial runs parse into their own directory under
+target/runs, so concurrent segments never write the shared target/, and they
+don't save the state manifest.
+
+Each model's run_results.json is ingested into the timing warehouse and a
+slow-model report is published after every run (see dbt_timings.py).
+
+Locally, use the `duckdb` target from src/dbt/profiles.yml:
+    DBT_TARGET=duckdb python dbt_flow.py
+"""
+import contextvars
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from prefect import flow, task
+from prefect.artifacts import create_markdown_artifact, create_table_artifact
+
+from dbt_business_objects import generate_business_object_models
+from dbt_dag import ModelDag, load_manifest, build_model_dag, project_scope
+from dbt_parse_cache import project_fingerprint, restore_parse_cache, save_parse_cache
+from dbt_state import load_state_manifest, save_state_manifest, select_modified, selection_report
+from dbt_timings import (
+    build_timing_report,
+    ingest_run_results,
+    model_stats,
+    restore_timings,
+    timing_report_markdown,
+)
+from dbt_watermarks import (
+    WATERMARK_ENV,
+    load_watermarks,
+    parse_watermark_rows,
+    save_watermarks,
+    watermark_config,
+    watermark_query,
+)
+
+DBT_PROJECT_DIR = Path(__file__).resolve().parent / "src" / "dbt"
+DEFAULT_MAX_WORKERS = 4
+# Adapters whose database only allows one writing process at a time
+SINGLE_WRITER_ADAPTERS = {"duckdb"}
+
+
+def dbt_executable() -> List[str]:
+    """Prefer the dbt CLI on PATH, falling back to the current interpreter"""
+    executable = shutil.which("dbt")
+    if executable:
+        return [executable]
+    return [sys.executable, "-m", "dbt.cli.main"]
+
+
+def dbt_command(command: List[str], project_dir, target: Optional[str] = None, target_path=None) -> List[str]:
+    project_dir = Path(project_dir)
+    args = dbt_executable() + list(command) + [
+        "--project-dir", str(project_dir),
+        "--profiles-dir", os.environ.get("DBT_PROFILES_DIR", str(project_dir)),
+    ]
+    if target:
+        args += ["--target", target]
+    if target_path:
+        args += ["--target-path", str(target_path)]
+    return args
+
+
+def invoke_dbt(
+    command: List[str],
+    project_dir,
+    target: Optional[str] = None,
+    target_path=None,
+    env: Optional[Dict[str, str]] = None,
+) -> str:
+    """Run a dbt command and return its output, raising if it fails"""
+    args = dbt_command(command, project_dir, target, target_path)
+    print(f"🔧 {' '.join(args[len(dbt_executable()):])}")
+    result = subprocess.run(args, capture_output=True, text=True, env={**os.environ, **(env or {})})
+    if result.returncode != 0:
+        output = (result.stdout + result.stderr).strip()
+        raise RuntimeError(f"dbt {' '.join(command)} failed:\n{output[-4000:]}")
+    return result.stdout
+
+
+@task(name="dbt-parse")
+def parse_project(project_dir: str, target: Optional[str] = None, target_dir: Optional[str] = None) -> str:
+    """Restore or build the parse artifacts in `target_dir` (target/) and return the path to manifest.json"""
+    target_dir = Path(target_dir) if target_dir else Path(project_dir) / "target"
+    generate_business_object_models(project_dir)
+    fingerprint = project_fingerprint(project_dir, target)
+    if restore_parse_cache(fingerprint, target_dir):
+        print(f"♻️  Restored dbt parse cache {fingerprint[:12]}")
+    else:
+        print(f"📝 No dbt parse cache for {fingerprint[:12]}, parsing project")
+        invoke_dbt(["parse", "--partial-parse"], project_dir, target, target_dir)
+        if save_parse_cache(fingerprint, target_dir):
+            print(f"💾 Saved dbt parse cache {fingerprint[:12]}")
+    return str(target_dir / "manifest.json")
+
+
+def seed_partial_parse(parse_dir, target_path: Path):
+    """Start a model's target path from the partial parse state in `parse_dir`"""
+    partial_parse = Path(parse_dir) / "partial_parse.msgpack"
+    if partial_parse.is_file():
+        target_path.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(partial_parse, target_path / "partial_parse.msgpack")
+
+
+def is_lock_conflict(task, task_run, state) -> bool:
+    """Retry condition: another process holds the DuckDB file lock"""
+    return "Could not set lock on file" in (state.message or "")
+
+
+# Retries only cover DuckDB lock conflicts between flow runs on separate local workers
+@task(
+    name="dbt-run-model",
+    task_run_name="dbt-run-{model_name}",
+    retries=5,
+    retry_delay_seconds=[2, 5, 10, 20, 30],
+    retry_condition_fn=is_lock_conflict,
+)
+def run_model(
+    model_name: str,
+    project_dir: str,
+    target: Optional[str] = None,
+    watermark: Optional[dict] = None,
+    full_refresh: bool = False,
+    scope: Optional[str] = None,
+    parse_dir: Optional[str] = None,
+) -> float:
+    """Run a single model and return its wall-clock duration; `scope` keys its watermarks"""
+    start = time.perf_counter()
+    # Separate target paths keep concurrent invocations from clobbering each other's artifacts
+    target_path = Path(project_dir) / "target" / "models" / model_name
+    seed_partial_parse(parse_dir or Path(project_dir) / "target", target_path)
+    command = ["run", "--select", model_name, "--partial-parse"]
+    if full_refresh:
+        command.append("--full-refresh")
+
+    stored = {}
+    env = {}
+    if watermark and not full_refresh:
+        stored = load_watermarks(scope, model_name)
+        if stored:
+            print(f"💧 {model_name} watermarks: {stored}")
+            env[WATERMARK_ENV] = json.dumps(stored)
+
+    run_results = target_path / "run_results.json"
+    run_results.unlink(missing_ok=True)
+    try:
+        invoke_dbt(command, project_dir, target, target_path, env)
+    finally:
+        if run_results.exists():
+            from prefect.runtime import flow_run
+
+            # Timing history is best effort and must not mask the dbt result
+            try:
+                ingest_run_results(run_results, target, flow_run.id)
+            except Exception as e:
+                print(f"⚠️  Could not record timings for {model_name}: {e}")
+
+    if watermark:
+        output = invoke_dbt(
+            [
+                "show", "--inline", watermark_query(model_name, watermark["column"], watermark["group_by"]),
+                "--output", "json", "--quiet", "--limit", "1000",
+            ],
+            project_dir, target, target_path, env,
+        )
+        watermarks = {**stored, **parse_watermark_rows(output)}
+        save_watermarks(scope, model_name, watermarks)
+        print(f"💧 {model_name} new watermarks: {watermarks}")
+
+    return time.perf_counter() - start
+
+
+def execute_model_dag(dag: ModelDag, run_one: Callable[[str], bool], max_workers: int) -> Dict[str, str]:
+    """
+    Run every model in `dag` with at most `max_workers` in flight.
+
+    `run_one(uid)` returns True on success. Returns a status per model:
+    "success", "error", or "skipped" when an upstream model failed.
+    """
+    dag.topological_order()  # fail fast on cycles
+    statuses: Dict[str, str] = {}
+    waiting = {uid: set(parents) for uid, parents in dag.parents.items()}
+    ready = [uid for uid, parents in waiting.items() if not parents]
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dbt-model") as pool:
+        running = {}
+        while ready or running:
+            while ready and len(running) < max_workers:
+                uid = ready.pop(0)
+                # Each model gets its own copy of the flow run context
+                context = contextvars.copy_context()
+                running[pool.submit(context.run, run_one, uid)] = uid
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                uid = running.pop(future)
+                try:
+                    succeeded = future.result()
+                except Exception as e:
+                    print(f"❌ {dag.name(uid)}: {e}")
+                    succeeded = False
+
+                if succeeded:
+                    statuses[uid] = "success"
+                    for child in sorted(dag.children[uid]):
+                        waiting[child].discard(uid)
+                        if not waiting[child] and child not in statuses:
+                            ready.append(child)
+                else:
+                    statuses[uid] = "error"
+                    for skipped in dag.descendants([uid]):
+                        statuses.setdefault(skipped, "skipped")
+                    ready = [r for r in ready if r not in statuses]
+
+    return statuses
+
+
+@task(name="dbt-timing-report")
+def report_model_timings(dag: ModelDag, target: Optional[str] = None) -> dict:
+    """Publish the slowest models, critical path and regressions for this run's models"""
+    report = build_timing_report(dag, model_stats(target))
+    create_markdown_artifact(
+        markdown=timing_report_markdown(report),
+        key="dbt-model-timings",
+        description=f"Critical path {report['critical_path_seconds']}s, {len(report['regressions'])} regressions",
+    )
+    for row in report["regressions"]:
+        print(f"⚠️  {row['model']} regressed: {row['seconds']}s vs median {row['trailing_median']}s")
+    return report
+
+
+def select_state_models(dag: ModelDag, manifest: dict, state_key: str, full_refresh: bool) -> ModelDag:
+    """Limit `dag` to models modified since the saved state, plus their descendants"""
+    previous = None if full_refresh else load_state_manifest(state_key)
+    if full_refresh:
+        decision = "full refresh, running every model"
+        reasons = {uid: "full refresh" for uid in dag.nodes}
+    elif previous is None:
+        decision = f"no saved state for {state_key}, running every model"
+        reasons = {uid: "no state" for uid in dag.nodes}
+    else:
+        _, reasons = select_modified(dag, previous, manifest)
+        decision = f"state:modified+ against the last successful {state_key} run"
+
+    print(f"🎯 {decision}: {len(reasons)} selected, {len(dag) - len(reasons)} unchanged")
+    create_markdown_artifact(
+        markdown=selection_report(dag, state_key, decision, reasons),
+        key="dbt-state-selection",
+        description=f"{len(reasons)} selected, {len(dag) - len(reasons)} skipped",
+    )
+    return dag.subgraph(reasons)
+
+
+@flow(name="dbt-models")
+def dbt_model_flow(
+    project_dir: str = str(DBT_PROJECT_DIR),
+    target: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    full_refresh: bool = False,
+    selective: bool = False,
+    models: Optional[List[str]] = None,
+):
+    """Run all project models (or just `models`) as concurrent tasks that respect the DAG"""
+    target = target or os.environ.get("DBT_TARGET")
+    print(f"🚀 Running dbt models in {project_dir} (target: {target or 'default'})")
+
+    parse_dir = Path(project_dir) / "target"
+    if models:
+        from prefect.runtime import flow_run
+
+        parse_dir = parse_dir / "runs" / str(flow_run.id)
+    manifest = load_manifest(parse_project(project_dir, target, str(parse_dir)))
+    dag = build_model_dag(manifest)
+    scope = project_scope(manifest, target)
+    print(f"📋 {len(dag)} models, {len(dag.roots())} roots, max {max_workers} in flight")
+
+    restored = restore_timings(target)
+    if restored:
+        print(f"♻️  Restored {restored} dbt timing files")
+
+    if models:
+        wanted = set(models)
+        dag = dag.subgraph(uid for uid in dag.nodes if uid in wanted or dag.name(uid) in wanted)
+        print(f"🎯 Running {len(dag)} selected models")
+
+    # Two projects sharing a cache block, or one project's targets, keep separate state
+    state_key = scope
+    if selective:
+        dag = select_state_models(dag, manifest, state_key, full_refresh)
+
+    adapter = manifest["metadata"].get("adapter_type")
+    invocation_lock = threading.Lock() if adapter in SINGLE_WRITER_ADAPTERS else None
+    if invocation_lock:
+        print(f"⚠️  {adapter} allows a single writer, model invocations will not overlap")
+
+    durations: Dict[str, float] = {}
+
+    def run_one(uid: str) -> bool:
+        name = dag.name(uid)
+        if invocation_lock:
+            invocation_lock.acquire()
+        try:
+            state = run_model(
+                name,
+                project_dir,
+                target,
+                watermark=watermark_config(dag.nodes[uid]),
+                full_refresh=full_refresh,
+                scope=scope,
+                parse_dir=str(parse_dir),
+                return_state=True,
+            )
+        finally:
+            if invocation_lock:
+                invocation_lock.release()
+        if state.is_completed():
+            durations[uid] = state.result()
+            print(f"✅ {name} ({durations[uid]:.1f}s)")
+            return True
+        print(f"❌ {name}: {state.message}")
+        return False
+
+    try:
+        statuses = execute_model_dag(dag, run_one, max_workers)
+    finally:
+        if models:
+            shutil.rmtree(parse_dir, ignore_errors=True)
+
+    rows = [
+        {
+            "model": dag.name(uid),
+            "status": statuses.get(uid, "not run"),
+            "seconds": round(durations.get(uid, 0.0), 2),
+        }
+        for uid in dag.topological_order()
+    ]
+    create_table_artifact(table=rows, key="dbt-model-runs", description="dbt model run results")
+    report_model_timings(dag, target)
+
+    failed = [row["model"] for row in rows if row["status"] == "error"]
+    skipped = [row["model"] for row in rows if row["status"] == "skipped"]
+    print(f"🏁 {len(rows) - len(failed) - len(skipped)} succeeded, {len(failed)} failed, {len(skipped)} skipped")
+    if failed:
+        raise RuntimeError(f"dbt models failed: {failed} (skipped downstream: {skipped})")
+
+    # Unselected models were unchanged, so the warehouse now matches this manifest.
+    # Runs of an explicit model list (such as one partition) don't cover the whole project.
+    if not models:
+        save_state_manifest(state_key, manifest)
+        print(f"💾 Saved state manifest for {state_key}")
+    return statuses
+
+
+if __name__ == "__main__":
+    dbt_model_flow()
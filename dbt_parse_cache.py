@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Cache of dbt parse artifacts keyed on a hash of the project's inputs
+
+The key covers models, macros, seeds, snapshots, tests, installed packages,
+project/package config, the target and vars, plus the dbt version. When the key
+matches, manifest.json and partial_parse.msgpack are restored into target/ and
+the flow skips `dbt parse`; otherwise dbt parses and the result is saved.
+
+Artifacts go to the storage block named by GELLC_DBT_CACHE_BLOCK (for example
+"s3-bucket/gellc-dbt-cache") so short-lived ECS tasks share them, or to
+~/.prefect/dbt-parse-cache when it's not set.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+DBT_CACHE_BLOCK_ENV = "GELLC_DBT_CACHE_BLOCK"
+LOCAL_DBT_CACHE_DIR = Path.home() / ".prefect" / "dbt-parse-cache"
+CACHED_ARTIFACTS = ["manifest.json", "partial_parse.msgpack"]
+
+DEFAULT_SOURCE_PATHS = {
+    "model-paths": ["models"],
+    "macro-paths": ["macros"],
+    "seed-paths": ["seeds"],
+    "snapshot-paths": ["snapshots"],
+    "test-paths": ["tests"],
+    "analysis-paths": ["analyses"],
+}
+PROJECT_FILES = [
+    "dbt_project.yml",
+    "packages.yml",
+    "dependencies.yml",
+    "package-lock.yml",
+    "selectors.yml",
+    ".dbtignore",
+]
+
+
+def _dbt_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("dbt-core")
+    except Exception:
+        return "unknown"
+
+
+def _hash_tree(digest, root: Path, base: Path):
+    if not root.is_dir():
+        return
+    for path in sorted(root.rglob("*")):
+        # Hidden files include the temporary files of an in-flight model generation
+        if path.name.startswith(".") or not path.is_file() or "__pycache__" in path.parts:
+            continue
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            continue
+        digest.update(str(path.relative_to(base)).encode())
+        digest.update(b"\0")
+        digest.update(content)
+        digest.update(b"\0")
+
+
+def project_fingerprint(project_dir, target: Optional[str] = None, vars: Optional[dict] = None) -> str:
+    """Hash everything that can change the result of `dbt parse`"""
+    project_dir = Path(project_dir)
+    config = yaml.safe_load((project_dir / "dbt_project.yml").read_text()) or {}
+
+    digest = hashlib.sha256()
+    digest.update(f"dbt={_dbt_version()};target={target or ''};".encode())
+    digest.update(json.dumps(vars or {}, sort_keys=True, default=str).encode())
+
+    for name in PROJECT_FILES:
+        path = project_dir / name
+        if path.is_file():
+            digest.update(name.encode() + b"\0" + path.read_bytes())
+
+    for key, defaults in DEFAULT_SOURCE_PATHS.items():
+        for source_path in config.get(key, defaults):
+            _hash_tree(digest, project_dir / source_path, project_dir)
+
+    packages_dir = config.get("packages-install-path", "dbt_packages")
+    _hash_tree(digest, project_dir / packages_dir, project_dir)
+    return digest.hexdigest()
+
+
+def get_cache_storage():
+    block_name = os.environ.get(DBT_CACHE_BLOCK_ENV)
+    if block_name:
+        from prefect.blocks.core import Block
+
+        return Block.load(block_name)
+
+    from prefect.filesystems import LocalFileSystem
+
+    LOCAL_DBT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return LocalFileSystem(basepath=str(LOCAL_DBT_CACHE_DIR))
+
+
+def restore_parse_cache(fingerprint: str, target_dir) -> bool:
+    """Copy cached artifacts into `target_dir`, returning False on a cache miss"""
+    storage = get_cache_storage()
+    artifacts = {}
+    for name in CACHED_ARTIFACTS:
+        try:
+            artifacts[name] = storage.read_path(f"{fingerprint}/{name}")
+        except Exception:
+            return False
+
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for name, data in artifacts.items():
+        path = target_dir / name
+        tmp = path.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return True
+
+
+def save_parse_cache(fingerprint: str, target_dir) -> bool:
+    """Store the parse artifacts in `target_dir` under `fingerprint`"""
+    storage = get_cache_storage()
+    target_dir = Path(target_dir)
+    if not all((target_dir / name).is_file() for name in CACHED_ARTIFACTS):
+        print("⚠️  dbt did not write partial parse state, not caching")
+        return False
+    for name in CACHED_ARTIFACTS:
+        storage.write_path(f"{fingerprint}/{name}", (target_dir / name).read_bytes())
+    return True
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Split the dbt model DAG into balanced partitions for several workers
+
+Models are assigned by list scheduling: the model with the longest remaining
+path (using historical durations from dbt_timings.py) is placed on whichever
+partition could start it earliest. A fixed cost is charged for waiting on a
+model from another partition, which keeps dependent chains together.
+
+Each partition is then cut into segments at every cross-partition dependency.
+A segment is run as one subflow; it starts once the previous segment of its
+partition and the segments holding its cross-partition parents have finished.
+"""
+from typing import Dict, List, Tuple
+
+from dbt_dag import ModelDag
+
+# Seconds charged for waiting on another partition (subflow startup and polling)
+CROSS_PARTITION_COST = 30.0
+DEFAULT_MODEL_SECONDS = 5.0
+
+
+def bottom_levels(dag: ModelDag, durations: Dict[str, float]) -> Dict[str, float]:
+    """Longest path from each model to the end of the DAG, including itself"""
+    levels: Dict[str, float] = {}
+    for uid in reversed(dag.topological_order()):
+        downstream = max((levels[child] for child in dag.children[uid]), default=0.0)
+        levels[uid] = durations[uid] + downstream
+    return levels
+
+
+def partition_models(
+    dag: ModelDag,
+    durations: Dict[str, float],
+    partitions: int,
+    cross_partition_cost: float = CROSS_PARTITION_COST,
+) -> Tuple[Dict[str, int], Dict[str, float], float]:
+    """
+    Assign every model to one of `partitions` lanes.
+
+    Returns the partition per model, the simulated start time per model and
+    the simulated makespan.
+    """
+    durations = {uid: durations.get(uid) or DEFAULT_MODEL_SECONDS for uid in dag.nodes}
+    levels = bottom_levels(dag, durations)
+    lane_free = [0.0] * partitions
+    assignment: Dict[str, int] = {}
+    starts: Dict[str, float] = {}
+    finishes: Dict[str, float] = {}
+
+    remaining = {uid: len(parents) for uid, parents in dag.parents.items()}
+    ready = [uid for uid, count in remaining.items() if count == 0]
+    while ready:
+        ready.sort(key=lambda uid: (-levels[uid], uid))
+        uid = ready.pop(0)
+
+        best = None
+        for lane in range(partitions):
+            parents_done = max(
+                (
+                    finishes[parent] + (cross_partition_cost if assignment[parent] != lane else 0.0)
+                    for parent in dag.parents[uid]
+                ),
+                default=0.0,
+            )
+            start = max(lane_free[lane], parents_done)
+            if best is None or start < best[0]:
+                best = (start, lane)
+
+        start, lane = best
+        assignment[uid] = lane
+        starts[uid] = start
+        finishes[uid] = start + durations[uid]
+        lane_free[lane] = finishes[uid]
+
+        for child in dag.children[uid]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+
+    return assignment, starts, max(finishes.values(), default=0.0)
+
+
+def build_segments(dag: ModelDag, assignment: Dict[str, int], starts: Dict[str, float]) -> ModelDag:
+    """
+    Cut partitions into segments at cross-partition dependencies.
+
+    Returns a DAG whose nodes are segments ({"name", "partition", "models",
+    "depends_on"}), ready for execute_model_dag in dbt_flow.py.
+    """
+    segment_of: Dict[str, str] = {}
+    segments: Dict[str, dict] = {}
+    for lane in sorted(set(assignment.values())):
+        lane_models = sorted(
+            (uid for uid, assigned in assignment.items() if assigned == lane),
+            key=lambda uid: (starts[uid], uid),
+        )
+        current = None
+        for uid in lane_models:
+            crosses = any(assignment[parent] != lane for parent in dag.parents[uid])
+            if current is None or crosses:
+                previous = current
+                current = f"partition-{lane}-segment-{len([s for s in segments.values() if s['partition'] == lane])}"
+                segments[current] = {
+                    "name": current,
+                    "partition": lane,
+                    "models": [],
+                    "depends_on": {"nodes": [previous] if previous else []},
+                }
+            segments[current]["models"].append(uid)
+            segment_of[uid] = current
+
+    for segment in segments.values():
+        upstream = set(segment["depends_on"]["nodes"])
+        for uid in segment["models"]:
+            upstream.update(segment_of[parent] for parent in dag.parents[uid])
+        upstream.discard(segment["name"])
+        segment["depends_on"]["nodes"] = sorted(upstream)
+
+    return ModelDag(segments)
+
+
+def partition_summary(dag: ModelDag, assignment: Dict[str, int], durations: Dict[str, float]) -> List[dict]:
+    """Models and expected seconds per partition"""
+    rows = {}
+    for uid, lane in assignment.items():
+        row = rows.setdefault(lane, {"partition": lane, "models": 0, "expected_seconds": 0.0})
+        row["models"] += 1
+        row["expected_seconds"] += durations.get(uid) or DEFAULT_MODEL_SECONDS
+    return [
+        {**row, "expected_seconds": round(row["expected_seconds"], 1)}
+        for _, row in sorted(rows.items())
+    ]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+State-based model selection, the flow's equivalent of `--select state:modified+`
+
+The manifest of the last fully successful run is stored per project and target
+(dbt_dag.project_scope, next to the parse cache, see dbt_parse_cache.py). The next selective run compares the
+current manifest with it and only runs models that are new or changed, plus
+everything downstream of them.
+
+A model counts as modified when its SQL checksum, config, relation
+(database/schema/alias) or any macro it calls (directly or through other
+macros) changed.
+"""
+import json
+from typing import Dict, List, Optional, Set, Tuple
+
+from dbt_dag import ModelDag
+from dbt_parse_cache import get_cache_storage
+
+RELATION_KEYS = ["database", "schema", "alias"]
+
+
+def _state_path(state_key: str) -> str:
+    return f"state/{state_key}/manifest.json"
+
+
+def load_state_manifest(state_key: str) -> Optional[dict]:
+    """Load the manifest saved by the last successful run, if there is one"""
+    try:
+        return json.loads(get_cache_storage().read_path(_state_path(state_key)))
+    except Exception:
+        return None
+
+
+def save_state_manifest(state_key: str, manifest: dict):
+    get_cache_storage().write_path(_state_path(state_key), json.dumps(manifest).encode())
+
+
+def _macro_closure(manifest: dict, macro_ids: List[str]) -> Set[str]:
+    """Macros called by `macro_ids`, following calls between macros"""
+    macros = manifest.get("macros", {})
+    found: Set[str] = set()
+    stack = list(macro_ids)
+    while stack:
+        macro_id = stack.pop()
+        if macro_id in found:
+            continue
+        found.add(macro_id)
+        stack.extend(macros.get(macro_id, {}).get("depends_on", {}).get("macros", []))
+    return found
+
+
+def modified_reason(uid: str, previous: dict, current: dict) -> Optional[str]:
+    """Why model `uid` counts as modified between manifests, or None"""
+    old = previous.get("nodes", {}).get(uid)
+    new = current["nodes"][uid]
+    if old is None:
+        return "new"
+    if old.get("checksum", {}).get("checksum") != new.get("checksum", {}).get("checksum"):
+        return "body"
+    if old.get("config") != new.get("config"):
+        return "config"
+    if any(old.get(key) != new.get(key) for key in RELATION_KEYS):
+        return "relation"
+
+    old_macros, new_macros = previous.get("macros", {}), current.get("macros", {})
+    for macro_id in sorted(_macro_closure(current, new.get("depends_on", {}).get("macros", []))):
+        old_sql = old_macros.get(macro_id, {}).get("macro_sql")
+        if old_sql != new_macros.get(macro_id, {}).get("macro_sql"):
+            return f"macro {macro_id.rsplit('.', 1)[-1]}"
+    return None
+
+
+def select_modified(dag: ModelDag, previous: dict, current: dict) -> Tuple[Set[str], Dict[str, str]]:
+    """
+    Select modified models and their descendants.
+
+    Returns the selected unique_ids and a reason for each one: why it was
+    modified, or "downstream" for models selected only because of a parent.
+    """
+    reasons: Dict[str, str] = {}
+    for uid in dag.nodes:
+        reason = modified_reason(uid, previous, current)
+        if reason:
+            reasons[uid] = reason
+    for uid in dag.descendants(list(reasons)):
+        reasons.setdefault(uid, "downstream")
+    return set(reasons), reasons
+
+
+def selection_report(dag: ModelDag, state_key: str, decision: str, reasons: Dict[str, str]) -> str:
+    """Markdown describing which models a selective run picked and why"""
+    skipped = len(dag) - len(reasons)
+    lines = [
+        f"# dbt state selection ({state_key})",
+        "",
+        f"- **Decision**: {decision}",
+        f"- **Selected**: {len(reasons)} of {len(dag)} models",
+        f"- **Skipped (unchanged)**: {skipped}",
+    ]
+    if reasons:
+        lines += ["", "| Model | Reason |", "|---|---|"]
+        for uid in dag.topological_order():
+            if uid in reasons:
+                lines.append(f"| {dag.name(uid)} | {reasons[uid]} |")
+    return "\n".join(lines)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Timing warehouse for dbt model runs
+
+Every model invocation's run_results.json becomes one Parquet file under
+GELLC_DBT_TIMINGS_DIR (default ~/.prefect/dbt-timings), one folder per target,
+with execution time, rows affected and thread id. Queries read the files with
+an in-memory DuckDB connection. No process ever writes another's file, so
+concurrent flow runs need no database lock and can't lose each other's rows.
+
+When GELLC_DBT_CACHE_BLOCK is set, each file is also uploaded to that storage
+block as its own object, and restore_timings() downloads the ones from the last
+RESTORE_DAYS that aren't local yet, so short-lived ECS tasks keep history.
+
+The report lists the slowest models, the critical path through the DAG and
+models whose latest run regressed against their trailing median.
+"""
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+
+from dbt_dag import ModelDag
+from dbt_parse_cache import DBT_CACHE_BLOCK_ENV, get_cache_storage
+
+TIMINGS_DIR_ENV = "GELLC_DBT_TIMINGS_DIR"
+DEFAULT_TIMINGS_DIR = Path.home() / ".prefect" / "dbt-timings"
+TIMINGS_STORAGE_FOLDER = "timings"
+# Files are named <UTC stamp>-<invocation id>.parquet, so age is read from the name
+STAMP_FORMAT = "%Y%m%dT%H%M%S"
+# History older than this is neither downloaded nor kept locally
+RESTORE_DAYS = 30
+TRAILING_RUNS = 20
+# A model regressed when its latest run took this many times its trailing median...
+REGRESSION_FACTOR = 1.5
+# ...and at least this many seconds longer
+REGRESSION_MIN_SECONDS = 1.0
+
+SCHEMA = """
+create table model_timings (
+    invocation_id varchar,
+    flow_run_id varchar,
+    target varchar,
+    unique_id varchar,
+    model varchar,
+    status varchar,
+    execution_time double,
+    rows_affected bigint,
+    thread_id varchar,
+    started_at timestamp,
+    completed_at timestamp,
+    ingested_at timestamp default current_timestamp
+)
+"""
+
+
+def timings_dir(target: Optional[str] = None) -> Path:
+    folder = re.sub(r"[^A-Za-z0-9_.-]+", "_", target or "default")
+    return Path(os.environ.get(TIMINGS_DIR_ENV, DEFAULT_TIMINGS_DIR)) / folder
+
+
+def _sql_path(path: Path) -> str:
+    return str(path).replace("'", "''")
+
+
+def _list_remote(storage, folder: str) -> List[str]:
+    """File names in a storage block folder (prefect-aws S3Bucket or LocalFileSystem)"""
+    if hasattr(storage, "list_objects"):
+        return [obj["Key"].rsplit("/", 1)[-1] for obj in storage.list_objects(folder)]
+    basepath = getattr(storage, "basepath", None)
+    if basepath and "://" not in basepath:
+        directory = Path(basepath).expanduser() / folder
+        return [path.name for path in directory.glob("*.parquet")] if directory.is_dir() else []
+    raise TypeError(f"Can't list files in a {type(storage).__name__} block")
+
+
+def _is_recent(name: str, cutoff: datetime) -> bool:
+    try:
+        return datetime.strptime(name.split("-", 1)[0], STAMP_FORMAT).replace(tzinfo=timezone.utc) >= cutoff
+    except ValueError:
+        return False
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def restore_timings(target: Optional[str] = None) -> int:
+    """Drop local files older than RESTORE_DAYS and download recent ones from the cache block"""
+    directory = timings_dir(target)
+    directory.mkdir(parents=True, exist_ok=True)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=RESTORE_DAYS)
+    for path in directory.glob("*.parquet"):
+        if not _is_recent(path.name, cutoff):
+            path.unlink(missing_ok=True)
+
+    if not os.environ.get(DBT_CACHE_BLOCK_ENV):
+        return 0
+    folder = f"{TIMINGS_STORAGE_FOLDER}/{directory.name}"
+    try:
+        storage = get_cache_storage()
+        missing = [name for name in _list_remote(storage, folder)
+                   if name.endswith(".parquet") and _is_recent(name, cutoff) and not (directory / name).exists()]
+        for name in missing:
+            _write_atomic(directory / name, storage.read_path(f"{folder}/{name}"))
+    except Exception as e:
+        print(f"⚠️  Could not restore dbt timing history: {e}")
+        return 0
+    return len(missing)
+
+
+def _execute_timing(result: dict) -> dict:
+    for timing in result.get("timing", []):
+        if timing.get("name") == "execute":
+            return timing
+    return {}
+
+
+def ingest_run_results(run_results_path, target: Optional[str] = None, flow_run_id: Optional[str] = None) -> int:
+    """Write one run_results.json as a Parquet file (and upload it), returning the row count"""
+    run_results = json.loads(Path(run_results_path).read_text())
+    invocation_id = run_results.get("metadata", {}).get("invocation_id") or str(uuid.uuid4())
+    rows = []
+    for result in run_results.get("results", []):
+        if not result["unique_id"].startswith("model."):
+            continue
+        timing = _execute_timing(result)
+        rows.append((
+            invocation_id,
+            flow_run_id,
+            target,
+            result["unique_id"],
+            result["unique_id"].rsplit(".", 1)[-1],
+            result.get("status"),
+            result.get("execution_time"),
+            (result.get("adapter_response") or {}).get("rows_affected"),
+            result.get("thread_id"),
+            timing.get("started_at"),
+            timing.get("completed_at"),
+        ))
+    if not rows:
+        return 0
+
+    directory = timings_dir(target)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{datetime.now(timezone.utc).strftime(STAMP_FORMAT)}-{invocation_id}.parquet"
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    connection = duckdb.connect()
+    try:
+        connection.execute(SCHEMA)
+        connection.executemany(
+            "insert into model_timings (invocation_id, flow_run_id, target, unique_id, model, status, "
+            "execution_time, rows_affected, thread_id, started_at, completed_at) "
+            "values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        connection.execute(f"copy model_timings to '{_sql_path(tmp)}' (format parquet)")
+    finally:
+        connection.close()
+    os.replace(tmp, path)
+
+    if os.environ.get(DBT_CACHE_BLOCK_ENV):
+        get_cache_storage().write_path(f"{TIMINGS_STORAGE_FOLDER}/{directory.name}/{path.name}", path.read_bytes())
+    return len(rows)
+
+
+def model_stats(target: Optional[str] = None, trailing_runs: int = TRAILING_RUNS) -> Dict[str, dict]:
+    """Latest duration and the trailing median of earlier successful runs per model"""
+    directory = timings_dir(target)
+    if not any(directory.glob("*.parquet")):
+        return {}
+    connection = duckdb.connect()
+    try:
+        rows = connection.execute(
+            """
+            with ranked as (
+                select
+                    unique_id, model, execution_time, rows_affected, thread_id,
+                    row_number() over (partition by unique_id order by completed_at desc nulls last, ingested_at desc) as run_number
+                from read_parquet(?, union_by_name = true)
+                where status = 'success' and target is not distinct from ?
+            )
+            select
+                unique_id,
+                any_value(model),
+                max(execution_time) filter (where run_number = 1) as latest,
+                max(rows_affected) filter (where run_number = 1) as latest_rows,
+                max(thread_id) filter (where run_number = 1) as latest_thread,
+                median(execution_time) filter (where run_number between 2 and ?) as trailing_median,
+                count(*) filter (where run_number between 2 and ?) as trailing_count
+            from ranked
+            group by unique_id
+            """,
+            [str(directory / "*.parquet"), target, trailing_runs + 1, trailing_runs + 1],
+        ).fetchall()
+    finally:
+        connection.close()
+
+    return {
+        uid: {
+            "model": model,
+            "latest": latest,
+            "rows_affected": latest_rows,
+            "thread_id": latest_thread,
+            "trailing_median": trailing_median,
+            "trailing_runs": trailing_count,
+        }
+        for uid, model, latest, latest_rows, latest_thread, trailing_median, trailing_count in rows
+    }
+
+
+def expected_durations(target: Optional[str] = None, default: float = 1.0) -> Dict[str, float]:
+    """Per-model duration estimate: trailing median, else latest run, else `default`"""
+    durations = {}
+    for uid, stats in model_stats(target).items():
+        durations[uid] = stats["trailing_median"] or stats["latest"] or default
+    return durations
+
+
+def is_regression(stats: dict) -> bool:
+    latest, median = stats["latest"], stats["trailing_median"]
+    if latest is None or median is None:
+        return False
+    return latest >= median * REGRESSION_FACTOR and latest - median >= REGRESSION_MIN_SECONDS
+
+
+def critical_path(dag: ModelDag, durations: Dict[str, float]) -> List[str]:
+    """The chain of models with the largest total duration through the DAG"""
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for uid in dag.topological_order():
+        parent = max(dag.parents[uid], key=lambda p: finish[p], default=None)
+        finish[uid] = durations.get(uid, 0.0) + (finish[parent] if parent else 0.0)
+        previous[uid] = parent
+
+    if not finish:
+        return []
+    uid = max(finish, key=finish.get)
+    path = []
+    while uid:
+        path.append(uid)
+        uid = previous[uid]
+    return list(reversed(path))
+
+
+def build_timing_report(dag: ModelDag, stats: Dict[str, dict], top: int = 10) -> dict:
+    """Slowest models, critical path and regressions for the models in `dag`"""
+    in_dag = {uid: s for uid, s in stats.items() if uid in dag and s["latest"] is not None}
+    slowest = sorted(in_dag.items(), key=lambda item: item[1]["latest"], reverse=True)[:top]
+    durations = {uid: s["latest"] for uid, s in in_dag.items()}
+    path = critical_path(dag, durations)
+    return {
+        "slowest": [
+            {
+                "model": s["model"],
+                "seconds": round(s["latest"], 2),
+                "trailing_median": round(s["trailing_median"], 2) if s["trailing_median"] is not None else None,
+                "rows_affected": s["rows_affected"],
+                "thread_id": s["thread_id"],
+                "regression": is_regression(s),
+            }
+            for _, s in slowest
+        ],
+        "critical_path": [dag.name(uid) for uid in path],
+        "critical_path_seconds": round(sum(durations.get(uid, 0.0) for uid in path), 2),
+        "regressions": [
+            {
+                "model": s["model"],
+                "seconds": round(s["latest"], 2),
+                "trailing_median": round(s["trailing_median"], 2),
+            }
+            for s in in_dag.values()
+            if is_regression(s)
+        ],
+    }
+
+
+def timing_report_markdown(report: dict) -> str:
+    lines = [
+        "# dbt model timings",
+        "",
+        f"**Critical path** ({report['critical_path_seconds']}s): " + " → ".join(report["critical_path"]),
+        "",
+        "## Slowest models",
+        "",
+        "| Model | Seconds | Trailing median | Rows | Thread | Regression |",
+        "|---|---:|---:|---:|---|---|",
+    ]
+    for row in report["slowest"]:
+        lines.append(
+            f"| {row['model']} | {row['seconds']} | {row['trailing_median'] if row['trailing_median'] is not None else '-'} "
+            f"| {row['rows_affected'] if row['rows_affected'] is not None else '-'} | {row['thread_id'] or '-'} "
+            f"| {'⚠️' if row['regression'] else ''} |"
+        )
+    if report["regressions"]:
+        lines += ["", f"## ⚠️ Regressions (≥{REGRESSION_FACTOR}x trailing median)", ""]
+        for row in report["regressions"]:
+            lines.append(f"- **{row['model']}**: {row['seconds']}s vs median {row['trailing_median']}s")
+    return "\n".join(lines)
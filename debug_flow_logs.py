@@ -4,6 +4,10 @@ Debug the flow run to see what went wrong
 """
 import asyncio
 from prefect.client.orchestration import get_client
+from prefect.client.schemas.filters import LogFilter, LogFilterFlowRunId
+from prefect.client.schemas.sorting import FlowRunSort
+
+from prefect_pagination import collect, iter_deployments, iter_flow_runs, iter_logs, iter_work_pools
 
 async def debug_latest_flow_run():
     """Debug the latest flow run to see what went wrong"""
@@ -14,7 +18,7 @@ async def debug_latest_flow_run():
     async with get_client() as client:
         try:
             # Get latest flow runs
-            flow_runs = await client.read_flow_runs(limit=5)
+            flow_runs = await collect(iter_flow_runs(client, sort=FlowRunSort.EXPECTED_START_TIME_DESC, limit=5))
             
             if not flow_runs:
                 print("❌ No flow runs found")
@@ -33,24 +37,19 @@ async def debug_latest_flow_run():
                 
             # Get flow run logs
             print(f"\n📃 Flow run logs:")
-            logs = await client.read_logs(
-                log_filter={"flow_run_id": {"any_": [latest_run.id]}}
-            )
-            
-            if logs:
-                for log in logs:
-                    level = log.level
-                    message = log.message
-                    timestamp = log.timestamp
-                    print(f"   [{timestamp}] {level}: {message}")
-            else:
+            logs = 0
+            async for log in iter_logs(client, log_filter=LogFilter(flow_run_id=LogFilterFlowRunId(any_=[latest_run.id]))):
+                logs += 1
+                level = log.level
+                message = log.message
+                timestamp = log.timestamp
+                print(f"   [{timestamp}] {level}: {message}")
+            if not logs:
                 print("   No logs found - this might indicate the worker didn't pick up the job")
             
             # Check if there are any workers available
             print(f"\n🤖 Checking work pool status...")
-            work_pools = await client.read_work_pools()
-            
-            for pool in work_pools:
+            async for pool in iter_work_pools(client):
                 if pool.name == "gellc-process-pool":
                     print(f"✅ Work pool '{pool.name}' found")
                     print(f"   Type: {pool.type}")
@@ -61,8 +60,7 @@ async def debug_latest_flow_run():
             
             # Check recent deployments
             print(f"\n📦 Recent deployments:")
-            deployments = await client.read_deployments(limit=3)
-            for dep in deployments:
+            async for dep in iter_deployments(client, limit=3):
                 print(f"   - {dep.name} (Work Pool: {dep.work_pool_name})")
             
         except Exception as e:
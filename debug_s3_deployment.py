@@ -5,6 +5,9 @@ Debug the s3-ecs-flow deployment and test it via Prefect API
 import asyncio
 import json
 from prefect import get_client
+from prefect.client.schemas.filters import LogFilter, LogFilterFlowRunId
+
+from prefect_pagination import collect, iter_deployments, iter_logs, iter_workers
 
 async def debug_s3_deployment():
     """Debug and test the s3-ecs-flow deployment"""
@@ -16,10 +19,8 @@ async def debug_s3_deployment():
         
         # 1. List all deployments to find s3-ecs-flow
         print("\n📋 Listing all deployments...")
-        deployments = await client.read_deployments()
-        
         s3_deployment = None
-        for deployment in deployments:
+        async for deployment in iter_deployments(client):
             print(f"  - {deployment.name} (ID: {deployment.id})")
             if deployment.name == "s3-ecs-flow":
                 s3_deployment = deployment
@@ -27,9 +28,6 @@ async def debug_s3_deployment():
         
         if not s3_deployment:
             print("❌ s3-ecs-flow deployment not found!")
-            print("💡 Available deployments:")
-            for deployment in deployments:
-                print(f"  - {deployment.name}")
             return None
         
         # 2. Get deployment details
@@ -53,7 +51,7 @@ async def debug_s3_deployment():
             print(f"  Status: {work_pool.is_paused}")
             
             # Check for workers
-            workers = await client.read_workers_for_work_pool(work_pool.name)
+            workers = await collect(iter_workers(client, work_pool.name))
             print(f"  Workers: {len(workers)} active")
             for worker in workers:
                 print(f"    - {worker.name} (Last seen: {worker.last_heartbeat_time})")
@@ -102,10 +100,8 @@ async def debug_s3_deployment():
                         # Get flow run logs
                         print(f"\n📋 Flow Run Logs:")
                         try:
-                            logs = await client.read_logs(
-                                log_filter={"flow_run_id": {"any_": [flow_run.id]}}
-                            )
-                            for log in logs:
+                            log_filter = LogFilter(flow_run_id=LogFilterFlowRunId(any_=[flow_run.id]))
+                            async for log in iter_logs(client, log_filter=log_filter):
                                 print(f"  {log.timestamp} [{log.level}] {log.message}")
                         except Exception as e:
                             print(f"  ❌ Error reading logs: {e}")
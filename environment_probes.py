@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Probes describing the environment a worker (or flow run) executes in
+
+Each probe returns a small JSON-serializable dict: the Python runtime, installed
+packages, container signals, the working directory and AWS (ECS/EC2) metadata.
+worker_fingerprint.py publishes the combined result for every worker and
+identify_execution_environment.py prints it from inside a flow run.
+
+collect_environment() runs every probe concurrently under one overall deadline,
+so an unreachable metadata endpoint costs at most the deadline, not a timeout per
+request. A probe that hasn't finished in time reports {"error": "timeout"}.
+"""
+import json
+import os
+import platform
+import re
+import socket
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+DEFAULT_DEADLINE_SECONDS = 1.5
+AWS_TIMEOUT_SECONDS = 1.0
+CWD_LISTING_LIMIT = 100
+EC2_METADATA_URL = "http://169.254.169.254/latest"
+# cgroup and mount path segments that mean a container. A segment matches a marker
+# exactly or with a suffix ("docker-<id>.scope", "kubepods-burstable.slice"), except
+# the exact-only ones, which are too short to match as a prefix ("/ecs/<task>/...").
+CONTAINER_MARKERS = ["docker", "containerd", "kubepods", "ecs"]
+EXACT_CONTAINER_MARKERS = {"ecs"}
+_SEGMENT_SEPARATORS = re.compile(r"[/\s:,=]+")
+
+_distribution_index: Optional[Dict[str, str]] = None
+_distribution_index_key: Optional[tuple] = None
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _sys_path_key() -> tuple:
+    """sys.path entries with their mtimes: installing or removing a package changes it"""
+    key = []
+    for entry in sys.path:
+        try:
+            key.append((entry, os.stat(entry or ".").st_mtime_ns))
+        except OSError:
+            key.append((entry, None))
+    return tuple(key)
+
+
+def distribution_index() -> Dict[str, str]:
+    """Installed distributions as {normalized name: version}, built once per sys.path state"""
+    global _distribution_index, _distribution_index_key
+    key = _sys_path_key()
+    if _distribution_index is None or key != _distribution_index_key:
+        index = {}
+        for distribution in metadata.distributions():
+            name = distribution.metadata["Name"]
+            if name:
+                # First match wins, like importlib.metadata.version()
+                index.setdefault(_normalize(name), distribution.version)
+        _distribution_index, _distribution_index_key = dict(sorted(index.items())), key
+    return _distribution_index
+
+
+def package_version(name: str) -> Optional[str]:
+    return distribution_index().get(_normalize(name))
+
+
+def probe_python() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "executable": sys.executable,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "hostname": socket.gethostname(),
+    }
+
+
+def probe_packages() -> dict:
+    """Installed distributions as {name: version}"""
+    return {"packages": dict(distribution_index())}
+
+
+def _segment_is(segment: str, marker: str) -> bool:
+    if segment == marker:
+        return True
+    return marker not in EXACT_CONTAINER_MARKERS and segment.startswith((f"{marker}-", f"{marker}."))
+
+
+def _markers_in(path: str) -> list:
+    """Scan a /proc file line by line for marker path segments, stopping once every marker was seen"""
+    remaining = list(CONTAINER_MARKERS)
+    found = []
+    try:
+        with open(path, errors="replace") as lines:
+            for line in lines:
+                segments = _SEGMENT_SEPARATORS.split(line)
+                for marker in [m for m in remaining if any(_segment_is(segment, m) for segment in segments)]:
+                    remaining.remove(marker)
+                    found.append(marker)
+                if not remaining:
+                    break
+    except OSError:
+        return []
+    return [marker for marker in CONTAINER_MARKERS if marker in found]
+
+
+def probe_container() -> dict:
+    cgroup = _markers_in("/proc/1/cgroup")
+    mountinfo = _markers_in("/proc/self/mountinfo")
+    ecs = bool(os.environ.get("ECS_CONTAINER_METADATA_URI_V4") or os.environ.get("ECS_CONTAINER_METADATA_URI"))
+    return {
+        "container": bool(cgroup or mountinfo or ecs or os.path.exists("/.dockerenv")),
+        "dockerenv": os.path.exists("/.dockerenv"),
+        "cgroup_markers": cgroup,
+        "mountinfo_markers": mountinfo,
+        "ecs": ecs,
+    }
+
+
+def probe_cwd() -> dict:
+    cwd = Path.cwd()
+    try:
+        names = sorted(entry.name for entry in os.scandir(cwd))
+    except OSError:
+        names = []
+    return {"cwd": str(cwd), "cwd_entries": len(names), "cwd_listing": names[:CWD_LISTING_LIMIT]}
+
+
+def _get(url: str, headers: dict = None, method: str = "GET") -> str:
+    request = urllib.request.Request(url, headers=headers or {}, method=method)
+    with urllib.request.urlopen(request, timeout=AWS_TIMEOUT_SECONDS) as response:
+        return response.read().decode()
+
+
+def probe_aws() -> dict:
+    """ECS task metadata when running in ECS, else EC2 instance metadata (IMDSv2)"""
+    ecs_uri = os.environ.get("ECS_CONTAINER_METADATA_URI_V4")
+    if ecs_uri:
+        try:
+            task = json.loads(_get(f"{ecs_uri}/task"))
+            return {
+                "aws": "ecs",
+                "cluster": task.get("Cluster"),
+                "task_arn": task.get("TaskARN"),
+                "task_family": task.get("Family"),
+                "task_revision": task.get("Revision"),
+                "availability_zone": task.get("AvailabilityZone"),
+                "launch_type": task.get("LaunchType"),
+            }
+        except Exception as e:
+            return {"aws": "ecs", "error": str(e)}
+
+    try:
+        token = _get(
+            f"{EC2_METADATA_URL}/api/token",
+            headers={"X-aws-ec2-metadata-token-ttl-seconds": "60"},
+            method="PUT",
+        )
+    except Exception:
+        return {"aws": None}
+    headers = {"X-aws-ec2-metadata-token": token}
+    fields = {
+        "instance_id": "instance-id",
+        "instance_type": "instance-type",
+        "availability_zone": "placement/availability-zone",
+    }
+    with ThreadPoolExecutor(max_workers=len(fields)) as pool:
+        futures = {key: pool.submit(_get, f"{EC2_METADATA_URL}/meta-data/{path}", headers) for key, path in fields.items()}
+    result = {"aws": "ec2"}
+    for key, future in futures.items():
+        try:
+            result[key] = future.result()
+        except Exception:
+            result[key] = None
+    return result
+
+
+PROBES: Dict[str, Callable[[], dict]] = {
+    "python": probe_python,
+    "packages": probe_packages,
+    "container": probe_container,
+    "cwd": probe_cwd,
+    "aws": probe_aws,
+}
+
+
+def run_probes(probes: Dict[str, Callable[[], dict]], deadline: float = DEFAULT_DEADLINE_SECONDS) -> dict:
+    """Run probes concurrently; whatever hasn't finished within `deadline` seconds reports a timeout"""
+    pool = ThreadPoolExecutor(max_workers=len(probes) or 1, thread_name_prefix="probe")
+    futures = {name: pool.submit(probe) for name, probe in probes.items()}
+    wait(futures.values(), timeout=deadline)
+    # Don't wait for stragglers: their own socket timeouts end them in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            results[name] = {"error": "timeout", "deadline_seconds": deadline}
+        elif future.exception():
+            e = future.exception()
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        else:
+            results[name] = future.result()
+    return results
+
+
+def collect_environment(deadline: float = DEFAULT_DEADLINE_SECONDS) -> dict:
+    """Run every probe concurrently, keeping going when one of them fails or times out"""
+    return run_probes(PROBES, deadline)
+
+
+if __name__ == "__main__":
+    started = time.monotonic()
+    environment = collect_environment()
+    print(json.dumps(environment, indent=2))
+    print(f"⏱️  Probed in {time.monotonic() - started:.3f}s", file=sys.stderr)
@@ -4,6 +4,7 @@ Find where the gellc-process-pool workers are actually running
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import collect, iter_flow_runs, iter_workers
 from datetime import datetime
 
 async def investigate_workers():
@@ -13,11 +14,27 @@ async def investigate_workers():
     print("=" * 50)
     
     async with get_client() as client:
+        from prefect.client.schemas.filters import WorkPoolFilter, WorkPoolFilterName
+        from prefect.client.schemas.sorting import FlowRunSort
+        
+        # The pool, its workers and its recent runs are independent reads: run them together
+        work_pool, workers, flow_runs = await asyncio.gather(
+            client.read_work_pool("gellc-process-pool"),
+            collect(iter_workers(client, "gellc-process-pool")),
+            collect(iter_flow_runs(
+                client,
+                work_pool_filter=WorkPoolFilter(name=WorkPoolFilterName(any_=["gellc-process-pool"])),
+                sort=FlowRunSort.START_TIME_DESC,
+                limit=5
+            )),
+            return_exceptions=True,
+        )
         
         # Get detailed info about the work pool
         print("🏊 WORK POOL DETAILS:")
         try:
-            work_pool = await client.read_work_pool("gellc-process-pool")
+            if isinstance(work_pool, Exception):
+                raise work_pool
             print(f"  Name: {work_pool.name}")
             print(f"  Type: {work_pool.type}")
             print(f"  Is paused: {work_pool.is_paused}")
@@ -34,7 +51,8 @@ async def investigate_workers():
         # Get worker details
         print(f"\n👷 WORKER DETAILS:")
         try:
-            workers = await client.read_workers_for_work_pool("gellc-process-pool")
+            if isinstance(workers, Exception):
+                raise workers
             print(f"Total workers: {len(workers)}")
             
             for i, worker in enumerate(workers):
@@ -58,17 +76,8 @@ async def investigate_workers():
         # Check recent flow runs to see execution environment
         print(f"\n📋 RECENT FLOW RUNS FROM THIS POOL:")
         try:
-            from prefect.client.schemas.filters import FlowRunFilter, FlowRunFilterWorkPoolName
-            from prefect.client.schemas.sorting import FlowRunSort
-            
-            # Get recent flow runs from this work pool
-            flow_runs = await client.read_flow_runs(
-                flow_run_filter=FlowRunFilter(
-                    work_pool_name=FlowRunFilterWorkPoolName(any_=["gellc-process-pool"])
-                ),
-                sort=FlowRunSort.START_TIME_DESC,
-                limit=5
-            )
+            if isinstance(flow_runs, Exception):
+                raise flow_runs
             
             if flow_runs:
                 for run in flow_runs:
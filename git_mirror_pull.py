@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Pull step that serves flow code from a local git mirror
+
+GitHub storage clones the whole repository on every flow run. This step keeps
+one bare mirror per repository on the worker (GELLC_GIT_MIRROR_DIR, default
+~/.prefect/git-mirrors) and only fetches the branch tip, shallowly and without
+blobs that aren't checked out. Each run gets its own sparse `git worktree` of
+the commit, limited to the entrypoint's directory (root-level files are always
+included), so concurrent runs never share a working directory. A worktree is
+leased to the flow-run process until it exits; after that the next run of the
+same commit takes it over, reset and cleaned, and the pull takes milliseconds.
+
+Use it in place of GitHub storage or git_clone:
+
+    pull:
+      - git_mirror_pull.pull_from_git_mirror:
+          repository: https://github.com/elanflowsense/gellc-prefect-2.git
+          branch: main
+          entrypoint: my_prefect_flow.py:my_first_flow
+          access_token: "{{ prefect.blocks.secret.github-token }}"
+
+The engine changes into the returned directory before loading the flow.
+
+The token is handed to each git command through its environment as an HTTP
+Authorization header for the repository's host, so it never ends up in the
+mirror's config, on a command line or in an error message.
+"""
+import base64
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+GIT_MIRROR_DIR_ENV = "GELLC_GIT_MIRROR_DIR"
+DEFAULT_GIT_MIRROR_DIR = Path.home() / ".prefect" / "git-mirrors"
+# Worktrees unused for this long are removed on the next pull
+WORKTREE_MAX_IDLE_SECONDS = 24 * 3600
+
+# Worktrees this process is using, with the open lock file that leases each one
+_leases: Dict[str, IO] = {}
+
+
+def git(*args, cwd=None, env: Optional[Dict[str, str]] = None) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True,
+                            env={**os.environ, **env} if env else None)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def mirror_root() -> Path:
+    return Path(os.environ.get(GIT_MIRROR_DIR_ENV, DEFAULT_GIT_MIRROR_DIR))
+
+
+def _auth_env(repository: str, access_token: Optional[str]) -> Optional[Dict[str, str]]:
+    """git config, passed through the environment, that authenticates HTTPS requests to the repository's host"""
+    if not access_token or not repository.startswith("https://"):
+        return None
+    parts = urlsplit(repository)
+    credentials = base64.b64encode(f"x-access-token:{access_token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        # Scoped to scheme, host and port, so the header never goes anywhere else
+        "GIT_CONFIG_KEY_0": f"http.{urlunsplit((parts.scheme, parts.netloc.rpartition('@')[2], '/', '', ''))}.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        "GIT_TERMINAL_PROMPT": "0",
+    }
+
+
+def sparse_paths(entrypoint: Optional[str], paths: Optional[List[str]]) -> List[str]:
+    """Directories to check out: `paths`, else the entrypoint's directory (root files always come along)"""
+    if paths:
+        return sorted({path.strip("/") for path in paths if path.strip("/")})
+    if entrypoint:
+        directory = Path(entrypoint.split(":", 1)[0]).parent
+        if str(directory) != ".":
+            return [directory.as_posix()]
+    return []
+
+
+@contextmanager
+def _locked(path: Path):
+    """Serialize mirror updates between concurrent runs on this machine"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _ensure_mirror(mirror: Path, url: str):
+    """Create the bare mirror, or point its origin at `url` (which also drops credentials stored in older mirrors)"""
+    if not (mirror / "HEAD").exists():
+        git("init", "--bare", "--quiet", str(mirror))
+        git("remote", "add", "origin", url, cwd=mirror)
+        # Let each worktree keep its own sparse-checkout settings. core.bare has to move
+        # to the mirror's own worktree config, or every worktree would count as bare.
+        git("config", "extensions.worktreeConfig", "true", cwd=mirror)
+        git("config", "--unset", "core.bare", cwd=mirror)
+        git("config", "--worktree", "core.bare", "true", cwd=mirror)
+    elif git("config", "--get", "remote.origin.url", cwd=mirror) != url:
+        git("remote", "set-url", "origin", url, cwd=mirror)
+
+
+def _try_lease(worktree: Path) -> Optional[IO]:
+    """Lock the worktree's lease file without blocking; None when another run holds it"""
+    lease = open(worktree.with_name(f"{worktree.name}.lease"), "a")
+    try:
+        fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lease.close()
+        return None
+    return lease
+
+
+def release_worktree(directory: str):
+    """Hand a worktree back for reuse before this process exits (exiting releases it too)"""
+    lease = _leases.pop(str(directory), None)
+    if lease is not None:
+        lease.close()
+
+
+def _local_tip(mirror: Path, branch: str) -> Optional[str]:
+    # Read the ref rather than probing objects: in a blobless mirror a missing
+    # object would be fetched lazily from the remote
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"],
+        cwd=mirror, capture_output=True, text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def _checkout_worktree(mirror: Path, worktrees: Path, prefix: str, commit: str, cone: List[str], auth) -> Path:
+    """Lease an idle worktree of `commit` and reset it, or add a new one"""
+    for worktree in sorted(worktrees.glob(f"{prefix}-*")):
+        if worktree.suffix == ".lease" or not (worktree / ".git").exists():
+            continue
+        lease = _try_lease(worktree)
+        if lease is None:
+            continue
+        _leases[str(worktree)] = lease
+        # Undo whatever the previous run changed or left behind
+        git("reset", "--hard", "--quiet", cwd=worktree, env=auth)
+        git("clean", "-fdxq", cwd=worktree)
+        return worktree
+
+    worktrees.mkdir(parents=True, exist_ok=True)
+    worktree = worktrees / f"{prefix}-{uuid.uuid4().hex[:8]}"
+    _leases[str(worktree)] = _try_lease(worktree)
+    git("worktree", "add", "--quiet", "--detach", "--no-checkout", str(worktree), commit, cwd=mirror)
+    git("sparse-checkout", "set", "--cone", *cone, cwd=worktree)
+    # Blobs of a blobless mirror are fetched lazily here, so this needs the token too
+    git("checkout", "--quiet", "--detach", commit, cwd=worktree, env=auth)
+    _prune_worktrees(mirror, worktrees)
+    return worktree
+
+
+def _prune_worktrees(mirror: Path, worktrees: Path):
+    """Remove worktrees idle for WORKTREE_MAX_IDLE_SECONDS that no run holds"""
+    now = time.time()
+    for worktree in worktrees.iterdir():
+        if worktree.suffix == ".lease" or now - worktree.stat().st_mtime <= WORKTREE_MAX_IDLE_SECONDS:
+            continue
+        lease = _try_lease(worktree)
+        if lease is None:
+            continue
+        try:
+            shutil.rmtree(worktree, ignore_errors=True)
+            Path(lease.name).unlink(missing_ok=True)
+        finally:
+            lease.close()
+    git("worktree", "prune", cwd=mirror)
+
+
+def pull_from_git_mirror(
+    repository: str,
+    branch: str = "main",
+    entrypoint: Optional[str] = None,
+    paths: Optional[List[str]] = None,
+    depth: int = 1,
+    access_token: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> dict:
+    """
+    Update the local mirror of `repository` and return a sparse worktree of `branch`
+    leased to this process.
+
+    Returns {"directory", "commit", "fetched", "seconds"}.
+    """
+    start = time.perf_counter()
+    root = Path(cache_dir) if cache_dir else mirror_root()
+    name = Path(urlsplit(repository).path).name.removesuffix(".git") or "repository"
+    key = f"{name}-{hashlib.sha1(repository.encode()).hexdigest()[:12]}"
+    mirror = root / f"{key}.git"
+    auth = _auth_env(repository, access_token)
+    cone = sparse_paths(entrypoint, paths)
+
+    with _locked(root / f"{key}.lock"):
+        _ensure_mirror(mirror, repository)
+        remote = git("ls-remote", "origin", f"refs/heads/{branch}", cwd=mirror, env=auth)
+        if not remote:
+            raise RuntimeError(f"Branch '{branch}' not found in {repository}")
+        commit = remote.split()[0]
+
+        fetched = False
+        if _local_tip(mirror, branch) != commit:
+            git(
+                "fetch", "--quiet", f"--depth={depth}", "--filter=blob:none", "origin",
+                f"+refs/heads/{branch}:refs/heads/{branch}",
+                cwd=mirror, env=auth,
+            )
+            fetched = True
+
+        paths_key = hashlib.sha1("\n".join(cone).encode()).hexdigest()[:8]
+        worktrees = root / f"{key}.worktrees"
+        worktree = _checkout_worktree(mirror, worktrees, f"{commit[:12]}-{paths_key}", commit, cone, auth)
+        os.utime(worktree)
+
+    seconds = time.perf_counter() - start
+    print(f"📦 {name}@{commit[:12]} {'fetched' if fetched else 'from mirror'} in {seconds * 1000:.0f}ms -> {worktree}")
+    return {"directory": str(worktree), "commit": commit, "fetched": fetched, "seconds": round(seconds, 4)}
@@ -10,109 +10,89 @@ from prefect import get_client
 @task
 def identify_execution_environment():
     """Identify where this task is actually executing"""
-    import sys
     import os
     import platform
     import socket
-    
+    import time
+
+    from environment_probes import DEFAULT_DEADLINE_SECONDS, collect_environment, package_version
+
     print("🔍 EXECUTION ENVIRONMENT IDENTIFICATION")
     print("=" * 50)
-    
+
+    # Every probe runs concurrently; together they never take longer than the deadline
+    started = time.monotonic()
+    environment = collect_environment(deadline=DEFAULT_DEADLINE_SECONDS)
+    python = environment["python"]
+    container = environment["container"]
+    aws = environment["aws"]
+
     # Basic system info
     print(f"🖥️  SYSTEM INFO:")
-    print(f"  Platform: {platform.platform()}")
-    print(f"  Machine: {platform.machine()}")
+    print(f"  Platform: {python.get('platform')}")
+    print(f"  Machine: {python.get('machine')}")
     print(f"  Processor: {platform.processor()}")
-    print(f"  Python: {sys.version}")
-    
+    print(f"  Python: {python.get('python')} ({python.get('implementation')})")
+
     # Network info
     print(f"\n🌐 NETWORK INFO:")
+    hostname = python.get("hostname") or socket.gethostname()
+    print(f"  Hostname: {hostname}")
     try:
-        hostname = socket.gethostname()
-        print(f"  Hostname: {hostname}")
-        
-        # Try to get IP
-        try:
-            ip = socket.gethostbyname(hostname)
-            print(f"  IP Address: {ip}")
-        except:
-            print(f"  IP Address: Could not resolve")
-            
-        # Check if we're in AWS
-        try:
-            import urllib.request
-            # Try AWS metadata service (ECS/EC2)
-            req = urllib.request.Request('http://169.254.169.254/latest/meta-data/instance-id', 
-                                       headers={'User-Agent': 'prefect-debug'})
-            urllib.request.urlopen(req, timeout=2)
-            print(f"  🎯 RUNNING ON AWS! (EC2/ECS)")
-            
-            # Get more AWS metadata
-            try:
-                req = urllib.request.Request('http://169.254.169.254/latest/meta-data/placement/availability-zone')
-                with urllib.request.urlopen(req, timeout=2) as response:
-                    az = response.read().decode()
-                print(f"  AWS AZ: {az}")
-            except:
-                pass
-                
-            # Check if ECS
-            try:
-                if 'ECS_CONTAINER_METADATA_URI' in os.environ:
-                    print(f"  🐳 RUNNING IN ECS CONTAINER!")
-                    print(f"  ECS Metadata URI: {os.environ['ECS_CONTAINER_METADATA_URI']}")
-            except:
-                pass
-                
-        except:
-            print(f"  Not running on AWS (no metadata service)")
-            
-    except Exception as e:
-        print(f"  Error getting network info: {e}")
-    
+        print(f"  IP Address: {socket.gethostbyname(hostname)}")
+    except OSError:
+        print(f"  IP Address: Could not resolve")
+
+    if aws.get("aws") == "ecs":
+        print(f"  🐳 RUNNING IN ECS CONTAINER!")
+        print(f"  ECS Cluster: {aws.get('cluster')}")
+        print(f"  ECS Task: {aws.get('task_family')}:{aws.get('task_revision')} ({aws.get('launch_type')})")
+        print(f"  AWS AZ: {aws.get('availability_zone')}")
+    elif aws.get("aws") == "ec2":
+        print(f"  🎯 RUNNING ON AWS! (EC2)")
+        print(f"  Instance: {aws.get('instance_id')} ({aws.get('instance_type')})")
+        print(f"  AWS AZ: {aws.get('availability_zone')}")
+    elif aws.get("error") == "timeout":
+        print(f"  AWS metadata service did not answer within {DEFAULT_DEADLINE_SECONDS}s")
+    else:
+        print(f"  Not running on AWS (no metadata service)")
+
     # Environment variables
     print(f"\n🔧 RELEVANT ENVIRONMENT VARIABLES:")
-    relevant_env = ['HOME', 'USER', 'PATH', 'PWD', 'HOSTNAME', 'AWS_REGION', 
+    relevant_env = ['HOME', 'USER', 'PATH', 'PWD', 'HOSTNAME', 'AWS_REGION',
                    'AWS_DEFAULT_REGION', 'ECS_CONTAINER_METADATA_URI', 'ECS_CONTAINER_METADATA_URI_V4',
                    'PREFECT_API_URL', 'PREFECT_API_KEY']
-    
+
     for var in relevant_env:
         value = os.environ.get(var, 'NOT SET')
         if 'KEY' in var and value != 'NOT SET':
             value = value[:10] + "..." if len(value) > 10 else value
         print(f"  {var}: {value}")
-    
+
     # Check for containerization signs
     print(f"\n🐳 CONTAINERIZATION SIGNS:")
     container_signs = [
-        ('/proc/1/cgroup', 'docker' in open('/proc/1/cgroup').read() if os.path.exists('/proc/1/cgroup') else False),
-        ('/.dockerenv', os.path.exists('/.dockerenv')),
-        ('/proc/self/mountinfo', 'docker' in open('/proc/self/mountinfo').read() if os.path.exists('/proc/self/mountinfo') else False)
+        ('/proc/1/cgroup', ", ".join(container.get('cgroup_markers') or [])),
+        ('/.dockerenv', container.get('dockerenv')),
+        ('/proc/self/mountinfo', ", ".join(container.get('mountinfo_markers') or [])),
     ]
-    
-    for sign, exists in container_signs:
-        print(f"  {sign}: {'✅ YES' if exists else '❌ NO'}")
-    
+
+    for sign, found in container_signs:
+        print(f"  {sign}: {'✅ YES' if found else '❌ NO'}{f' ({found})' if isinstance(found, str) and found else ''}")
+
     # Current working directory and filesystem
     print(f"\n📁 FILESYSTEM INFO:")
-    print(f"  Current working directory: {os.getcwd()}")
+    print(f"  Current working directory: {environment['cwd'].get('cwd', os.getcwd())}")
     print(f"  Home directory: {os.path.expanduser('~')}")
-    
+
     # Check Python packages
     print(f"\n📦 PYTHON PACKAGES (S3 related):")
-    try:
-        import pkg_resources
-        s3_packages = ['prefect-aws', 'boto3', 's3fs', 'botocore']
-        for package in s3_packages:
-            try:
-                version = pkg_resources.get_distribution(package).version
-                print(f"  ✅ {package}: {version}")
-            except pkg_resources.DistributionNotFound:
-                print(f"  ❌ {package}: NOT INSTALLED")
-    except Exception as e:
-        print(f"  Error checking packages: {e}")
-    
-    return f"Environment identified: {platform.platform()}"
+    for package in ['prefect-aws', 'boto3', 's3fs', 'botocore']:
+        version = package_version(package)
+        print(f"  {'✅' if version else '❌'} {package}: {version or 'NOT INSTALLED'}")
+
+    print(f"\n⏱️  Probed in {time.monotonic() - started:.2f}s")
+    return f"Environment identified: {python.get('platform', platform.platform())}"
 
 @flow
 def identify_environment_flow():
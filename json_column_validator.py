@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Validate every row of the external_ids / source_uuids JSON columns
+
+test_json.sql only catches rows that fail TRY_PARSE_JSON in what it selects.
+This task streams the columns as Arrow record batches and checks each batch
+with DuckDB's vectorized JSON parser (zero-copy over Arrow, multi-threaded),
+validating batches in parallel. Per-table invalid counts and sample offenders
+are published as artifacts.
+
+Sources:
+- a DuckDB database file:       duckdb:///path/to/file.duckdb
+- a folder of Parquet files:     parquet:///path/to/folder  (one <table>.parquet or <table>/ per table)
+- Snowflake (SNOWFLAKE_* env):   snowflake://
+
+    python json_column_validator.py duckdb:///tmp/local.duckdb
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import duckdb
+import pyarrow as pa
+from prefect import flow, task
+from prefect.artifacts import create_markdown_artifact, create_table_artifact
+
+JSON_COLUMNS = ["external_ids", "source_uuids"]
+ID_COLUMN = "uuid"
+DEDUPED_TABLES = {
+    "people": "deduped_people",
+    "deals": "deduped_deals",
+    "loans": "deduped_loans",
+    "payments": "deduped_payments",
+}
+DEFAULT_BATCH_SIZE = 1_000_000
+SAMPLE_OFFENDERS = 10
+SAMPLE_VALUE_CHARS = 200
+
+
+def iter_record_batches(source: str, table: str, columns: List[str], batch_size: int) -> Iterator[pa.RecordBatch]:
+    """Stream `columns` of `table` from `source` as Arrow record batches"""
+    scheme, _, location = source.partition("://")
+
+    if scheme == "duckdb":
+        connection = duckdb.connect(location, read_only=True)
+        try:
+            result = connection.execute(f"select {', '.join(columns)} from {table}")
+            # fetch_record_batch was renamed to_arrow_reader in newer DuckDB releases
+            to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+            yield from to_reader(batch_size)
+        finally:
+            connection.close()
+
+    elif scheme == "parquet":
+        import pyarrow.dataset as ds
+
+        path = Path(location) / f"{table}.parquet"
+        if not path.exists():
+            path = Path(location) / table
+        yield from ds.dataset(str(path), format="parquet").to_batches(
+            columns=columns, batch_size=batch_size
+        )
+
+    elif scheme == "snowflake":
+        import snowflake.connector
+
+        connection = snowflake.connector.connect(
+            account=os.environ["SNOWFLAKE_ACCOUNT"],
+            user=os.environ["SNOWFLAKE_USER"],
+            password=os.environ["SNOWFLAKE_PASSWORD"],
+            role=os.environ.get("SNOWFLAKE_ROLE"),
+            warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE"),
+            database=os.environ.get("SNOWFLAKE_DATABASE"),
+            schema=location or os.environ.get("SNOWFLAKE_SCHEMA"),
+        )
+        try:
+            cursor = connection.cursor()
+            # VARIANT columns come back as JSON text once cast to strings
+            select = ", ".join(
+                column if column == ID_COLUMN else f"to_varchar({column}) as {column}"
+                for column in columns
+            )
+            cursor.execute(f"select {select} from {table}")
+            for arrow_table in cursor.fetch_arrow_batches():
+                yield from arrow_table.to_batches(max_chunksize=batch_size)
+        finally:
+            connection.close()
+
+    else:
+        raise ValueError(f"Unsupported source '{source}' (use duckdb://, parquet:// or snowflake://)")
+
+
+def validate_batch(batch: pa.RecordBatch, json_columns: List[str], want_samples: int) -> dict:
+    """Count invalid JSON values per column in one batch with DuckDB's JSON parser"""
+    connection = duckdb.connect()
+    try:
+        connection.register("batch", pa.Table.from_batches([batch]))
+        invalid_checks = {
+            column: f"{column} is not null and not coalesce(json_valid({column}::varchar), false)"
+            for column in json_columns
+        }
+        counts = connection.execute(
+            "select count(*), "
+            + ", ".join(f"count(*) filter (where {check})" for check in invalid_checks.values())
+            + " from batch"
+        ).fetchone()
+
+        invalid = dict(zip(json_columns, counts[1:]))
+        samples = []
+        if want_samples and any(invalid.values()):
+            samples = connection.execute(
+                " union all ".join(
+                    f"(select {ID_COLUMN}::varchar, '{column}', left({column}::varchar, {SAMPLE_VALUE_CHARS}) "
+                    f"from batch where {check} limit {want_samples})"
+                    for column, check in invalid_checks.items()
+                    if invalid[column]
+                )
+            ).fetchall()
+        return {"rows": counts[0], "invalid": invalid, "samples": samples}
+    finally:
+        connection.close()
+
+
+@task(name="validate-json-columns", task_run_name="validate-json-{label}")
+def validate_table(
+    label: str,
+    source: str,
+    table: str,
+    json_columns: List[str] = JSON_COLUMNS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_threads: Optional[int] = None,
+) -> dict:
+    """Validate every row of `json_columns` in `table`"""
+    start = time.perf_counter()
+    result = {
+        "table": label,
+        "rows": 0,
+        **{f"invalid_{column}": 0 for column in json_columns},
+        "samples": [],
+    }
+
+    threads = max_threads or os.cpu_count() or 1
+    batches = iter_record_batches(source, table, [ID_COLUMN] + json_columns, batch_size)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        # Keep a bounded number of batches in flight so memory stays flat
+        in_flight = []
+        for batch in batches:
+            in_flight.append(pool.submit(validate_batch, batch, json_columns, SAMPLE_OFFENDERS))
+            if len(in_flight) >= threads * 2:
+                _merge_batch_result(result, in_flight.pop(0).result(), json_columns)
+        for future in in_flight:
+            _merge_batch_result(result, future.result(), json_columns)
+
+    result["samples"] = result["samples"][:SAMPLE_OFFENDERS]
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    invalid_total = sum(result[f"invalid_{column}"] for column in json_columns)
+    print(f"{'✅' if not invalid_total else '❌'} {label}: {result['rows']:,} rows, "
+          f"{invalid_total:,} invalid values ({result['seconds']}s)")
+    return result
+
+
+def _merge_batch_result(result: dict, batch_result: dict, json_columns: List[str]):
+    result["rows"] += batch_result["rows"]
+    for column in json_columns:
+        result[f"invalid_{column}"] += batch_result["invalid"][column]
+    if len(result["samples"]) < SAMPLE_OFFENDERS:
+        result["samples"].extend(batch_result["samples"])
+
+
+def publish_validation_report(results: List[dict], json_columns: List[str]):
+    summary = [{key: value for key, value in result.items() if key != "samples"} for result in results]
+    create_table_artifact(
+        table=summary,
+        key="json-column-validation",
+        description="Invalid JSON values per table",
+    )
+
+    lines = ["# Invalid JSON samples", ""]
+    offenders = [(result["table"], sample) for result in results for sample in result["samples"]]
+    if not offenders:
+        lines.append("✅ Every value parsed as JSON.")
+    else:
+        lines += ["| Table | uuid | Column | Value |", "|---|---|---|---|"]
+        for table, (uuid, column, value) in offenders:
+            value = (value or "").replace("|", "\\|").replace("\n", " ")
+            lines.append(f"| {table} | `{uuid}` | {column} | `{value}` |")
+    create_markdown_artifact(
+        markdown="\n".join(lines),
+        key="json-column-validation-samples",
+        description="Sample rows with invalid JSON",
+    )
+
+
+@flow(name="json-column-validation")
+def json_validation_flow(
+    source: str = "snowflake://",
+    tables: Dict[str, str] = DEDUPED_TABLES,
+    json_columns: List[str] = JSON_COLUMNS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """Validate the JSON columns of every deduped table"""
+    print(f"🔍 Validating {', '.join(json_columns)} in {len(tables)} tables from {source}")
+    results = [
+        validate_table(label, source, table, json_columns, batch_size)
+        for label, table in tables.items()
+    ]
+    publish_validation_report(results, json_columns)
+
+    invalid_total = sum(result[f"invalid_{column}"] for result in results for column in json_columns)
+    print(f"🏁 {sum(r['rows'] for r in results):,} rows checked, {invalid_total:,} invalid values")
+    return results
+
+
+if __name__ == "__main__":
+    json_validation_flow(source=sys.argv[1] if len(sys.argv) > 1 else "snowflake://")
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Sustained load generator for a Prefect work pool
+
+Submits flow runs against a deployment following a load profile, waits for
+them to drain and reports how the pool kept up: throughput, the share of runs
+the server marked Late, and queue lag (expected start -> Running) over time.
+
+A profile is a list of stages:
+    60/min:300   60 runs per minute for 300 seconds
+    burst:40     40 runs at once
+    idle:60      submit nothing for 60 seconds
+
+By default everything runs locally: a temporary Prefect server, `--workers`
+process workers and the latency-probe flow from benchmark_flow_latency.py. Pass
+--api-url and --deployment to load an existing server and deployment instead.
+--api-url alone runs the local workers and probe deployment against that server,
+on their own pool (--pool) so production workers never pick the runs up; the
+deployment, and the pool when the load test created it, are deleted afterwards.
+
+    python load_test_work_pool.py --profile 30/min:120 120/min:120 burst:50 --workers 2
+    python load_test_work_pool.py --rate 60 --duration 300 --sleep-seconds 5
+
+Results: load_runs.csv (one row per run), load_timeseries.csv and load_summary.html.
+"""
+import argparse
+import asyncio
+import csv
+import html
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmark_flow_latency import (
+    delete_work_pool,
+    latency_probe_flow,
+    percentile,
+    prepare_local,
+    prepare_work_pool,
+    start_prefect_server,
+    start_worker,
+)
+from prefect_pagination import collect, iter_flow_runs
+
+SUBMIT_CONCURRENCY = 10
+LOAD_TEST_POOL = "gellc-load-test"
+
+
+def parse_profile(stages: List[str]) -> List[float]:
+    """Turn profile stages into submission offsets in seconds from the start"""
+    offsets: List[float] = []
+    clock = 0.0
+    for stage in stages:
+        kind, _, value = stage.partition(":")
+        if kind == "burst":
+            offsets += [clock] * int(value)
+        elif kind == "idle":
+            clock += float(value)
+        elif kind.endswith("/min"):
+            rate, seconds = float(kind[: -len("/min")]), float(value)
+            interval = 60.0 / rate if rate else seconds
+            count = int(seconds / interval) if rate else 0
+            offsets += [clock + i * interval for i in range(count)]
+            clock += seconds
+        else:
+            raise ValueError(f"Unknown profile stage '{stage}' (use N/min:SECONDS, burst:N or idle:SECONDS)")
+    return offsets
+
+
+async def submit_runs(
+    client, deployment_id, offsets: List[float], tag: str, parameters: dict
+) -> Tuple[Dict[str, float], List[str]]:
+    """Create a flow run at each offset, returning {flow_run_id: submitted_at} and submit errors"""
+    semaphore = asyncio.Semaphore(SUBMIT_CONCURRENCY)
+    start = time.monotonic()
+    submitted: Dict[str, float] = {}
+    errors: List[str] = []
+
+    async def submit(offset: float):
+        await asyncio.sleep(max(0.0, offset - (time.monotonic() - start)))
+        async with semaphore:
+            try:
+                flow_run = await client.create_flow_run_from_deployment(
+                    deployment_id, parameters=parameters, tags=[tag]
+                )
+            except Exception as e:
+                # An API that can't keep up with submissions is a result too
+                errors.append(str(e).splitlines()[0])
+                return
+        submitted[str(flow_run.id)] = time.time()
+
+    tasks = [asyncio.create_task(submit(offset)) for offset in offsets]
+    total = len(tasks)
+    while tasks:
+        done, pending = await asyncio.wait(tasks, timeout=10)
+        tasks = list(pending)
+        for task in done:
+            task.result()
+        print(f"📤 {total - len(tasks)}/{total} runs submitted ({len(errors)} errors)")
+    return submitted, errors
+
+
+async def read_tagged_runs(client, tag: str) -> list:
+    from prefect.client.schemas.filters import FlowRunFilter, FlowRunFilterTags
+    from prefect.client.schemas.sorting import FlowRunSort
+
+    return await collect(iter_flow_runs(
+        client, flow_run_filter=FlowRunFilter(tags=FlowRunFilterTags(all_=[tag])), sort=FlowRunSort.ID_DESC
+    ))
+
+
+async def wait_for_drain(client, tag: str, expected: int, timeout: float) -> list:
+    deadline = time.monotonic() + timeout
+    while True:
+        runs = await read_tagged_runs(client, tag)
+        unfinished = [run for run in runs if not (run.state and run.state.is_final())]
+        if len(runs) >= expected and not unfinished:
+            return runs
+        if time.monotonic() > deadline:
+            print(f"⚠️  Drain timeout with {len(unfinished)} runs unfinished")
+            return runs
+        print(f"⏳ {len(unfinished)} runs still queued or running")
+        await asyncio.sleep(5)
+
+
+async def was_late(client, flow_run_id, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        states = await client.read_flow_run_states(flow_run_id)
+    return any(state.name == "Late" for state in states)
+
+
+def _ts(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+def run_rows(runs: list, submitted: Dict[str, float], late: Dict[str, bool]) -> List[dict]:
+    rows = []
+    for run in runs:
+        expected, started = _ts(run.expected_start_time), _ts(run.start_time)
+        rows.append({
+            "flow_run_id": str(run.id),
+            "submitted_at": submitted.get(str(run.id)),
+            "expected_start": expected,
+            "started_at": started,
+            "ended_at": _ts(run.end_time),
+            "final_state": run.state.name if run.state else "",
+            "late": late.get(str(run.id), False),
+            "lag_seconds": round(started - expected, 3) if started and expected else None,
+        })
+    return sorted(rows, key=lambda row: row["expected_start"] or 0)
+
+
+def timeseries(rows: List[dict], bucket_seconds: float) -> List[dict]:
+    """Submissions, completions, queue depth and lag per time bucket"""
+    if not rows:
+        return []
+    origin = min(row["expected_start"] for row in rows)
+    horizon = max(row["ended_at"] or row["expected_start"] for row in rows)
+    series = []
+    t = origin
+    while t <= horizon:
+        end = t + bucket_seconds
+        started = [row for row in rows if row["started_at"] and t <= row["started_at"] < end]
+        completed = [row for row in rows if row["ended_at"] and t <= row["ended_at"] < end]
+        queued = [
+            row for row in rows
+            if row["expected_start"] < end and (row["started_at"] is None or row["started_at"] >= end)
+        ]
+        lags = [row["lag_seconds"] for row in started if row["lag_seconds"] is not None]
+        series.append({
+            "t_seconds": round(t - origin, 1),
+            "submitted": sum(1 for row in rows if t <= row["expected_start"] < end),
+            "started": len(started),
+            "completed": len(completed),
+            "throughput_per_min": round(len(completed) * 60 / bucket_seconds, 1),
+            "queue_depth": len(queued),
+            "late_queued": sum(1 for row in queued if row["late"]),
+            "lag_p50": round(percentile(lags, 50), 2) if lags else None,
+            "lag_max": round(max(lags), 2) if lags else None,
+        })
+        t = end
+    return series
+
+
+def summarize(rows: List[dict], series: List[dict]) -> dict:
+    lags = [row["lag_seconds"] for row in rows if row["lag_seconds"] is not None]
+    completed = [row for row in rows if row["final_state"] == "Completed"]
+    span = (
+        max(row["ended_at"] for row in completed) - min(row["expected_start"] for row in rows)
+        if completed else 0.0
+    )
+    return {
+        "runs": len(rows),
+        "completed": len(completed),
+        "failed_or_crashed": sum(1 for row in rows if row["final_state"] not in ("Completed", "")),
+        "late_runs": sum(1 for row in rows if row["late"]),
+        "late_rate": round(sum(1 for row in rows if row["late"]) / len(rows), 3) if rows else 0.0,
+        "throughput_per_min": round(len(completed) * 60 / span, 1) if span else 0.0,
+        "peak_throughput_per_min": max((point["throughput_per_min"] for point in series), default=0.0),
+        "max_queue_depth": max((point["queue_depth"] for point in series), default=0),
+        "lag_p50": round(percentile(lags, 50), 2) if lags else None,
+        "lag_p95": round(percentile(lags, 95), 2) if lags else None,
+        "lag_max": round(max(lags), 2) if lags else None,
+    }
+
+
+def svg_chart(series: List[dict], keys: List[str], title: str, width: int = 720, height: int = 220) -> str:
+    """A small inline SVG line chart of `keys` over t_seconds"""
+    colors = ["#2563eb", "#dc2626", "#16a34a", "#9333ea"]
+    points = [p for p in series if any(p[key] is not None for key in keys)]
+    if not points:
+        return ""
+    max_t = max(p["t_seconds"] for p in points) or 1
+    max_y = max((p[key] or 0) for p in points for key in keys) or 1
+    pad = 30
+
+    def xy(p, key):
+        x = pad + (width - 2 * pad) * p["t_seconds"] / max_t
+        y = height - pad - (height - 2 * pad) * (p[key] or 0) / max_y
+        return f"{x:.1f},{y:.1f}"
+
+    lines = [
+        f'<polyline fill="none" stroke="{colors[i % len(colors)]}" stroke-width="2" '
+        f'points="{" ".join(xy(p, key) for p in points)}"/>'
+        for i, key in enumerate(keys)
+    ]
+    legend = " ".join(
+        f'<span style="color:{colors[i % len(colors)]}">■ {html.escape(key)}</span>' for i, key in enumerate(keys)
+    )
+    return (
+        f"<h3>{html.escape(title)}</h3><div>{legend}</div>"
+        f'<svg width="{width}" height="{height}" style="border:1px solid #ddd">'
+        f'<text x="{pad}" y="15" font-size="11">max {max_y:g}</text>'
+        f'<text x="{width - pad - 60}" y="{height - 8}" font-size="11">{max_t:g}s</text>'
+        + "".join(lines) + "</svg>"
+    )
+
+
+def write_html(path: Path, summary: dict, series: List[dict], settings: dict):
+    rows = "".join(
+        f"<tr><th>{html.escape(key)}</th><td>{html.escape(str(value))}</td></tr>"
+        for key, value in {**settings, **summary}.items()
+    )
+    path.write_text(
+        "<!doctype html><html><head><meta charset='utf-8'><title>Work pool load test</title></head>"
+        "<body style='font-family:sans-serif'>"
+        f"<h1>Load test: {html.escape(summary['pool'])}</h1>"
+        f"<table border='1' cellpadding='4' style='border-collapse:collapse'>{rows}</table>"
+        + svg_chart(series, ["submitted", "completed", "queue_depth"], "Runs per bucket and queue depth")
+        + svg_chart(series, ["lag_p50", "lag_max"], "Queue lag (seconds, expected start -> Running)")
+        + svg_chart(series, ["late_queued"], "Late runs waiting")
+        + "</body></html>"
+    )
+
+
+def write_csv(path: Path, rows: List[dict]):
+    if not rows:
+        path.write_text("")
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+async def run_load_test(args, offsets: List[float]) -> Tuple[List[dict], List[dict], dict]:
+    from prefect.client.orchestration import get_client
+
+    tag = f"load-test-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+    async with get_client() as client:
+        if args.deployment:
+            deployment = await client.read_deployment_by_name(args.deployment)
+            deployment_id, pool = deployment.id, deployment.work_pool_name
+        else:
+            flow_id = await client.create_flow(latency_probe_flow)
+            deployment_id, pool = await client.create_deployment(
+                flow_id=flow_id,
+                name="load-test",
+                work_pool_name=args.pool,
+                entrypoint="benchmark_flow_latency.py:latency_probe_flow",
+                pull_steps=prepare_local(),
+                tags=["benchmark", "load-test"],
+            ), args.pool
+
+        try:
+            parameters = {} if args.deployment else {"sleep_seconds": args.sleep_seconds}
+            print(f"🚀 Submitting {len(offsets)} runs over {max(offsets, default=0):.0f}s (tag {tag})")
+            submitted, errors = await submit_runs(client, deployment_id, offsets, tag, parameters)
+            for error in sorted(set(errors)):
+                print(f"❌ Submit error: {error}")
+            runs = await wait_for_drain(client, tag, len(submitted), args.drain_timeout)
+
+            semaphore = asyncio.Semaphore(SUBMIT_CONCURRENCY)
+            late_flags = await asyncio.gather(*(was_late(client, run.id, semaphore) for run in runs))
+            late = {str(run.id): flag for run, flag in zip(runs, late_flags)}
+        finally:
+            if not args.deployment:
+                await client.delete_deployment(deployment_id)
+                print("🧹 Deleted the load-test deployment")
+
+    rows = run_rows(runs, submitted, late)
+    series = timeseries(rows, args.bucket_seconds)
+    return rows, series, {"pool": pool, "submit_errors": len(errors), **summarize(rows, series)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", nargs="+", help="Stages: N/min:SECONDS, burst:N, idle:SECONDS")
+    parser.add_argument("--rate", type=float, default=30.0, help="Runs per minute (without --profile)")
+    parser.add_argument("--duration", type=float, default=120.0, help="Seconds (without --profile)")
+    parser.add_argument("--api-url", help="Use this Prefect API instead of starting a temporary server")
+    parser.add_argument("--deployment", help="flow/deployment on the --api-url server to load "
+                                               "(default: a latency-probe deployment on --pool)")
+    parser.add_argument("--pool", default=LOAD_TEST_POOL, help="Pool for the local workers, created when missing")
+    parser.add_argument("--workers", type=int, help="Local process workers to start (default 1)")
+    parser.add_argument("--worker-limit", type=int, help="Max concurrent runs per local worker")
+    parser.add_argument("--query-seconds", type=float, default=5.0, help="Local worker polling interval")
+    parser.add_argument("--sleep-seconds", type=float, help="How long each probe run works (default 0)")
+    parser.add_argument("--late-after", type=float, default=15.0, help="Seconds before the local server marks runs Late")
+    parser.add_argument("--bucket-seconds", type=float, default=10.0, help="Time series resolution")
+    parser.add_argument("--drain-timeout", type=float, default=900.0, help="Seconds to wait for runs to finish")
+    parser.add_argument("--output-dir", default="load-test", help="Where the results go")
+    args = parser.parse_args()
+    if args.deployment:
+        if not args.api_url:
+            parser.error("--deployment needs --api-url: a temporary server has no deployments")
+        local_only = [flag for flag, value in [("--workers", args.workers), ("--worker-limit", args.worker_limit),
+                                               ("--sleep-seconds", args.sleep_seconds)] if value is not None]
+        if local_only or args.pool != LOAD_TEST_POOL:
+            parser.error(f"{', '.join(local_only or ['--pool'])}: not used with --deployment, "
+                         "which runs on its own pool and workers")
+    args.workers = 1 if args.workers is None else args.workers
+    args.sleep_seconds = 0.0 if args.sleep_seconds is None else args.sleep_seconds
+
+    offsets = parse_profile(args.profile or [f"{args.rate:g}/min:{args.duration:g}"])
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workdir = Path(tempfile.mkdtemp(prefix="load-test-"))
+    processes: List[subprocess.Popen] = []
+    created_pool = False
+    try:
+        api_url = args.api_url
+        if not api_url:
+            print("🚀 Starting a temporary Prefect server...")
+            server, api_url = start_prefect_server(
+                workdir, env={"PREFECT_API_SERVICES_LATE_RUNS_AFTER_SECONDS": str(args.late_after)}
+            )
+            processes.append(server)
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            if not args.deployment:
+                created_pool = asyncio.run(prepare_work_pool(args.pool))
+                print(f"👷 Starting {args.workers} process workers on {args.pool}")
+                for i in range(args.workers):
+                    processes.append(start_worker(
+                        api_url,
+                        workdir / f"worker-{i}",
+                        output_dir / f"worker-{i}.log",
+                        args.query_seconds,
+                        limit=args.worker_limit,
+                        pool=args.pool,
+                    ))
+            rows, series, summary = asyncio.run(run_load_test(args, offsets))
+
+        settings = {
+            "profile": " ".join(args.profile or [f"{args.rate:g}/min:{args.duration:g}"]),
+            "workers": args.workers if not args.deployment else "external",
+            "sleep_seconds": args.sleep_seconds,
+        }
+        write_csv(output_dir / "load_runs.csv", rows)
+        write_csv(output_dir / "load_timeseries.csv", series)
+        write_html(output_dir / "load_summary.html", summary, series, settings)
+
+        print("\n📊 Summary")
+        for key, value in summary.items():
+            print(f"   {key}: {value}")
+        print(f"💾 Results written to {output_dir}/")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        # Only after the workers have stopped, or they would recreate the pool on their next poll
+        if created_pool and args.api_url:
+            from prefect.settings import PREFECT_API_URL, temporary_settings
+
+            with temporary_settings({PREFECT_API_URL: args.api_url}):
+                asyncio.run(delete_work_pool(args.pool))
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Optional tracemalloc memory tracing for flow runs
+
+Wrap a flow body in `trace_memory_run()` and enable it with a flow parameter or the
+GELLC_TRACE_MEMORY environment variable:
+
+    @flow
+    def my_first_flow(trace_memory: bool = False):
+        with trace_memory_run(trace_memory):
+            ...
+
+Allocations are snapshotted at the start and end of the block. The top growth
+sites (file and line) are published as a markdown artifact, and flows that
+retain memory in several consecutive runs on the same worker are flagged. Process workers start a fresh process per flow run, so the history is
+kept in a small JSON file per worker host, updated under a file lock.
+
+tracemalloc only sees the flow-run process. When that process was started by a
+`prefect worker` on the same host, the worker's RSS is sampled too, so growth in
+the long-lived worker itself shows up across runs.
+"""
+import fcntl
+import gc
+import json
+import os
+import socket
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from run_artifacts import artifact_key, current_run_info
+
+TRACE_MEMORY_ENV = "GELLC_TRACE_MEMORY"
+HISTORY_FILE = Path.home() / ".prefect" / "memory-history.json"
+TOP_SITES = 15
+TRACE_FRAMES = 1
+# Flag a flow once it has retained memory this many runs in a row, or a worker
+# once its RSS has grown after this many runs in a row...
+LEAK_CONSECUTIVE_RUNS = 3
+# ...by at least this much each time
+LEAK_MIN_GROWTH_BYTES = 512 * 1024
+HISTORY_LENGTH = 20
+ENABLED_VALUES = {"1", "true", "yes", "on"}
+
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process (Linux reports KiB)"""
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+def _worker_rss() -> Optional[Tuple[int, int]]:
+    """(pid, RSS) of the Prefect worker that started this process, when there is one (Linux)"""
+    ppid = os.getppid()
+    try:
+        cmdline = Path(f"/proc/{ppid}/cmdline").read_bytes().replace(b"\0", b" ").decode(errors="replace")
+        if "prefect" not in cmdline or " worker " not in f"{cmdline} ":
+            return None
+        for line in Path(f"/proc/{ppid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return ppid, int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _load_history() -> dict:
+    try:
+        return json.loads(HISTORY_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _append_history(key: str, value: int) -> List[int]:
+    """Append to one series of the history file and return the series"""
+    try:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        # Concurrent flow runs on one host would otherwise drop each other's entries
+        with open(HISTORY_FILE.with_suffix(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                history = _load_history()
+                runs = (history.get(key, []) + [value])[-HISTORY_LENGTH:]
+                history[key] = runs
+                tmp_path = HISTORY_FILE.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(history))
+                tmp_path.replace(HISTORY_FILE)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except OSError as e:
+        print(f"⚠️  Could not save memory history: {e}")
+        return [value]
+    return runs
+
+
+def record_retained_memory(flow_name: str, retained_bytes: int) -> List[int]:
+    """Append a run's retained memory to this worker's history and return it"""
+    return _append_history(f"{socket.gethostname()}:{flow_name}", retained_bytes)
+
+
+def record_worker_rss(pid: int, rss_bytes: int) -> List[int]:
+    """Append the worker's RSS at the end of a run to its history and return it"""
+    return _append_history(f"{socket.gethostname()}:worker:{pid}", rss_bytes)
+
+
+def is_growing(runs: List[int]) -> bool:
+    """True when each of the last LEAK_CONSECUTIVE_RUNS runs retained at least LEAK_MIN_GROWTH_BYTES"""
+    if len(runs) < LEAK_CONSECUTIVE_RUNS:
+        return False
+    return all(retained >= LEAK_MIN_GROWTH_BYTES for retained in runs[-LEAK_CONSECUTIVE_RUNS:])
+
+
+def rss_is_growing(rss_history: List[int]) -> bool:
+    """True when the worker's RSS rose by LEAK_MIN_GROWTH_BYTES after each of the last LEAK_CONSECUTIVE_RUNS runs"""
+    if len(rss_history) < LEAK_CONSECUTIVE_RUNS + 1:
+        return False
+    recent = rss_history[-(LEAK_CONSECUTIVE_RUNS + 1):]
+    return all(
+        later - earlier >= LEAK_MIN_GROWTH_BYTES
+        for earlier, later in zip(recent, recent[1:])
+    )
+
+
+def build_memory_report(flow_name, stats, retained, peak, runs, growing, elapsed, worker=None) -> str:
+    """`worker` is (pid, RSS history) of the worker that started this run, if known"""
+    peak_rss = _peak_rss_bytes()
+    lines = [
+        f"# Memory report: {flow_name}",
+        "",
+        f"- **Measured in**: flow-run process {os.getpid()} on {socket.gethostname()}. Traced figures are Python "
+        "allocations inside the traced block of this process, not the worker's.",
+        f"- **Duration**: {elapsed:.2f}s",
+        f"- **Retained by run**: {_format_bytes(retained)}",
+        f"- **Traced peak**: {_format_bytes(peak)}",
+    ]
+    if peak_rss is not None:
+        lines.append(f"- **Process peak RSS**: {_format_bytes(peak_rss)}")
+    lines.append(
+        f"- **Retained history on {socket.gethostname()}**: "
+        + ", ".join(_format_bytes(r) for r in runs[-LEAK_CONSECUTIVE_RUNS - 1:])
+    )
+    if worker is not None:
+        worker_pid, worker_runs = worker
+        lines.append(
+            f"- **Worker {worker_pid} RSS after recent runs**: "
+            + ", ".join(_format_bytes(r) for r in worker_runs[-LEAK_CONSECUTIVE_RUNS - 1:])
+        )
+    else:
+        lines.append("- **Worker RSS**: not sampled (this process was not started by a local `prefect worker`)")
+    if growing:
+        lines += [
+            "",
+            f"⚠️ **Possible leak**: each of the last {LEAK_CONSECUTIVE_RUNS} runs on this worker retained at least "
+            f"{_format_bytes(LEAK_MIN_GROWTH_BYTES)}.",
+        ]
+    if worker is not None and rss_is_growing(worker[1]):
+        lines += [
+            "",
+            f"⚠️ **Worker growth**: worker {worker[0]}'s RSS grew after each of the last {LEAK_CONSECUTIVE_RUNS} runs.",
+        ]
+
+    lines += [
+        "",
+        "## Top growth sites",
+        "",
+        "| File:line | Growth | Blocks | Total |",
+        "|---|---:|---:|---:|",
+    ]
+    for stat in stats[:TOP_SITES]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"| `{frame.filename}:{frame.lineno}` | {_format_bytes(stat.size_diff)} "
+            f"| {stat.count_diff:+,} | {_format_bytes(stat.size)} |"
+        )
+    return "\n".join(lines)
+
+
+def _publish_report(flow_name: str, markdown: str, growing: bool):
+    try:
+        from prefect.artifacts import create_markdown_artifact
+
+        create_markdown_artifact(
+            markdown=markdown,
+            key=artifact_key("memory", flow_name),
+            description="Possible memory leak" if growing else "Memory growth report",
+        )
+    except Exception as e:
+        print(f"⚠️  Could not create memory artifact: {e}")
+
+
+@contextmanager
+def trace_memory_run(enabled: Optional[bool] = None):
+    """Trace allocations in the wrapped block when enabled or GELLC_TRACE_MEMORY is set"""
+    if not enabled:
+        enabled = os.environ.get(TRACE_MEMORY_ENV, "").strip().lower() in ENABLED_VALUES
+    if not enabled:
+        yield
+        return
+
+    flow_name, _ = current_run_info()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+
+    print("🧠 Memory tracing enabled")
+    gc.collect()
+    start = time.perf_counter()
+    start_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    start_size, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        end_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        end_size, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        stats = [
+            stat
+            for stat in end_snapshot.compare_to(start_snapshot, "lineno")
+            if stat.size_diff > 0
+        ]
+        retained = end_size - start_size
+        runs = record_retained_memory(flow_name, retained)
+        growing = is_growing(runs)
+        sampled = _worker_rss()
+        worker = (sampled[0], record_worker_rss(*sampled)) if sampled else None
+
+        print(f"🧠 Retained {_format_bytes(retained)}, traced peak {_format_bytes(peak)}")
+        if growing:
+            print(f"⚠️  {flow_name} retained memory in {LEAK_CONSECUTIVE_RUNS} runs in a row")
+
+        report = build_memory_report(flow_name, stats, retained, peak, runs, growing, elapsed, worker)
+        _publish_report(flow_name, report, growing)
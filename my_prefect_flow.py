@@ -1,14 +1,20 @@
 from prefect import flow, task
 
+from memory_hooks import trace_memory_run
+from profiling_hooks import profile_run
+
 # Define a simple task
 @task
 def say_hello(name: str):
     print(f"Hello, {name}!")
 
 # Define a flow
+# Set `profile` to "sampling" or "cprofile" (or GELLC_PROFILE on the worker) to profile a run
+# Set `trace_memory` (or GELLC_TRACE_MEMORY=1 on the worker) to report memory growth
 @flow
-def my_first_flow():
-    say_hello("World")
+def my_first_flow(profile: str = "", trace_memory: bool = False):
+    with profile_run(profile), trace_memory_run(trace_memory):
+        say_hello("World")
 
 # Run the flow
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Async iterators over every page of the Prefect list endpoints we use
+
+`read_deployments()`, `read_flow_runs()` and friends return one page: either the
+server's default page (silently truncated) or one huge page. `paginate` walks
+the endpoint `page_size` objects at a time and requests the next page while the
+caller works through the current one, so at most two pages are in memory.
+Stop early with `limit=` or by breaking out of the loop; an outstanding
+prefetch is cancelled.
+
+    async for deployment in iter_deployments(client, deployment_filter=...):
+        ...
+    recent = await collect(iter_flow_runs(client, sort=FlowRunSort.START_TIME_DESC, limit=5))
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+# The API's maximum page size (PREFECT_API_DEFAULT_LIMIT); a larger page would come back short
+DEFAULT_PAGE_SIZE = 200
+
+
+async def paginate(
+    read: Callable[..., Awaitable[list]],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    limit: Optional[int] = None,
+    prefetch: bool = True,
+    **kwargs,
+) -> AsyncIterator:
+    """Yield every object `read(**kwargs, limit=..., offset=...)` returns, page by page"""
+
+    def fetch(offset: int):
+        size = page_size if limit is None else min(page_size, limit - offset)
+        return size, asyncio.ensure_future(read(**kwargs, limit=size, offset=offset))
+
+    offset = 0
+    size, pending = fetch(offset)
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            offset += len(page)
+            # A short page is the last one
+            more = len(page) == size and (limit is None or offset < limit)
+            if more and prefetch:
+                size, pending = fetch(offset)
+            for item in page:
+                yield item
+            if more and not prefetch:
+                size, pending = fetch(offset)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+async def collect(items: AsyncIterator) -> list:
+    return [item async for item in items]
+
+
+def iter_deployments(client, **kwargs) -> AsyncIterator:
+    return paginate(client.read_deployments, **kwargs)
+
+
+def iter_flows(client, **kwargs) -> AsyncIterator:
+    return paginate(client.read_flows, **kwargs)
+
+
+def iter_flow_runs(client, **kwargs) -> AsyncIterator:
+    return paginate(client.read_flow_runs, **kwargs)
+
+
+def iter_work_pools(client, **kwargs) -> AsyncIterator:
+    return paginate(client.read_work_pools, **kwargs)
+
+
+def iter_work_queues(client, work_pool_name: str, **kwargs) -> AsyncIterator:
+    return paginate(client.read_work_queues, work_pool_name=work_pool_name, **kwargs)
+
+
+def iter_workers(client, work_pool_name: str, **kwargs) -> AsyncIterator:
+    return paginate(client.read_workers_for_work_pool, work_pool_name=work_pool_name, **kwargs)
+
+
+def iter_logs(client, **kwargs) -> AsyncIterator:
+    return paginate(client.read_logs, **kwargs)
+
+
+def iter_variables(client, variable_filter=None, **kwargs) -> AsyncIterator:
+    """client.read_variables() has neither offset nor filter, so page the filter endpoint directly"""
+    from prefect.client.schemas.objects import Variable
+
+    async def read_variables(limit: int, offset: int) -> List[Variable]:
+        body = {"limit": limit, "offset": offset}
+        if variable_filter:
+            body["variables"] = variable_filter.dict(json_compatible=True, exclude_unset=True)
+        response = await client._client.post("/variables/filter", json=body)
+        return [Variable.parse_obj(variable) for variable in response.json()]
+
+    return paginate(read_variables, **kwargs)
+
+
+async def deployments_named(client, name: str) -> list:
+    """Deployments called `name` (any flow), filtered on the server rather than by listing everything"""
+    from prefect.client.schemas.filters import DeploymentFilter, DeploymentFilterName
+
+    return await collect(iter_deployments(client, deployment_filter=DeploymentFilter(name=DeploymentFilterName(any_=[name]))))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Throwaway servers and fixtures shared by the test scripts and benchmarks
+
+- start_prefect_server: a Prefect server on a free port with its own SQLite database
+- start_moto_server: an in-process moto S3 server
+- ensure_work_pool: create a process pool by name when it doesn't exist yet
+"""
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def prefect_cli() -> List[str]:
+    """The prefect CLI on PATH, falling back to the current interpreter"""
+    executable = shutil.which("prefect")
+    if executable:
+        return [executable]
+    return [sys.executable, "-c", "from prefect.cli import app; app()"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_url(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise TimeoutError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_prefect_server(workdir: Path, env: Optional[Dict[str, str]] = None) -> Tuple[subprocess.Popen, str]:
+    """Start a throwaway Prefect server with its own SQLite database"""
+    port = free_port()
+    env = {
+        **os.environ,
+        **(env or {}),
+        "PREFECT_HOME": str(workdir / "prefect-home"),
+        "PREFECT_API_DATABASE_CONNECTION_URL": f"sqlite+aiosqlite:///{workdir / 'prefect.db'}",
+        "PREFECT_SERVER_ANALYTICS_ENABLED": "false",
+        "PREFECT_UI_ENABLED": "false",
+    }
+    process = subprocess.Popen(
+        prefect_cli() + ["server", "start", "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    api_url = f"http://127.0.0.1:{port}/api"
+    wait_for_url(f"{api_url}/health", timeout=120)
+    return process, api_url
+
+
+def start_moto_server():
+    from moto.server import ThreadedMotoServer
+
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    # Keep moto's request log out of the benchmark output
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server.start()
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def ensure_work_pool(client, pool: str) -> bool:
+    """Create the process pool when it doesn't exist yet, returning whether it was created"""
+    from prefect.client.schemas.actions import WorkPoolCreate
+    from prefect.exceptions import ObjectNotFound
+    from prefect.workers.process import ProcessWorker
+
+    try:
+        await client.read_work_pool(pool)
+        return False
+    except ObjectNotFound:
+        await client.create_work_pool(
+            work_pool=WorkPoolCreate(
+                name=pool,
+                type="process",
+                base_job_template=ProcessWorker.get_default_base_job_template(),
+            )
+        )
+        return True
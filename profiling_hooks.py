@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for flow runs
+
+Wrap a flow body in `profile_run()` and enable it with a flow parameter or the
+GELLC_PROFILE environment variable (no redeploy needed, just set it on the work
+pool or ECS task):
+
+    @flow
+    def my_first_flow(profile: str = ""):
+        with profile_run(profile):
+            ...
+
+Modes:
+- "sampling" - low-overhead wall-clock sampler across all threads
+- "cprofile" - deterministic cProfile of the flow thread (higher overhead)
+
+Either way a collapsed-stack file (flamegraph.pl / speedscope compatible) is
+written to run file storage and linked as a flow-run artifact.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+from run_artifacts import artifact_key, current_run_info, link_run_file, store_run_file
+
+PROFILE_ENV = "GELLC_PROFILE"
+PROFILE_INTERVAL_ENV = "GELLC_PROFILE_INTERVAL"
+DEFAULT_SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 128
+DISABLED_VALUES = {"", "0", "off", "false", "none", "no"}
+
+
+def _frame_label(filename: str, lineno: int, funcname: str) -> str:
+    label = f"{funcname} ({os.path.basename(filename)}:{lineno})"
+    return label.replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread from a background thread"""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="gellc-profiler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(_frame_label(code.co_filename, frame.f_lineno, code.co_name))
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def pstats_to_collapsed(stats: pstats.Stats) -> str:
+    """
+    Convert cProfile stats into collapsed stacks weighted in microseconds.
+
+    cProfile only records caller/callee edges, so each path's share of a
+    function's time is estimated from the edge timings (like flameprof does).
+    """
+    raw = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge
+
+    lines = Counter()
+
+    def walk(func, stack, scale):
+        _, _, self_time, _, _ = raw[func]
+        stack = stack + [_frame_label(*func)]
+        self_us = int(self_time * scale * 1_000_000)
+        if self_us:
+            lines[";".join(stack)] += self_us
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, (_, _, _, edge_time) in callees.get(func, {}).items():
+            callee_total = raw[callee][3]
+            callee_scale = scale * edge_time / callee_total if callee_total else 0
+            if _frame_label(*callee) in stack or callee_total * callee_scale < 1e-6:
+                continue
+            walk(callee, stack, callee_scale)
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, [], 1.0)
+
+    return "".join(f"{stack} {weight}\n" for stack, weight in lines.most_common())
+
+
+def _publish_profile(mode: str, collapsed: str, elapsed: float, detail: str):
+    flow_name, _ = current_run_info()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    filename = f"profile-{mode}-{stamp}.collapsed.txt"
+    try:
+        uri = store_run_file(filename, collapsed.encode())
+    except Exception as e:
+        print(f"❌ Could not store profile: {e}")
+        return None
+
+    print(f"🔥 Profile written: {uri}")
+    link_run_file(
+        uri,
+        key=artifact_key("profile", flow_name),
+        description=(
+            f"{mode} profile of {flow_name} ({elapsed:.2f}s, {detail}). "
+            "Open in speedscope.app or flamegraph.pl."
+        ),
+    )
+    return uri
+
+
+@contextmanager
+def profile_run(mode: Optional[str] = None, interval: Optional[float] = None):
+    """Profile the wrapped block when `mode` or GELLC_PROFILE is set"""
+    mode = (mode or os.environ.get(PROFILE_ENV) or "").strip().lower()
+    if mode in DISABLED_VALUES:
+        yield
+        return
+
+    if mode not in ("sampling", "cprofile"):
+        print(f"⚠️  Unknown profile mode '{mode}', using sampling")
+        mode = "sampling"
+
+    print(f"🔍 Profiling enabled ({mode})")
+    start = time.perf_counter()
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            stats = pstats.Stats(profiler)
+            _publish_profile(
+                mode,
+                pstats_to_collapsed(stats),
+                elapsed,
+                f"{stats.total_calls:,} calls",
+            )
+        return
+
+    sampler = SamplingProfiler(
+        interval or float(os.environ.get(PROFILE_INTERVAL_ENV, DEFAULT_SAMPLE_INTERVAL))
+    )
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        elapsed = time.perf_counter() - start
+        _publish_profile(
+            mode,
+            sampler.collapsed(),
+            elapsed,
+            f"{sampler.sample_count:,} samples every {sampler.interval * 1000:g}ms",
+        )
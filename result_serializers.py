@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Pluggable result serializers for our flows
+
+Importing this module registers three extra serializer types with Prefect:
+
+- "orjson"  - fast JSON for plain data (dicts, lists, numbers, strings)
+- "msgpack" - compact binary encoding for plain data
+- "pickle5" - pickle protocol 5 with out-of-band buffers for large bytes/arrays
+
+Pick one per flow in its decorator:
+
+    from result_serializers import get_result_serializer
+
+    @flow(result_serializer=get_result_serializer("orjson"), persist_result=True)
+    def my_flow():
+        ...
+"""
+import base64
+import io
+import itertools
+import pickle
+import struct
+from typing import Any, Dict, List, Type
+
+from typing_extensions import Literal
+
+from prefect.serializers import Serializer, prefect_json_object_encoder
+from prefect.utilities.importtools import from_qualified_name
+
+# Frame layout for pickle5 blobs:
+#   magic | buffer count | payload length | buffer lengths... | payload | buffers...
+PICKLE5_MAGIC = b"GP5\x01"
+_FRAME_HEADER = struct.Struct("<4sIQ")
+_BUFFER_LENGTH = struct.Struct("<Q")
+
+
+class _OutOfBandPickler(pickle.Pickler):
+    """
+    Pickler that moves large bytes objects out of the pickle stream
+
+    The C pickler writes bytes and bytearray without consulting reducer_override,
+    but checks persistent_id first for every object. A large value is saved as
+    a persistent id holding a PickleBuffer, which protocol 5 sends out-of-band.
+    """
+
+    def __init__(self, file, threshold: int, **kwargs):
+        super().__init__(file, **kwargs)
+        self.threshold = threshold
+        self._ids: Dict[int, tuple] = {}
+
+    def persistent_id(self, obj):
+        if type(obj) in (bytes, bytearray) and len(obj) >= self.threshold:
+            # Reusing the id tuple lets the memo store a repeated value only once
+            if id(obj) not in self._ids:
+                self._ids[id(obj)] = (type(obj) is bytearray, pickle.PickleBuffer(obj))
+            return self._ids[id(obj)]
+        return None
+
+
+def _has_large_bytes(obj: Any, threshold: int, depth: int = 3) -> bool:
+    """Look for large bytes near the top of `obj`, checking at most 100 items per container"""
+    if type(obj) in (bytes, bytearray):
+        return len(obj) >= threshold
+    if depth == 0:
+        return False
+    if type(obj) is dict:
+        obj = obj.values()
+    elif type(obj) not in (list, tuple):
+        return False
+    return any(_has_large_bytes(item, threshold, depth - 1) for item in itertools.islice(obj, 100))
+
+
+class _OutOfBandUnpickler(pickle.Unpickler):
+    """Rebuilds the bytes objects _OutOfBandPickler moved out-of-band"""
+
+    def persistent_load(self, pid):
+        is_bytearray, buffer = pid
+        return bytearray(buffer) if is_bytearray else bytes(buffer)
+
+
+class OrjsonSerializer(Serializer):
+    """
+    Serializes plain data to JSON using `orjson`.
+
+    Much faster than the stdlib `json` serializer and natively handles datetimes,
+    UUIDs, dataclasses and numpy arrays. Values orjson can't encode fall back to
+    Prefect's JSON object encoder. Deserializes to plain data only.
+    """
+
+    type: Literal["orjson"] = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        import orjson
+
+        return orjson.dumps(
+            obj,
+            default=prefect_json_object_encoder,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+
+    def loads(self, blob: bytes) -> Any:
+        import orjson
+
+        return orjson.loads(blob)
+
+
+class MsgpackSerializer(Serializer):
+    """
+    Serializes plain data using `msgpack`.
+
+    Smaller than JSON for numeric-heavy rows and keeps bytes values as bytes.
+    The binary output is base64 encoded because Prefect stores results as JSON.
+    """
+
+    type: Literal["msgpack"] = "msgpack"
+
+    def dumps(self, obj: Any) -> bytes:
+        import msgpack
+
+        blob = msgpack.packb(obj, use_bin_type=True, datetime=True)
+        return base64.b64encode(blob)
+
+    def loads(self, blob: bytes) -> Any:
+        import msgpack
+
+        return msgpack.unpackb(
+            base64.b64decode(blob), raw=False, strict_map_key=False, timestamp=3
+        )
+
+
+class Pickle5Serializer(Serializer):
+    """
+    Serializes objects with pickle protocol 5 and out-of-band buffers.
+
+    Buffers from numpy arrays, Arrow buffers and any bytes/bytearray larger than
+    `oob_threshold` are written next to the pickle stream instead of being copied
+    into it, so large payloads are only copied once while framing. Large bytes
+    are found within three levels of dicts, lists and tuples (first 100 items
+    of each); deeper ones stay in the stream.
+
+    Attributes:
+        picklelib: Import path of a pickle module supporting protocol 5.
+        oob_threshold: Minimum size in bytes for a bytes value to go out-of-band.
+    """
+
+    type: Literal["pickle5"] = "pickle5"
+
+    picklelib: str = "pickle"
+    oob_threshold: int = 64 * 1024
+
+    def to_frame(self, obj: Any) -> bytes:
+        """Pickle `obj` into a single framed blob without base64 encoding"""
+        buffers: List[pickle.PickleBuffer] = []
+        if self.picklelib == "pickle":
+            if _has_large_bytes(obj, self.oob_threshold):
+                stream = io.BytesIO()
+                _OutOfBandPickler(
+                    stream,
+                    self.oob_threshold,
+                    protocol=5,
+                    buffer_callback=buffers.append,
+                ).dump(obj)
+                payload = stream.getbuffer()
+            else:
+                # persistent_id costs a Python call per object, so plain data skips it
+                payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        else:
+            pickler = from_qualified_name(self.picklelib)
+            payload = pickler.dumps(obj, protocol=5, buffer_callback=buffers.append)
+
+        raw_buffers = [buffer.raw() for buffer in buffers]
+        parts = [_FRAME_HEADER.pack(PICKLE5_MAGIC, len(raw_buffers), len(payload))]
+        parts.extend(_BUFFER_LENGTH.pack(raw.nbytes) for raw in raw_buffers)
+        parts.append(payload)
+        parts.extend(raw_buffers)
+        return b"".join(parts)
+
+    def from_frame(self, frame: bytes) -> Any:
+        """Load an object from a blob produced by `to_frame`"""
+        view = memoryview(frame)
+        magic, count, payload_length = _FRAME_HEADER.unpack_from(view)
+        if magic != PICKLE5_MAGIC:
+            raise ValueError("Blob is not a pickle5 frame")
+
+        offset = _FRAME_HEADER.size
+        lengths = []
+        for _ in range(count):
+            lengths.append(_BUFFER_LENGTH.unpack_from(view, offset)[0])
+            offset += _BUFFER_LENGTH.size
+
+        payload = view[offset : offset + payload_length]
+        offset += payload_length
+        buffers = []
+        for length in lengths:
+            buffers.append(view[offset : offset + length])
+            offset += length
+
+        if self.picklelib == "pickle":
+            return _OutOfBandUnpickler(io.BytesIO(payload), buffers=buffers).load()
+        pickler = from_qualified_name(self.picklelib)
+        return pickler.loads(payload, buffers=buffers)
+
+    def dumps(self, obj: Any) -> bytes:
+        return base64.b64encode(self.to_frame(obj))
+
+    def loads(self, blob: bytes) -> Any:
+        return self.from_frame(base64.b64decode(blob))
+
+
+RESULT_SERIALIZERS: Dict[str, Type[Serializer]] = {
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+    "pickle5": Pickle5Serializer,
+}
+
+
+def get_result_serializer(name: str, **options: Any) -> Serializer:
+    """Build a result serializer by name, falling back to Prefect's built-ins"""
+    if name in RESULT_SERIALIZERS:
+        return RESULT_SERIALIZERS[name](**options)
+    # Built-in Prefect types such as "json", "pickle" or "compressed/pickle"
+    return Serializer(type=name, **options)
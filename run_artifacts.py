@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Helpers for storing per-run files (profiles, reports) and linking them as artifacts
+
+Files go to the storage block named by GELLC_RUN_FILES_BLOCK (for example
+"s3-bucket/gellc-prefect-results"), else to PREFECT_DEFAULT_RESULT_STORAGE_BLOCK,
+else to ~/.prefect/run-files. Local files can't be opened from the UI, and on
+ECS they disappear with the task, so they get no link artifact.
+"""
+import os
+import re
+from pathlib import Path
+
+RUN_FILES_BLOCK_ENV = "GELLC_RUN_FILES_BLOCK"
+LOCAL_RUN_FILES_DIR = Path.home() / ".prefect" / "run-files"
+
+
+def artifact_key(*parts: str) -> str:
+    """Build an artifact key (lowercase letters, numbers and dashes only)"""
+    key = "-".join(part for part in parts if part)
+    return re.sub(r"[^a-z0-9-]+", "-", key.lower()).strip("-")
+
+
+def current_run_info():
+    """Return (flow name, flow run id) for the active run, or local placeholders"""
+    try:
+        from prefect.runtime import flow_run
+
+        return flow_run.flow_name or "local", flow_run.id or "local"
+    except Exception:
+        return "local", "local"
+
+
+def get_run_files_storage():
+    """Load the storage block used for run files"""
+    from prefect.settings import PREFECT_DEFAULT_RESULT_STORAGE_BLOCK
+
+    block_name = os.environ.get(RUN_FILES_BLOCK_ENV) or PREFECT_DEFAULT_RESULT_STORAGE_BLOCK.value()
+    if block_name:
+        from prefect.blocks.core import Block
+
+        return Block.load(block_name)
+
+    from prefect.filesystems import LocalFileSystem
+
+    LOCAL_RUN_FILES_DIR.mkdir(parents=True, exist_ok=True)
+    return LocalFileSystem(basepath=str(LOCAL_RUN_FILES_DIR))
+
+
+def _storage_uri(storage, path: str) -> str:
+    """Best-effort URI for a file written to a storage block"""
+    bucket = getattr(storage, "bucket_name", None)
+    if bucket:
+        folder = getattr(storage, "bucket_folder", "") or ""
+        return f"s3://{bucket}/{folder.strip('/') + '/' if folder else ''}{path}"
+
+    basepath = getattr(storage, "basepath", None)
+    if basepath and "://" in basepath:
+        return f"{basepath.rstrip('/')}/{path}"
+    if basepath:
+        return Path(basepath, path).resolve().as_uri()
+    return path
+
+
+def store_run_file(filename: str, data: bytes) -> str:
+    """Write `data` under the current flow run's folder and return its URI"""
+    _, run_id = current_run_info()
+    path = f"{run_id}/{filename}"
+    storage = get_run_files_storage()
+    storage.write_path(path, data)
+    return _storage_uri(storage, path)
+
+
+def link_run_file(uri: str, key: str, description: str) -> bool:
+    """Attach a link artifact to the current run, returning False outside a run or for local files"""
+    if uri.startswith("file://"):
+        print(f"⚠️  {uri} is only on this machine, so no link artifact was created. "
+              f"Set {RUN_FILES_BLOCK_ENV} to a remote storage block (for example s3-bucket/gellc-prefect-results).")
+        return False
+    try:
+        from prefect.artifacts import create_link_artifact
+
+        create_link_artifact(
+            link=uri,
+            link_text=uri.rsplit("/", 1)[-1],
+            key=key,
+            description=description,
+        )
+        return True
+    except Exception as e:
+        print(f"⚠️  Could not create link artifact: {e}")
+        return False
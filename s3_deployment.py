@@ -3,9 +3,9 @@
 Create a deployment using S3 storage - perfect for AWS ECS setup!
 """
 import asyncio
-import boto3
 from prefect import flow, task
 from prefect.blocks.system import String
+from s3_io import put_objects, s3_client as pooled_s3_client
 
 @task
 def s3_ecs_task(name: str = "S3-ECS"):
@@ -39,7 +39,7 @@ def create_s3_bucket_and_upload():
     region = "us-east-1"  # Same as your ECS
     
     try:
-        s3_client = boto3.client('s3', region_name=region)
+        s3_client = pooled_s3_client(region_name=region)
         
         # Check if bucket exists
         try:
@@ -85,23 +85,14 @@ def s3_hello_flow(name: str = "S3 ECS"):
     return result
 '''
         
-        # Upload flow file to S3
-        print("📤 Uploading flow file to S3...")
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key="flows/s3_hello_flow.py",
-            Body=flow_content,
-            ContentType="text/plain"
-        )
-        
         # Upload requirements.txt
         requirements_content = "prefect>=2.0.0\nboto3>=1.26.0"
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key="requirements.txt",
-            Body=requirements_content,
-            ContentType="text/plain"
-        )
+        # Upload the flow file and requirements.txt together
+        print("📤 Uploading flow files to S3...")
+        put_objects(bucket_name, {
+            "flows/s3_hello_flow.py": flow_content.encode(),
+            "requirements.txt": requirements_content.encode(),
+        }, client=s3_client, ContentType="text/plain")
         
         print(f"✅ Flow files uploaded to S3: s3://{bucket_name}/flows/")
         return bucket_name
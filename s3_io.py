@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Concurrent S3 I/O for flows and deployment scripts
+
+Every helper shares one boto3 client per process (and region/endpoint).
+boto3 clients are thread-safe, and sharing one keeps its connection pool
+warm, where a client per call pays for a new session, credential lookup and
+TLS handshake each time.
+
+- put_objects / get_objects: many small objects at once
+- upload: multipart PUT with parts sent in parallel above part_size
+- download: ranged GETs in parallel above part_size, to a file or bytes
+- delete_objects: 1000 keys per request, batches in parallel
+- copy_objects: server-side copies in parallel
+- list_objects: every object under a prefix
+
+    from s3_io import put_objects, download
+    put_objects("my-bucket", {"a.json": b"{}", "b.json": b"[]"})
+    download("my-bucket", "big.parquet", "/tmp/big.parquet")
+
+The endpoint follows boto3's own settings (AWS_ENDPOINT_URL_S3 or
+AWS_ENDPOINT_URL), so the same calls work against moto or MinIO.
+"""
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+MiB = 1024 * 1024
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PART_SIZE = 16 * MiB
+MAX_POOL_CONNECTIONS = 64
+# S3 limits: parts of at least 5 MiB (but the last), 10,000 parts, 1000 keys per delete
+MIN_PART_SIZE = 5 * MiB
+MAX_PARTS = 10_000
+DELETE_BATCH = 1000
+
+Source = Union[bytes, bytearray, memoryview, str, Path]
+
+_clients: Dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+
+def s3_client(region_name: Optional[str] = None, endpoint_url: Optional[str] = None):
+    """The process-wide client for this region and endpoint"""
+    # Keyed by pid too: a forked child must not reuse its parent's sockets
+    key = (os.getpid(), region_name, endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                import boto3
+                from botocore.config import Config
+
+                config = Config(
+                    max_pool_connections=MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 10, "mode": "adaptive"},
+                    tcp_keepalive=True,
+                )
+                client = boto3.session.Session().client(
+                    "s3", region_name=region_name, endpoint_url=endpoint_url, config=config
+                )
+                _clients[key] = client
+    return client
+
+
+def _map(fn: Callable, items: List, concurrency: int) -> List:
+    if len(items) <= 1 or concurrency <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+def _size(source: Source) -> int:
+    if isinstance(source, (str, Path)):
+        return Path(source).stat().st_size
+    return len(source)
+
+
+def _read(source: Source, start: int, length: int) -> bytes:
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            f.seek(start)
+            return f.read(length)
+    return bytes(memoryview(source)[start:start + length])
+
+
+def part_size_for(size: int, part_size: int = DEFAULT_PART_SIZE) -> int:
+    """part_size raised to S3's minimum, and to fit the object in 10,000 parts"""
+    return max(part_size, MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+
+
+def put_objects(bucket: str, objects: Dict[str, Source], concurrency: int = DEFAULT_CONCURRENCY,
+                client=None, **extra) -> None:
+    """Write {key: bytes or file path}; objects above the part size go multipart"""
+    client = client or s3_client()
+    _map(lambda item: upload(bucket, item[0], item[1], client=client, concurrency=1, **extra),
+         list(objects.items()), concurrency)
+
+
+def get_objects(bucket: str, keys: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                client=None) -> Dict[str, bytes]:
+    """{key: bytes} for each key, read whole"""
+    client = client or s3_client()
+    keys = list(keys)
+    bodies = _map(lambda key: client.get_object(Bucket=bucket, Key=key)["Body"].read(), keys, concurrency)
+    return dict(zip(keys, bodies))
+
+
+def upload(bucket: str, key: str, source: Source, part_size: int = DEFAULT_PART_SIZE,
+           concurrency: int = DEFAULT_CONCURRENCY, client=None, **extra) -> None:
+    """Write bytes or a file; above part_size the parts are sent in parallel"""
+    client = client or s3_client()
+    size = _size(source)
+    if size <= part_size:
+        client.put_object(Bucket=bucket, Key=key, Body=_read(source, 0, size), **extra)
+        return
+
+    part_size = part_size_for(size, part_size)
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **extra)["UploadId"]
+
+    def put_part(number: int) -> dict:
+        body = _read(source, (number - 1) * part_size, part_size)
+        response = client.upload_part(Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    try:
+        parts = _map(put_part, list(range(1, math.ceil(size / part_size) + 1)), concurrency)
+        client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                         MultipartUpload={"Parts": parts})
+    except BaseException:
+        # Uploaded parts are billed until the upload is aborted
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+
+def download(bucket: str, key: str, dest: Union[str, Path, None] = None, part_size: int = DEFAULT_PART_SIZE,
+             concurrency: int = DEFAULT_CONCURRENCY, client=None) -> Union[bytes, Path]:
+    """Read an object to dest (returns the path) or to bytes; above part_size in parallel ranges"""
+    client = client or s3_client()
+    head = client.head_object(Bucket=bucket, Key=key)
+    size = head["ContentLength"]
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)] or [(0, -1)]
+
+    if len(ranges) == 1:
+        data = client.get_object(Bucket=bucket, Key=key, IfMatch=head["ETag"])["Body"].read()
+        if dest is None:
+            return data
+        Path(dest).write_bytes(data)
+        return Path(dest)
+
+    def get_range(span: Tuple[int, int]) -> bytes:
+        # IfMatch fails the read if the object is replaced mid-download, instead of mixing versions
+        response = client.get_object(Bucket=bucket, Key=key, Range=f"bytes={span[0]}-{span[1]}", IfMatch=head["ETag"])
+        return response["Body"].read()
+
+    if dest is None:
+        buffer = bytearray(size)
+
+        def fill(span: Tuple[int, int]):
+            buffer[span[0]:span[1] + 1] = get_range(span)
+
+        _map(fill, ranges, concurrency)
+        return bytes(buffer)
+
+    dest = Path(dest)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.part")
+    with open(tmp, "wb") as f:
+        f.truncate(size)
+
+    def write(span: Tuple[int, int]):
+        data = get_range(span)
+        with open(tmp, "r+b") as f:
+            f.seek(span[0])
+            f.write(data)
+
+    try:
+        _map(write, ranges, concurrency)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return dest
+
+
+def delete_objects(bucket: str, keys: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                   client=None) -> List[dict]:
+    """Delete keys in batches of 1000; returns the per-key errors S3 reported"""
+    client = client or s3_client()
+    keys = list(keys)
+    batches = [keys[i:i + DELETE_BATCH] for i in range(0, len(keys), DELETE_BATCH)]
+
+    def delete(batch: List[str]) -> List[dict]:
+        response = client.delete_objects(
+            Bucket=bucket, Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+        )
+        return response.get("Errors", [])
+
+    return [error for errors in _map(delete, batches, concurrency) for error in errors]
+
+
+def copy_objects(copies: Iterable[Tuple[str, str, str, str]], concurrency: int = DEFAULT_CONCURRENCY,
+                 client=None) -> None:
+    """Server-side copies of (source bucket, source key, dest bucket, dest key); objects up to 5 GiB"""
+    client = client or s3_client()
+    _map(lambda c: client.copy_object(CopySource={"Bucket": c[0], "Key": c[1]}, Bucket=c[2], Key=c[3]),
+         list(copies), concurrency)
+
+
+def list_objects(bucket: str, prefix: str = "", client=None) -> Iterator[dict]:
+    """Every object under prefix, across pages"""
+    client = client or s3_client()
+    for page in client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        yield from page.get("Contents", [])
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Spread cron schedules over a window so deployments don't all start at once
+
+schedule_plan.yaml lists each deployment's nominal cadence (e.g. "0 * * * *").
+Every deployment gets a deterministic minute offset within `window_minutes`:
+a hash of its name is the preferred offset (the jitter). Deployments are then
+placed longest-first on a one-week, minute-resolution model of their pool,
+each at the offset that keeps the pool under its capacity with the lowest
+peak. Durations come from the p90 of recent completed runs (or the plan's
+defaults). Capacity comes from the pool's concurrency limit (or --capacity,
+default 1).
+
+    python schedule_planner.py                        # show the plan
+    python schedule_planner.py --write-yaml           # update schedules: in prefect.yaml
+    python schedule_planner.py --apply                # replace the schedules of existing deployments
+
+Keep prefect.yaml and the API in step: `prefect deploy` replaces a
+deployment's schedules with the ones in prefect.yaml.
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import yaml
+
+from prefect_pagination import collect, deployments_named, iter_flow_runs, iter_work_pools
+
+DEFAULT_PLAN = Path(__file__).parent / "schedule_plan.yaml"
+DEFAULT_PREFECT_YAML = Path(__file__).parent / "prefect.yaml"
+DEFAULT_WINDOW_MINUTES = 15
+DEFAULT_DURATION_MINUTES = 5.0
+DEFAULT_CAPACITY = 1
+HISTORY_RUNS = 20
+# A fixed Monday, so the same plan always comes out the same; crons repeat weekly at most
+ANCHOR = datetime(2024, 1, 1)
+HORIZON_MINUTES = 7 * 24 * 60
+
+
+def preferred_offset(name: str, window: int) -> int:
+    return int(hashlib.sha256(name.encode()).hexdigest(), 16) % window
+
+
+def valid_offsets(cron: str, window: int) -> List[int]:
+    """Offsets that only move the minute field; crossing into the next hour is only safe for every-hour crons"""
+    from croniter import croniter
+
+    minutes = croniter(cron).expanded[0]
+    hour_field = cron.split()[1]
+    if minutes == ["*"] or hour_field == "*":
+        return list(range(window))
+    return [offset for offset in range(window) if max(minutes) + offset < 60]
+
+
+def shift_cron(cron: str, offset: int) -> str:
+    from croniter import croniter
+
+    if offset == 0:
+        return cron
+    fields = cron.split()
+    minutes = croniter(cron).expanded[0]
+    if minutes == ["*"]:
+        raise ValueError(f"'{cron}' runs every minute and can't be offset")
+    fields[0] = ",".join(str(m) for m in sorted({(m + offset) % 60 for m in minutes}))
+    return " ".join(fields)
+
+
+def fire_minutes(cron: str, timezone: str) -> List[int]:
+    """Minutes since ANCHOR (UTC) at which `cron` fires during one week"""
+    from croniter import croniter
+
+    tz = ZoneInfo(timezone)
+    start = ANCHOR.replace(tzinfo=ZoneInfo("UTC"))
+    fires = croniter(cron, start.astimezone(tz) - timedelta(seconds=1))
+    minutes = []
+    while True:
+        fire = fires.get_next(datetime)
+        minute = int((fire - start).total_seconds() // 60)
+        if minute >= HORIZON_MINUTES:
+            return minutes
+        minutes.append(minute)
+
+
+class PoolLoad:
+    """Runs in progress per minute over one week, wrapping around at the end"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.load = [0] * HORIZON_MINUTES
+
+    @staticmethod
+    def covered(fires: List[int], duration_minutes: float) -> List[int]:
+        span = max(1, math.ceil(duration_minutes))
+        return [(fire + i) % HORIZON_MINUTES for fire in fires for i in range(span)]
+
+    def cost(self, minutes: List[int]) -> Tuple[int, int]:
+        """(run-minutes added beyond capacity, peak) once a run covering `minutes` is added"""
+        over = sum(1 for m in minutes if self.load[m] + 1 > self.capacity)
+        return over, max((self.load[m] + 1 for m in minutes), default=0)
+
+    def add(self, minutes: List[int]):
+        for m in minutes:
+            self.load[m] += 1
+
+    @property
+    def peak(self) -> int:
+        return max(self.load)
+
+    @property
+    def excess(self) -> int:
+        """Run-minutes beyond capacity, i.e. roughly how long runs would wait for a slot"""
+        return sum(max(0, n - self.capacity) for n in self.load)
+
+
+def plan_pool(deployments: List[dict], capacity: int, window: int) -> Tuple[List[dict], dict]:
+    """Give each deployment an offset; returns the planned entries and before/after projections"""
+    nominal, planned = PoolLoad(capacity), PoolLoad(capacity)
+    for deployment in deployments:
+        deployment["fires"] = fire_minutes(deployment["cron"], deployment["timezone"])
+        nominal.add(PoolLoad.covered(deployment["fires"], deployment["duration_minutes"]))
+
+    # Busiest first: they have the fewest good slots left if placed late
+    order = sorted(deployments, key=lambda d: (-len(d["fires"]) * d["duration_minutes"], d["name"]))
+    for deployment in order:
+        preferred = preferred_offset(deployment["name"], window)
+
+        def score(offset: int):
+            minutes = PoolLoad.covered([f + offset for f in deployment["fires"]], deployment["duration_minutes"])
+            distance = min((offset - preferred) % window, (preferred - offset) % window)
+            return (*planned.cost(minutes), distance, offset), minutes
+
+        (_, _, _, offset), minutes = min(
+            (score(offset) for offset in valid_offsets(deployment["cron"], window)), key=lambda scored: scored[0]
+        )
+        planned.add(minutes)
+        deployment["offset"] = offset
+        deployment["planned_cron"] = shift_cron(deployment["cron"], offset)
+
+    projection = {
+        "capacity": capacity,
+        "peak_before": nominal.peak, "peak_after": planned.peak,
+        "excess_before": nominal.excess, "excess_after": planned.excess,
+    }
+    return sorted(deployments, key=lambda d: d["name"]), projection
+
+
+def p90(values: List[float]) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.9 * len(ordered)) - 1)]
+
+
+async def read_history(names: List[str]) -> Tuple[Dict[str, dict], Dict[str, Optional[int]]]:
+    """Existing deployments by name with their recent completed-run durations, and each pool's concurrency limit"""
+    from prefect import get_client
+    from prefect.client.schemas.filters import (
+        DeploymentFilter,
+        DeploymentFilterId,
+        FlowRunFilter,
+        FlowRunFilterState,
+        FlowRunFilterStateType,
+    )
+    from prefect.client.schemas.sorting import FlowRunSort
+
+    completed = FlowRunFilter(state=FlowRunFilterState(type=FlowRunFilterStateType(any_=["COMPLETED"])))
+
+    async def history(name: str) -> Optional[dict]:
+        found = await deployments_named(client, name)
+        if not found:
+            return None
+        runs = await collect(iter_flow_runs(
+            client,
+            flow_run_filter=completed,
+            deployment_filter=DeploymentFilter(id=DeploymentFilterId(any_=[d.id for d in found])),
+            sort=FlowRunSort.START_TIME_DESC,
+            limit=HISTORY_RUNS,
+        ))
+        durations = [run.total_run_time.total_seconds() / 60 for run in runs if run.total_run_time]
+        return {"deployments": found, "pool": found[0].work_pool_name, "durations": durations}
+
+    async with get_client() as client:
+        pools, *histories = await asyncio.gather(collect(iter_work_pools(client)), *(history(name) for name in names))
+    return (
+        {name: found for name, found in zip(names, histories) if found},
+        {pool.name: pool.concurrency_limit for pool in pools},
+    )
+
+
+def load_plan(plan_path: Path, prefect_yaml: Path) -> Tuple[dict, List[dict]]:
+    plan = yaml.safe_load(plan_path.read_text()) or {}
+    declared = {}
+    if prefect_yaml.exists():
+        for deployment in (yaml.safe_load(prefect_yaml.read_text()) or {}).get("deployments") or []:
+            declared[deployment["name"]] = deployment
+    entries = []
+    for name, entry in (plan.get("deployments") or {}).items():
+        entries.append({
+            "name": name,
+            "cron": entry["cron"],
+            "timezone": entry.get("timezone", "UTC"),
+            "pool": entry.get("pool") or ((declared.get(name) or {}).get("work_pool") or {}).get("name"),
+            "duration_minutes": entry.get("duration_minutes"),
+        })
+    return plan, entries
+
+
+def plan_all(plan: dict, entries: List[dict], history: Dict[str, dict], pool_limits: Dict[str, Optional[int]],
+             capacities: Dict[str, int]) -> List[Tuple[str, List[dict], dict]]:
+    window = int(plan.get("window_minutes", DEFAULT_WINDOW_MINUTES))
+    default_duration = float(plan.get("default_duration_minutes", DEFAULT_DURATION_MINUTES))
+    by_pool: Dict[str, List[dict]] = {}
+    for entry in entries:
+        found = history.get(entry["name"])
+        entry["pool"] = entry["pool"] or (found["pool"] if found else None) or "unassigned"
+        if entry["duration_minutes"] is None and found and found["durations"]:
+            entry["duration_minutes"] = p90(found["durations"])
+            entry["duration_source"] = f"p90 of {len(found['durations'])} runs"
+        elif entry["duration_minutes"] is None:
+            entry["duration_minutes"] = default_duration
+            entry["duration_source"] = "default"
+        else:
+            entry["duration_source"] = "plan"
+        by_pool.setdefault(entry["pool"], []).append(entry)
+    return [
+        (pool, *plan_pool(deployments, capacities.get(pool) or pool_limits.get(pool) or DEFAULT_CAPACITY, window))
+        for pool, deployments in sorted(by_pool.items())
+    ]
+
+
+def set_yaml_schedules(text: str, name: str, schedules: List[dict]) -> str:
+    """Replace one deployment's `schedules:` in prefect.yaml text, leaving comments and layout alone"""
+    lines = text.split("\n")
+    start = next((i for i, line in enumerate(lines) if re.match(rf"\s*- name:\s*['\"]?{re.escape(name)}['\"]?\s*$", line)), None)
+    if start is None:
+        raise KeyError(f"deployment {name} is not in the YAML")
+    key_indent = lines[start].index("-") + 2
+    end = next((i for i in range(start + 1, len(lines))
+                if lines[i].strip() and len(lines[i]) - len(lines[i].lstrip()) < key_indent), len(lines))
+    pad = " " * key_indent
+    block = [f"{pad}schedules:" if schedules else f"{pad}schedules: []"]
+    for schedule in schedules:
+        block += [f"{pad}  - cron: \"{schedule['cron']}\"", f"{pad}    timezone: {schedule['timezone']}"]
+    key = next((i for i in range(start + 1, end) if lines[i].startswith(f"{pad}schedules:")), None)
+    if key is None:
+        while end > start + 1 and not lines[end - 1].strip():
+            end -= 1
+        return "\n".join(lines[:end] + block + lines[end:])
+    stop = key + 1
+    while stop < end and (not lines[stop].strip() or len(lines[stop]) - len(lines[stop].lstrip()) > key_indent
+                          or lines[stop].startswith(f"{pad}- ")):
+        stop += 1
+    return "\n".join(lines[:key] + block + lines[stop:])
+
+
+async def apply_schedules(history: Dict[str, dict], planned: List[dict]) -> List[str]:
+    """Replace the schedules of existing deployments with the planned cron; returns the names changed"""
+    from prefect import get_client
+    from prefect.client.schemas.schedules import CronSchedule
+
+    changed = []
+    async with get_client() as client:
+        for entry in planned:
+            for deployment in (history.get(entry["name"]) or {}).get("deployments", []):
+                schedule = CronSchedule(cron=entry["planned_cron"], timezone=entry["timezone"])
+                current = await client.read_deployment_schedules(deployment.id)
+                if len(current) == 1 and getattr(current[0].schedule, "cron", None) == schedule.cron \
+                        and current[0].schedule.timezone == schedule.timezone:
+                    continue
+                for existing in current:
+                    await client.delete_deployment_schedule(deployment.id, existing.id)
+                await client.create_deployment_schedules(deployment.id, [(schedule, True)])
+                changed.append(entry["name"])
+    return changed
+
+
+def print_plan(pool: str, planned: List[dict], projection: dict, window: int):
+    print(f"\n📅 {pool} (capacity {projection['capacity']}, window {window}m)")
+    print(f"  {'DEPLOYMENT':<32} {'NOMINAL':<18} {'PLANNED':<22} DURATION")
+    for entry in planned:
+        print(f"  {entry['name']:<32} {entry['cron']:<18} {entry['planned_cron']:<22} "
+              f"{entry['duration_minutes']:.1f}m ({entry['duration_source']})")
+    print(f"  📈 Projected peak concurrency {projection['peak_before']} → {projection['peak_after']}; "
+          f"run-minutes waiting for a slot per week {projection['excess_before']} → {projection['excess_after']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spread cron schedules over a window using durations and pool capacity")
+    parser.add_argument("--plan", type=Path, default=DEFAULT_PLAN, help="Nominal schedules (schedule_plan.yaml)")
+    parser.add_argument("--prefect-yaml", type=Path, default=DEFAULT_PREFECT_YAML)
+    parser.add_argument("--capacity", nargs="+", default=[], metavar="POOL=N", help="Override a pool's capacity")
+    parser.add_argument("--no-history", action="store_true", help="Don't read durations or pools from the API")
+    parser.add_argument("--write-yaml", action="store_true", help="Write the planned schedules into --prefect-yaml")
+    parser.add_argument("--apply", action="store_true", help="Replace the schedules of existing deployments")
+    args = parser.parse_args()
+
+    capacities = {pool: int(n) for pool, n in (item.split("=", 1) for item in args.capacity)}
+    plan, entries = load_plan(args.plan, args.prefect_yaml)
+    if not entries:
+        print(f"⚠️  No deployments in {args.plan}")
+        return
+    history, pool_limits = ({}, {}) if args.no_history else asyncio.run(read_history([e["name"] for e in entries]))
+    window = int(plan.get("window_minutes", DEFAULT_WINDOW_MINUTES))
+    results = plan_all(plan, entries, history, pool_limits, capacities)
+    for pool, planned, projection in results:
+        print_plan(pool, planned, projection, window)
+    planned = [entry for _, pool_planned, _ in results for entry in pool_planned]
+
+    if args.write_yaml:
+        text = args.prefect_yaml.read_text()
+        for entry in planned:
+            try:
+                text = set_yaml_schedules(text, entry["name"], [{"cron": entry["planned_cron"], "timezone": entry["timezone"]}])
+            except KeyError as e:
+                print(f"⚠️  {e.args[0]}; not written")
+        args.prefect_yaml.write_text(text)
+        print(f"\n📝 Wrote schedules to {args.prefect_yaml}")
+    if args.apply:
+        changed = asyncio.run(apply_schedules(history, planned))
+        print(f"✅ Updated the schedules of {len(changed)} deployments" + (f": {', '.join(changed)}" if changed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+{#-
+    JSON validation rows for one deduped table.
+
+    On incremental runs only rows past the watermark are selected. The flow passes
+    the last stored watermarks per table as JSON in the DBT_WATERMARK env var (an env
+    var rather than --vars, so partial parsing survives); without it the current
+    maximum in {{ this }} is used. The watermark column defaults to
+    `updated_at` and can be switched to `uuid` with the test_json_watermark_column var.
+-#}
+{% macro json_validation_rows(table_name, relation) %}
+{%- set watermark_column = var('test_json_watermark_column', 'updated_at') -%}
+SELECT
+    '{{ table_name }}' as table_name,
+    uuid,
+    external_ids,
+    source_uuids,
+    {{ try_parse_json('external_ids') }} as parsed_external_ids,
+    {{ try_parse_json('source_uuids') }} as parsed_source_uuids,
+    {{ watermark_column }} as watermark_value,
+    '{{ invocation_id }}' as loaded_by_invocation
+FROM {{ relation }}
+WHERE (external_ids IS NOT NULL OR source_uuids IS NOT NULL)
+{%- if is_incremental() %}
+  AND {{ json_validation_watermark_filter(table_name, watermark_column) }}
+{%- endif %}
+{% endmacro %}
+
+{#-
+    Body of a generated per-business-object model (see dbt_business_objects.py):
+    validates deduped_<plural> from the object's claymore package incrementally.
+-#}
+{% macro json_validation_model(package, plural) %}
+{{
+    config(
+        materialized='incremental',
+        unique_key=['table_name', 'uuid'],
+        meta={
+            'watermark_column': 'watermark_value',
+            'watermark_group_by': 'table_name'
+        }
+    )
+}}
+{{ json_validation_rows(plural, ref(package, 'deduped_' ~ plural)) }}
+{% endmacro %}
+
+{% macro json_validation_watermark_filter(table_name, watermark_column) %}
+{%- set watermarks = fromjson(env_var('DBT_WATERMARK', '{}')) or {} -%}
+{%- if watermarks.get(table_name) is not none -%}
+    {{ watermark_column }} > '{{ watermarks[table_name] }}'
+{%- else -%}
+    (
+        {{ watermark_column }} > (SELECT max(watermark_value) FROM {{ this }} WHERE table_name = '{{ table_name }}')
+        OR NOT EXISTS (SELECT 1 FROM {{ this }} WHERE table_name = '{{ table_name }}')
+    )
+{%- endif -%}
+{% endmacro %}
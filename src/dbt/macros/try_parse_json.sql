@@ -0,0 +1,18 @@
+{#- Cross-database TRY_PARSE_JSON: NULL for NULL or invalid JSON -#}
+{% macro try_parse_json(expression) %}
+    {{ return(adapter.dispatch('try_parse_json')(expression)) }}
+{% endmacro %}
+
+{% macro default__try_parse_json(expression) %}
+    CASE
+        WHEN {{ expression }} IS NOT NULL THEN TRY_PARSE_JSON({{ expression }}::string)
+        ELSE NULL
+    END
+{% endmacro %}
+
+{% macro duckdb__try_parse_json(expression) %}
+    CASE
+        WHEN json_valid({{ expression }}::varchar) THEN {{ expression }}::varchar::json
+        ELSE NULL
+    END
+{% endmacro %}
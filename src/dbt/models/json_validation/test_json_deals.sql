@@ -0,0 +1,2 @@
+-- Generated by dbt_business_objects.py from the claymore_core:all_business_objects var, do not edit
+{{ json_validation_model('claymore_crm', 'deals') }}
@@ -1,80 +1,10 @@
-{{
-    config(
-        materialized='table'
-    )
-}}
-
--- Test JSON parsing in each deduped table
-SELECT 
-    'people' as table_name,
-    uuid,
-    external_ids,
-    source_uuids,
-    CASE 
-        WHEN external_ids IS NOT NULL THEN TRY_PARSE_JSON(external_ids::string)
-        ELSE NULL 
-    END as parsed_external_ids,
-    CASE 
-        WHEN source_uuids IS NOT NULL THEN TRY_PARSE_JSON(source_uuids::string)
-        ELSE NULL 
-    END as parsed_source_uuids
-FROM {{ ref('claymore_core', 'deduped_people') }}
-WHERE external_ids IS NOT NULL OR source_uuids IS NOT NULL
-LIMIT 10
-
-UNION ALL
-
-SELECT 
-    'deals' as table_name,
-    uuid,
-    external_ids,
-    source_uuids,
-    CASE 
-        WHEN external_ids IS NOT NULL THEN TRY_PARSE_JSON(external_ids::string)
-        ELSE NULL 
-    END as parsed_external_ids,
-    CASE 
-        WHEN source_uuids IS NOT NULL THEN TRY_PARSE_JSON(source_uuids::string)
-        ELSE NULL 
-    END as parsed_source_uuids
-FROM {{ ref('claymore_crm', 'deduped_deals') }}
-WHERE external_ids IS NOT NULL OR source_uuids IS NOT NULL
-LIMIT 10
-
-UNION ALL
-
-SELECT 
-    'loans' as table_name,
-    uuid,
-    external_ids,
-    source_uuids,
-    CASE 
-        WHEN external_ids IS NOT NULL THEN TRY_PARSE_JSON(external_ids::string)
-        ELSE NULL 
-    END as parsed_external_ids,
-    CASE 
-        WHEN source_uuids IS NOT NULL THEN TRY_PARSE_JSON(source_uuids::string)
-        ELSE NULL 
-    END as parsed_source_uuids
-FROM {{ ref('claymore_lending', 'deduped_loans') }}
-WHERE external_ids IS NOT NULL OR source_uuids IS NOT NULL
-LIMIT 10
-
-UNION ALL
-
-SELECT 
-    'payments' as table_name,
-    uuid,
-    external_ids,
-    source_uuids,
-    CASE 
-        WHEN external_ids IS NOT NULL THEN TRY_PARSE_JSON(external_ids::string)
-        ELSE NULL 
-    END as parsed_external_ids,
-    CASE 
-        WHEN source_uuids IS NOT NULL THEN TRY_PARSE_JSON(source_uuids::string)
-        ELSE NULL 
-    END as parsed_source_uuids
-FROM {{ ref('claymore_lending', 'deduped_payments') }}
-WHERE external_ids IS NOT NULL OR source_uuids IS NOT NULL
-LIMIT 10 
\ No newline at end of file
+{{ config(materialized='view') }}
+
+-- JSON parsing results for every business object in the claymore_core:all_business_objects var.
+-- Each object is validated by its own incremental model (models/json_validation/test_json_<plural>.sql,
+-- generated by dbt_business_objects.py), so they build independently and concurrently.
+-- Rebuild everything with `dbt run --full-refresh` or the flow's full_refresh parameter.
+{% for business_object in var('claymore_core:all_business_objects') %}
+SELECT * FROM {{ ref('test_json_' ~ business_object['record_type_plural']) }}
+{% if not loop.last %}UNION ALL{% endif %}
+{% endfor %}
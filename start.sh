@@ -9,7 +9,14 @@ case "${PREFECT_MODE:-flow}" in
     "worker")
         echo "📋 Starting as Prefect worker..."
         echo "Work Pool: ${PREFECT_WORK_POOL:-default}"
-        prefect worker start --pool "${PREFECT_WORK_POOL:-default}" --type process
+        # Publishes the worker's environment fingerprint (see worker_fingerprint.py).
+        # The worker must start even if the fingerprint tooling itself is broken.
+        if python -c "import worker_fingerprint" 2>/dev/null; then
+            python worker_fingerprint.py start --pool "${PREFECT_WORK_POOL:-default}" --type process
+        else
+            echo "⚠️  worker_fingerprint.py unavailable, starting the worker without publishing its environment"
+            prefect worker start --pool "${PREFECT_WORK_POOL:-default}" --type process
+        fi
         ;;
     "flow")
         echo "🔄 Running flow directly..."
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test the backfill engine against a temporary Prefect server
+
+A stand-in worker moves the backfill's runs to Running and then Completed (or
+Failed), and records how many were unfinished at once.
+
+    python test_backfill.py
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+from collections import Counter
+from datetime import date
+from pathlib import Path
+
+from backfill import build_chunks, canonical, date_chunks, run_backfill
+from benchmark_flow_latency import latency_probe_flow
+from prefect_test_support import start_prefect_server
+
+WINDOW = 2
+
+
+def backfill_args(workdir: Path, start: str, end: str, **overrides) -> argparse.Namespace:
+    args = argparse.Namespace(
+        deployment="backfilled", start=date.fromisoformat(start), end=date.fromisoformat(end), chunk_days=3,
+        start_param="start_date", end_param="end_date", partitions=None, chunk_size=1, partition_param="partition",
+        param=["mode=\"replay\""], max_in_flight=WINDOW, retries=0, poll_seconds=0.2,
+        checkpoint_dir=str(workdir / "checkpoints"), dry_run=False,
+    )
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+class StandInWorker:
+    """Completes backfill runs after a short while; fails the first attempt of chunks in `fail_once`"""
+
+    def __init__(self, fail_once=()):
+        self.fail_once = set(fail_once)
+        self.peak = 0
+
+    async def run(self):
+        from prefect import get_client
+        from prefect.client.schemas.filters import FlowRunFilter, FlowRunFilterTags
+        from prefect.states import Completed, Failed, Running
+        from prefect_pagination import collect, iter_flow_runs
+
+        backfill_runs = FlowRunFilter(tags=FlowRunFilterTags(all_=["backfill"]))
+        async with get_client() as client:
+            while True:
+                runs = await collect(iter_flow_runs(client, flow_run_filter=backfill_runs))
+                unfinished = [run for run in runs if not run.state.is_final()]
+                self.peak = max(self.peak, len(unfinished))
+                for run in unfinished:
+                    if run.state.is_scheduled():
+                        await client.set_flow_run_state(run.id, Running(), force=True)
+                        continue
+                    start = run.parameters.get("start_date")
+                    if start in self.fail_once:
+                        self.fail_once.discard(start)
+                        await client.set_flow_run_state(run.id, Failed(), force=True)
+                    else:
+                        await client.set_flow_run_state(run.id, Completed(), force=True)
+                await asyncio.sleep(0.3)
+
+
+async def backfill_with_worker(args, worker: StandInWorker, cancel_after: float = None) -> int:
+    worker_task = asyncio.create_task(worker.run())
+    try:
+        backfill = run_backfill(args, build_chunks(args))
+        if cancel_after is None:
+            return await backfill
+        try:
+            return await asyncio.wait_for(backfill, timeout=cancel_after)
+        except asyncio.TimeoutError:
+            return -1
+    finally:
+        worker_task.cancel()
+
+
+async def run_counts() -> Counter:
+    """How many backfill runs exist per parameter set"""
+    from prefect import get_client
+    from prefect.client.schemas.filters import FlowRunFilter, FlowRunFilterTags
+    from prefect_pagination import collect, iter_flow_runs
+
+    async with get_client() as client:
+        runs = await collect(iter_flow_runs(client, flow_run_filter=FlowRunFilter(tags=FlowRunFilterTags(all_=["backfill"]))))
+    return Counter(canonical(run.parameters) for run in runs)
+
+
+async def check_backfill(workdir: Path):
+    from prefect import get_client
+
+    async with get_client() as client:
+        flow_id = await client.create_flow(latency_probe_flow)
+        await client.create_deployment(flow_id=flow_id, name="backfilled")
+
+    print("🧪 Checking chunking...")
+    assert [(str(a), str(b)) for a, b in date_chunks(date(2024, 1, 1), date(2024, 1, 10), 3)] == [
+        ("2024-01-01", "2024-01-03"), ("2024-01-04", "2024-01-06"), ("2024-01-07", "2024-01-09"), ("2024-01-10", "2024-01-10"),
+    ]
+    partitions = build_chunks(backfill_args(workdir, "2024-01-01", "2024-01-01", partitions=["eu", "us", "apac"], chunk_size=2))
+    assert list(partitions.values()) == [{"mode": "replay", "partition": ["eu", "us"]}, {"mode": "replay", "partition": ["apac"]}]
+    print("✅ Chunking OK")
+
+    print(f"🧪 Checking a backfill stays within {WINDOW} runs in flight...")
+    worker = StandInWorker()
+    args = backfill_args(workdir, "2024-01-01", "2024-01-18")
+    assert await backfill_with_worker(args, worker) == 0
+    assert worker.peak <= WINDOW, f"{worker.peak} runs were in flight"
+    counts = await run_counts()
+    assert len(counts) == 6 and set(counts.values()) == {1}, counts
+    checkpoint = json.loads(next((workdir / "checkpoints").glob("*.json")).read_text())
+    assert {chunk["status"] for chunk in checkpoint["chunks"].values()} == {"completed"}
+    print(f"✅ Window OK (peak {worker.peak} in flight)")
+
+    print("🧪 Checking chunks with a COMPLETED run are skipped...")
+    overlapping = backfill_args(workdir, "2024-01-13", "2024-01-24")
+    assert await backfill_with_worker(overlapping, StandInWorker()) == 0
+    counts = await run_counts()
+    assert len(counts) == 8 and set(counts.values()) == {1}, "the two chunks already run should not run again"
+    print("✅ Skipping OK")
+
+    print("🧪 Checking an interrupted backfill resumes without duplicates...")
+    resumed = backfill_args(workdir, "2024-02-01", "2024-02-24", max_in_flight=4)
+    assert await backfill_with_worker(resumed, StandInWorker(), cancel_after=0.5) == -1
+    interrupted = sum((await run_counts()).values())
+    assert 8 < interrupted < 16, f"the interruption should land mid-backfill ({interrupted - 8} runs submitted)"
+    # As if the process died after creating the runs but before saving the checkpoint
+    path = next(path for path in (workdir / "checkpoints").glob("*.json") if "2024-02-01..2024-02-03" in path.read_text())
+    state = json.loads(path.read_text())
+    for chunk in state["chunks"].values():
+        if chunk["status"] == "submitted":
+            chunk.update(status="pending", flow_run_id=None, attempt=chunk["attempt"] - 1)
+    path.write_text(json.dumps(state))
+    assert await backfill_with_worker(resumed, StandInWorker()) == 0
+    counts = await run_counts()
+    assert len(counts) == 16 and set(counts.values()) == {1}, counts
+    print(f"✅ Resume OK ({interrupted - 8} of 8 chunks submitted before the interruption)")
+
+    print("🧪 Checking failed chunks are retried...")
+    retried = backfill_args(workdir, "2024-03-01", "2024-03-06", retries=1)
+    assert await backfill_with_worker(retried, StandInWorker(fail_once={"2024-03-04"})) == 0
+    counts = await run_counts()
+    assert counts[canonical({"mode": "replay", "start_date": "2024-03-04", "end_date": "2024-03-06"})] == 2, counts
+
+    failing = backfill_args(workdir, "2024-04-01", "2024-04-03")
+    assert await backfill_with_worker(failing, StandInWorker(fail_once={"2024-04-01"})) == 1, "without retries the backfill fails"
+    assert await backfill_with_worker(failing, StandInWorker()) == 0, "re-running retries the failed chunk"
+    print("✅ Retries OK")
+
+
+if __name__ == "__main__":
+    workdir = Path(tempfile.mkdtemp(prefix="backfill-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_backfill(workdir))
+        print("🎉 All backfill checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Test the dbt model flow locally against DuckDB (no Snowflake needed)
+
+Builds a throwaway dbt project in a temp directory, runs it through the flow and
+checks DAG ordering, failure propagation, the parse cache, the timing
+warehouse, incremental watermarks, generated per-business-object models,
+state-based selection and partitioned runs.
+
+    pip install dbt-duckdb
+    python test_dbt_local.py
+"""
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Keep the checks' Prefect database and variables, parse cache, state manifests and timing
+# warehouse out of ~/.prefect: everything lives under a temporary home, on an ephemeral API
+TEST_HOME = Path(tempfile.mkdtemp(prefix="dbt-local-test-"))
+os.environ.update({"HOME": str(TEST_HOME), "PREFECT_HOME": str(TEST_HOME / ".prefect")})
+for name in ("PREFECT_API_URL", "PREFECT_API_KEY", "GELLC_DBT_CACHE_BLOCK", "GELLC_DBT_TIMINGS_DIR"):
+    os.environ.pop(name, None)
+
+from dbt_business_objects import generate_business_object_models
+from dbt_dag import ModelDag, build_model_dag, load_manifest
+from dbt_distributed_flow import dbt_distributed_flow
+from dbt_flow import DBT_PROJECT_DIR, dbt_model_flow, invoke_dbt
+from dbt_parse_cache import project_fingerprint, restore_parse_cache
+from dbt_partition import build_segments, partition_models
+from dbt_state import load_state_manifest
+from dbt_timings import build_timing_report, critical_path, ingest_run_results, is_regression, model_stats
+from dbt_watermarks import load_watermarks
+
+PROJECT_YML = """
+name: 'local_check'
+version: '1.0.0'
+config-version: 2
+profile: 'local_check'
+model-paths: ["models"]
+macro-paths: ["macros"]
+"""
+
+PROFILES_YML = """
+local_check:
+  target: duckdb
+  outputs:
+    duckdb:
+      type: duckdb
+      path: "{path}"
+      threads: 4
+"""
+
+# orders <- order_totals <- revenue, customers <- broken <- broken_child
+DAG_MODELS = {
+    "orders": "select 1 as id, 10.0 as amount union all select 2, 5.0",
+    "customers": "select 1 as id, 'ada' as name",
+    "order_totals": "select sum(amount) as total from {{ ref('orders') }}",
+    "revenue": "select total * 2 as revenue from {{ ref('order_totals') }}",
+    "broken": "select missing_column from {{ ref('customers') }}",
+    "broken_child": "select * from {{ ref('broken') }}",
+}
+
+
+def write_project(root: Path, models: dict, macros: dict = None) -> Path:
+    """Write a small dbt project and a DuckDB profile under `root`"""
+    (root / "models").mkdir(parents=True, exist_ok=True)
+    (root / "macros").mkdir(exist_ok=True)
+    (root / "dbt_project.yml").write_text(PROJECT_YML)
+    (root / "profiles.yml").write_text(PROFILES_YML.format(path=root / "local.duckdb"))
+    for name, sql in models.items():
+        (root / "models" / f"{name}.sql").write_text(sql)
+    for name, sql in (macros or {}).items():
+        (root / "macros" / f"{name}.sql").write_text(sql)
+    return root
+
+
+def read_model_statuses(project: Path, models: dict) -> dict:
+    """Read statuses back from the per-model run_results written by dbt"""
+    statuses = {}
+    for name in models:
+        results = project / "target" / "models" / name / "run_results.json"
+        if not results.exists():
+            statuses[name] = "skipped"
+            continue
+        status = json.loads(results.read_text())["results"][0]["status"]
+        statuses[name] = "success" if status == "success" else "error"
+    return statuses
+
+
+def check_dag_execution():
+    """Independent branches finish and failures skip only their descendants"""
+    print("🧪 Checking DAG execution and failure propagation...")
+    with tempfile.TemporaryDirectory() as tmp:
+        project = write_project(Path(tmp), DAG_MODELS)
+        os.environ["DBT_PROFILES_DIR"] = str(project)
+
+        state = dbt_model_flow(project_dir=str(project), max_workers=3, return_state=True)
+        assert state.is_failed(), f"Expected the flow to fail, got {state.type}"
+
+        statuses = read_model_statuses(project, DAG_MODELS)
+        expected = {
+            "orders": "success",
+            "customers": "success",
+            "order_totals": "success",
+            "revenue": "success",
+            "broken": "error",
+            "broken_child": "skipped",
+        }
+        assert statuses == expected, statuses
+    print("✅ DAG execution OK")
+
+
+# Stand-ins for the claymore packages' deduped tables, as views over raw tables we control
+CLAYMORE_STUBS = {
+    "claymore_core": ["people"],
+    "claymore_crm": ["deals"],
+    "claymore_lending": ["loans", "payments"],
+}
+
+BUSINESS_OBJECTS_VAR = """
+vars:
+  'claymore_core:all_business_objects':
+{objects}
+"""
+
+
+def write_business_objects(root: Path, stubs: dict):
+    """Declare every stubbed table as a business object in the project's vars"""
+    objects = "\n".join(
+        f"    - {{package: {package}, record_type_plural: {table}}}"
+        for package, tables in stubs.items()
+        for table in tables
+    )
+    (root / "dbt_project.yml").write_text(PROJECT_YML + BUSINESS_OBJECTS_VAR.format(objects=objects))
+
+
+def write_claymore_stubs(root: Path, stubs: dict = CLAYMORE_STUBS):
+    """Write local claymore packages whose deduped models read raw_<table> tables"""
+    packages = []
+    for package, tables in stubs.items():
+        package_dir = root / "stub_packages" / package
+        (package_dir / "models").mkdir(parents=True, exist_ok=True)
+        (package_dir / "dbt_project.yml").write_text(
+            f"name: '{package}'\nversion: '1.0.0'\nconfig-version: 2\n"
+        )
+        for table in tables:
+            (package_dir / "models" / f"deduped_{table}.sql").write_text(
+                f"{{{{ config(materialized='view') }}}}\nselect * from main.raw_{table}"
+            )
+        packages.append(f"  - local: stub_packages/{package}")
+    (root / "packages.yml").write_text("packages:\n" + "\n".join(packages) + "\n")
+
+
+def insert_raw_rows(database: Path, table: str, start: int, count: int):
+    """Insert rows (every fifth one with invalid JSON) into raw_<table>"""
+    import duckdb
+
+    with duckdb.connect(str(database)) as connection:
+        connection.execute(
+            f"create table if not exists raw_{table} "
+            "(uuid varchar, external_ids varchar, source_uuids varchar, updated_at timestamp)"
+        )
+        for i in range(start, start + count):
+            external_ids = "{not json" if i % 5 == 0 else json.dumps({"hubspot": f"hs-{i}"})
+            connection.execute(
+                f"insert into raw_{table} values (?, ?, ?, timestamp '2024-01-01' + to_minutes(?))",
+                [f"{table}-{i}", external_ids, json.dumps([f"src-{i}"]), i],
+            )
+
+
+def loads_per_table(database: Path) -> dict:
+    """Rows loaded by each invocation, oldest first, per table in test_json"""
+    import duckdb
+
+    with duckdb.connect(str(database)) as connection:
+        rows = connection.execute(
+            "select table_name, count(*) from test_json "
+            "group by table_name, loaded_by_invocation order by table_name, min(watermark_value)"
+        ).fetchall()
+    loads = {}
+    for table, count in rows:
+        loads.setdefault(table, []).append(count)
+    return loads
+
+
+def write_test_json_project(root: Path, stubs: dict = CLAYMORE_STUBS) -> Path:
+    """A project with the real test_json models and macros over stub claymore packages"""
+    project = write_project(root, {})
+    shutil.copy(DBT_PROJECT_DIR / "models" / "test_json.sql", project / "models")
+    for macro in (DBT_PROJECT_DIR / "macros").glob("*.sql"):
+        shutil.copy(macro, project / "macros")
+    write_business_objects(project, stubs)
+    write_claymore_stubs(project, stubs)
+    os.environ["DBT_PROFILES_DIR"] = str(project)
+    invoke_dbt(["deps"], project)
+    return project
+
+
+def check_parse_cache():
+    """Macro and var changes change the cache key, and a cache hit skips `dbt parse`"""
+    print("🧪 Checking the dbt parse cache...")
+    import dbt_flow
+
+    macro = "{% macro double(column) %} {{ column }} * 2 {% endmacro %}"
+    models = {"orders": DAG_MODELS["orders"], "doubled": "select {{ double('amount') }} as amount from {{ ref('orders') }}"}
+    with tempfile.TemporaryDirectory() as tmp:
+        project = write_project(Path(tmp), models, {"double": macro})
+        os.environ["DBT_PROFILES_DIR"] = str(project)
+        original = project_fingerprint(project)
+        assert project_fingerprint(project) == original, "the fingerprint should be deterministic"
+
+        (project / "macros" / "double.sql").write_text(macro.replace("* 2", "* 3"))
+        changed_macro = project_fingerprint(project)
+        assert changed_macro != original, "a macro change should change the fingerprint"
+        assert project_fingerprint(project, vars={"rate": 2}) != changed_macro, "CLI vars should change it"
+        (project / "dbt_project.yml").write_text(PROJECT_YML + "vars:\n  rate: 2\n")
+        assert project_fingerprint(project) != changed_macro, "project vars should change it"
+        (project / "dbt_project.yml").write_text(PROJECT_YML)
+        (project / "macros" / "double.sql").write_text(macro)
+        assert project_fingerprint(project) == original
+
+        commands = []
+        invoke_dbt_original = dbt_flow.invoke_dbt
+
+        def recording_invoke_dbt(command, *args, **kwargs):
+            commands.append(command[0])
+            return invoke_dbt_original(command, *args, **kwargs)
+
+        dbt_flow.invoke_dbt = recording_invoke_dbt
+        try:
+            dbt_flow.parse_project.fn(str(project))
+            assert commands == ["parse"], commands
+            manifest = (project / "target" / "manifest.json").read_bytes()
+            shutil.rmtree(project / "target")
+
+            dbt_flow.parse_project.fn(str(project))
+            assert commands == ["parse"], f"a cache hit should not run dbt again: {commands}"
+            assert (project / "target" / "manifest.json").read_bytes() == manifest
+            assert (project / "target" / "partial_parse.msgpack").is_file()
+
+            (project / "macros" / "double.sql").write_text(macro.replace("* 2", "* 4"))
+            assert not restore_parse_cache(project_fingerprint(project), project / "elsewhere")
+            dbt_flow.parse_project.fn(str(project))
+            assert commands == ["parse", "parse"], f"a changed macro should parse again: {commands}"
+        finally:
+            dbt_flow.invoke_dbt = invoke_dbt_original
+    print("✅ Parse cache OK")
+
+
+def write_run_results(directory: Path, invocation: int, seconds: dict, status: str = "success") -> Path:
+    """A run_results.json with one result per model, finishing `invocation` minutes into the day"""
+    path = directory / f"run_results_{invocation}.json"
+    path.write_text(json.dumps({
+        "metadata": {"invocation_id": f"invocation-{invocation}"},
+        "results": [
+            {
+                "unique_id": f"model.local_check.{model}",
+                "status": status,
+                "execution_time": duration,
+                "adapter_response": {"rows_affected": invocation},
+                "thread_id": "Thread-1",
+                "timing": [{"name": "execute", "started_at": f"2024-01-01T00:{invocation:02d}:00Z",
+                            "completed_at": f"2024-01-01T00:{invocation:02d}:30Z"}],
+            }
+            for model, duration in seconds.items()
+        ],
+    }))
+    return path
+
+
+def check_timings():
+    """Trailing medians cover only the window, regressions need both thresholds, the critical path is the slowest chain"""
+    print("🧪 Checking the timing warehouse...")
+    target = "timings_check"
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Older runs outside a 3-run window are slow and must not count
+        history = [50.0, 50.0, 2.0, 2.0, 4.0]
+        for invocation, seconds in enumerate(history):
+            ingest_run_results(write_run_results(tmp, invocation, {"orders": seconds, "customers": 1.0}), target)
+        ingest_run_results(write_run_results(tmp, 5, {"orders": 99.0}, status="error"), target)
+        ingest_run_results(write_run_results(tmp, 6, {"orders": 5.0, "revenue": 3.0, "customers": 1.2}), target)
+
+        stats = model_stats(target, trailing_runs=3)
+        orders = stats["model.local_check.orders"]
+        assert orders["latest"] == 5.0, "failed runs should be ignored"
+        assert (orders["trailing_median"], orders["trailing_runs"]) == (2.0, 3), orders
+        assert orders["rows_affected"] == 6 and orders["thread_id"] == "Thread-1", orders
+        assert is_regression(orders), "5.0s against a 2.0s median is a regression"
+        assert not is_regression(stats["model.local_check.customers"]), "1.2s against 1.0s is under both thresholds"
+        assert stats["model.local_check.revenue"]["trailing_median"] is None, "a first run has no median"
+        assert not is_regression(stats["model.local_check.revenue"])
+        assert model_stats("another_target") == {}, "targets keep separate histories"
+
+        nodes = {
+            "model.local_check.orders": [], "model.local_check.customers": [],
+            "model.local_check.order_totals": ["model.local_check.orders"],
+            "model.local_check.revenue": ["model.local_check.order_totals", "model.local_check.customers"],
+        }
+        dag = ModelDag({uid: {"name": uid.rsplit(".", 1)[-1], "depends_on": {"nodes": parents}}
+                        for uid, parents in nodes.items()})
+        durations = {"model.local_check.orders": 5.0, "model.local_check.customers": 7.0,
+                     "model.local_check.order_totals": 1.0, "model.local_check.revenue": 3.0}
+        assert critical_path(dag, durations) == ["model.local_check.customers", "model.local_check.revenue"]
+        report = build_timing_report(dag, stats)
+        # order_totals has no history, so it counts as 0s but still links orders to revenue
+        assert report["critical_path"] == ["orders", "order_totals", "revenue"], report["critical_path"]
+        assert report["critical_path_seconds"] == 8.0, report
+        assert [row["model"] for row in report["regressions"]] == ["orders"], report["regressions"]
+    print("✅ Timing warehouse OK")
+
+
+def check_incremental_test_json():
+    """The per-object test_json models only process rows past their stored watermarks"""
+    print("🧪 Checking incremental test_json...")
+    with tempfile.TemporaryDirectory() as tmp:
+        project = write_test_json_project(Path(tmp))
+        database = project / "local.duckdb"
+        tables = [table for tables in CLAYMORE_STUBS.values() for table in tables]
+        for table in tables:
+            insert_raw_rows(database, table, 0, 20)
+
+        dbt_model_flow(project_dir=str(project))
+        first = loads_per_table(database)
+        assert first == {table: [20] for table in tables}, first
+        stored = load_watermarks("local_check__default", "test_json_people")
+        assert stored and not load_watermarks("local_check__snowflake", "test_json_people"), stored
+
+        insert_raw_rows(database, "people", 20, 3)
+        insert_raw_rows(database, "loans", 20, 2)
+        dbt_model_flow(project_dir=str(project))
+        second = loads_per_table(database)
+        assert second == {**first, "people": [20, 3], "loans": [20, 2]}, second
+
+        # A run with no new rows processes nothing
+        dbt_model_flow(project_dir=str(project))
+        assert loads_per_table(database) == second
+
+        dbt_model_flow(project_dir=str(project), full_refresh=True)
+        rebuilt = loads_per_table(database)
+        assert rebuilt == {**first, "people": [23], "loans": [22]}, rebuilt
+    print("✅ Incremental test_json OK")
+
+
+def check_business_object_models():
+    """Each business object gets its own independent model, and a new object needs no SQL"""
+    print("🧪 Checking generated business object models...")
+    stubs = {**CLAYMORE_STUBS, "claymore_crm": ["deals", "contacts"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        project = write_test_json_project(Path(tmp), stubs)
+        database = project / "local.duckdb"
+        for tables in stubs.values():
+            for table in tables:
+                insert_raw_rows(database, table, 0, 10)
+
+        statuses = dbt_model_flow(project_dir=str(project), full_refresh=True)
+        ran = {uid.rsplit(".", 1)[-1]: status for uid, status in statuses.items()}
+        models = [f"test_json_{table}" for tables in stubs.values() for table in tables]
+        assert all(ran.get(model) == "success" for model in models + ["test_json"]), ran
+
+        dag = build_model_dag(load_manifest(project / "target" / "manifest.json"))
+        object_models = [uid for uid in dag.nodes if dag.name(uid) in models]
+        assert not dag.ancestors(object_models) & set(object_models), "business object models depend on each other"
+        assert loads_per_table(database) == {model[len("test_json_"):]: [10] for model in models}
+
+        # Dropping an object from the var removes its generated model
+        write_business_objects(project, CLAYMORE_STUBS)
+        generate_business_object_models(project)
+        assert not (project / "models" / "json_validation" / "test_json_contacts.sql").exists()
+    print("✅ Business object models OK")
+
+
+def check_state_selection():
+    """A selective run only picks modified models and their descendants"""
+    print("🧪 Checking state-based selection...")
+    models = {name: DAG_MODELS[name] for name in ["orders", "customers", "order_totals", "revenue"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        project = write_project(Path(tmp), models)
+        os.environ["DBT_PROFILES_DIR"] = str(project)
+
+        # A full run saves the state manifest
+        first = dbt_model_flow(project_dir=str(project))
+        assert len(first) == 4, first
+
+        (project / "models" / "order_totals.sql").write_text(
+            "select sum(amount) as total, count(*) as orders from {{ ref('orders') }}"
+        )
+        second = dbt_model_flow(project_dir=str(project), selective=True)
+        selected = sorted(uid.rsplit(".", 1)[-1] for uid in second)
+        assert selected == ["order_totals", "revenue"], selected
+
+        # Nothing changed since the last successful run
+        third = dbt_model_flow(project_dir=str(project), selective=True)
+        assert third == {}, third
+        assert load_state_manifest("local_check__default") is not None
+        assert load_state_manifest("default") is None, "state should be keyed by project and target"
+    print("✅ State selection OK")
+
+
+def check_partitioned_run():
+    """Long chains land on separate partitions and cross-partition parents finish first"""
+    import dbt_flow
+
+    print("🧪 Checking partitioned runs...")
+    # a1 <- a2, b1 <- b2, and a join needing both chains
+    nodes = {
+        uid: {"name": uid, "depends_on": {"nodes": parents}}
+        for uid, parents in {
+            "a1": [], "a2": ["a1"], "b1": [], "b2": ["b1"], "join": ["a2", "b2"],
+        }.items()
+    }
+    dag = ModelDag(nodes)
+    durations = {"a1": 100.0, "a2": 100.0, "b1": 100.0, "b2": 100.0, "join": 10.0}
+    assignment, starts, makespan = partition_models(dag, durations, partitions=2)
+    assert assignment["a1"] == assignment["a2"] != assignment["b1"] == assignment["b2"], assignment
+    assert makespan < sum(durations.values()), makespan
+
+    segments = build_segments(dag, assignment, starts)
+    join_segment = next(name for name, node in segments.nodes.items() if "join" in node["models"])
+    upstream = {uid for parent in segments.ancestors([join_segment]) for uid in segments.nodes[parent]["models"]}
+    assert {"a2", "b2"} <= upstream, upstream
+
+    models = {name: DAG_MODELS[name] for name in ["orders", "customers", "order_totals", "revenue"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        project = write_project(Path(tmp), models)
+        os.environ["DBT_PROFILES_DIR"] = str(project)
+
+        # Record where each parse lands rather than relying on segments not overlapping
+        parse_dirs = []
+        original_restore = dbt_flow.restore_parse_cache
+
+        def recording_restore(fingerprint, target_dir):
+            parse_dirs.append(Path(target_dir))
+            return original_restore(fingerprint, target_dir)
+
+        dbt_flow.restore_parse_cache = recording_restore
+        try:
+            statuses = dbt_distributed_flow(partitions=2, project_dir=str(project))
+        finally:
+            dbt_flow.restore_parse_cache = original_restore
+        assert set(statuses.values()) == {"success"}, statuses
+        model_statuses = read_model_statuses(project, models)
+        assert set(model_statuses.values()) == {"success"}, model_statuses
+
+        shared = project / "target"
+        assert parse_dirs.count(shared) == 1, "only the parent run should parse into target/"
+        segment_dirs = [path for path in parse_dirs if path != shared]
+        assert len(segment_dirs) == len(statuses) and len(set(segment_dirs)) == len(segment_dirs), parse_dirs
+        assert all(path.parent == shared / "runs" for path in segment_dirs), segment_dirs
+        assert not any((shared / "runs").iterdir()), "segment parse directories should be removed"
+
+        # Concurrent generation leaves the same complete files and the same fingerprint
+        write_business_objects(project, CLAYMORE_STUBS)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: generate_business_object_models(project), range(32)))
+            fingerprints = set(pool.map(lambda _: project_fingerprint(project), range(32)))
+        assert len(fingerprints) == 1, fingerprints
+        generated = list((project / "models" / "json_validation").iterdir())
+        assert generated and all(path.suffix == ".sql" and path.read_text() for path in generated), generated
+    print("✅ Partitioned runs OK")
+
+
+if __name__ == "__main__":
+    try:
+        check_dag_execution()
+        check_parse_cache()
+        check_timings()
+        check_incremental_test_json()
+        check_business_object_models()
+        check_state_selection()
+        check_partitioned_run()
+        print("🎉 All local dbt checks passed!")
+    finally:
+        shutil.rmtree(TEST_HOME, ignore_errors=True)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the concurrent environment probe engine
+
+    python test_environment_probes.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import environment_probes
+from environment_probes import _markers_in, distribution_index, package_version, run_probes
+
+
+def check_global_deadline():
+    """Slow probes run side by side and are cut off by one overall deadline"""
+    print("🧪 Checking the probe deadline...")
+
+    def slow():
+        time.sleep(3)
+        return {"slow": True}
+
+    def failing():
+        raise ValueError("no metadata")
+
+    started = time.monotonic()
+    results = run_probes(
+        {"fast": lambda: {"fast": True}, "slow_a": slow, "slow_b": slow, "failing": failing},
+        deadline=0.5,
+    )
+    elapsed = time.monotonic() - started
+    assert elapsed < 1.0, f"probes took {elapsed:.2f}s with a 0.5s deadline"
+    assert results["fast"] == {"fast": True}, results
+    assert results["slow_a"]["error"] == "timeout" and results["slow_b"]["error"] == "timeout", results
+    assert results["failing"] == {"error": "ValueError: no metadata"}, results
+    print(f"✅ Deadline OK ({elapsed:.2f}s)")
+
+
+def check_proc_scan():
+    """Markers are found line by line and the scan stops once all of them were seen"""
+    print("🧪 Checking streaming marker scans...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cgroup"
+        path.write_text("12:cpu:/\n11:memory:/ecs/task/abc\n10:pids:/docker/123\n")
+        assert _markers_in(str(path)) == ["docker", "ecs"]
+        assert _markers_in(str(Path(tmp) / "missing")) == []
+
+        # Whole path segments only: letters inside unrelated names don't count
+        path.write_text("0::/user.slice/user-1000.slice/session-decs.scope\n"
+                        "36 25 0:32 / /sys/fs/cgroup/specs rw - tmpfs ecsfs rw,dockerless\n")
+        assert _markers_in(str(path)) == [], _markers_in(str(path))
+        path.write_text("0::/system.slice/docker-3f2a.scope\n1:name=systemd:/kubepods-burstable.slice/pod1\n")
+        assert _markers_in(str(path)) == ["docker", "kubepods"]
+        path.write_text("0::/ecs-agent/abc\n")
+        assert _markers_in(str(path)) == [], "ecs only matches as a whole segment"
+    print("✅ Proc scans OK")
+
+
+def check_distribution_index():
+    """The index is built once and answers lookups with normalized names"""
+    print("🧪 Checking the distribution index...")
+    index = distribution_index()
+    assert distribution_index() is index, "the index should be cached while sys.path is unchanged"
+    assert package_version("prefect") and package_version("Prefect") == package_version("prefect")
+    assert package_version("prefect_aws") == package_version("prefect-aws")
+    assert package_version("surely-not-installed-anywhere") is None
+    environment_probes._distribution_index_key = None
+    assert distribution_index() is not index, "a changed sys.path should rebuild the index"
+    print("✅ Distribution index OK")
+
+
+if __name__ == "__main__":
+    check_global_deadline()
+    check_proc_scan()
+    check_distribution_index()
+    print("🎉 All environment probe checks passed!")
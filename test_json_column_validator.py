@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the JSON column validator on DuckDB and Parquet sources
+
+    python test_json_column_validator.py
+"""
+import tempfile
+from pathlib import Path
+
+import duckdb
+
+import json_column_validator
+from json_column_validator import publish_validation_report, validate_table
+
+ROWS = 2500
+# uuid -> (external_ids, source_uuids); every other row is valid
+INVALID = {
+    "row-0007": ('{"crm": "a1"', '["s-7"]'),
+    "row-1200": ("not json", '["s-1200"]'),
+    "row-2499": ('{"crm": "c3"}', "[1, 2,"),
+}
+
+
+def write_people(database: Path, table: str, invalid: dict):
+    rows = []
+    for i in range(ROWS):
+        uuid = f"row-{i:04d}"
+        external_ids, source_uuids = invalid.get(uuid, (f'{{"crm": "{i}"}}', f'["s-{i}"]'))
+        # Nulls are missing values, not invalid JSON
+        rows.append((uuid, None if i == 5 else external_ids, source_uuids))
+    connection = duckdb.connect(str(database))
+    try:
+        connection.execute(f"create or replace table {table} (uuid varchar, external_ids varchar, source_uuids varchar)")
+        connection.executemany(f"insert into {table} values (?, ?, ?)", rows)
+    finally:
+        connection.close()
+
+
+def check_result(result: dict):
+    assert result["rows"] == ROWS, result
+    assert result["invalid_external_ids"] == 2, result
+    assert result["invalid_source_uuids"] == 1, result
+    reported = {(uuid, column) for uuid, column, _ in result["samples"]}
+    assert reported == {("row-0007", "external_ids"), ("row-1200", "external_ids"),
+                        ("row-2499", "source_uuids")}, result["samples"]
+    assert ("row-1200", "external_ids", "not json") in result["samples"], "samples should carry the bad value"
+
+
+def check_sources():
+    print("🧪 Checking valid and invalid JSON columns on DuckDB and Parquet...")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        database = root / "people.duckdb"
+        write_people(database, "deduped_people", INVALID)
+        write_people(database, "valid_people", {})
+
+        # Small batches, so the rows are spread over several parallel batches
+        duckdb_result = validate_table.fn("people", f"duckdb://{database}", "deduped_people", batch_size=1000)
+        check_result(duckdb_result)
+        valid = validate_table.fn("valid", f"duckdb://{database}", "valid_people", batch_size=1000)
+        assert valid["rows"] == ROWS and valid["invalid_external_ids"] == valid["invalid_source_uuids"] == 0, valid
+        assert valid["samples"] == [], valid
+
+        parquet = root / "parquet"
+        parquet.mkdir()
+        connection = duckdb.connect(str(database), read_only=True)
+        try:
+            for table in ["deduped_people", "valid_people"]:
+                connection.execute(f"copy {table} to '{parquet / table}.parquet' (format parquet, row_group_size 700)")
+        finally:
+            connection.close()
+        parquet_result = validate_table.fn("people", f"parquet://{parquet}", "deduped_people", batch_size=1000)
+        check_result(parquet_result)
+        valid = validate_table.fn("valid", f"parquet://{parquet}", "valid_people", batch_size=1000)
+        assert valid["invalid_external_ids"] == valid["invalid_source_uuids"] == 0 and not valid["samples"], valid
+    print("✅ Sources OK")
+    return duckdb_result, valid
+
+
+def check_report(invalid_result: dict, valid_result: dict):
+    print("🧪 Checking the per-table report...")
+    artifacts = {}
+    original = json_column_validator.create_table_artifact, json_column_validator.create_markdown_artifact
+    json_column_validator.create_table_artifact = lambda table, key, description: artifacts.update({key: table})
+    json_column_validator.create_markdown_artifact = lambda markdown, key, description: artifacts.update({key: markdown})
+    try:
+        publish_validation_report([valid_result], json_column_validator.JSON_COLUMNS)
+        assert "Every value parsed as JSON" in artifacts["json-column-validation-samples"], artifacts
+        publish_validation_report([invalid_result, valid_result], json_column_validator.JSON_COLUMNS)
+    finally:
+        json_column_validator.create_table_artifact, json_column_validator.create_markdown_artifact = original
+
+    summary = {row["table"]: row for row in artifacts["json-column-validation"]}
+    assert summary["people"]["invalid_external_ids"] == 2 and summary["people"]["invalid_source_uuids"] == 1
+    assert summary["valid"]["invalid_external_ids"] == 0 and "samples" not in summary["valid"]
+    markdown = artifacts["json-column-validation-samples"]
+    assert "| people | `row-1200` | external_ids | `not json` |" in markdown, markdown
+    assert "| people | `row-2499` | source_uuids | `[1, 2,` |" in markdown, markdown
+    assert "| valid |" not in markdown, "a clean table has no sample rows"
+    print("✅ Report OK")
+
+
+if __name__ == "__main__":
+    invalid_result, valid_result = check_sources()
+    check_report(invalid_result, valid_result)
+    print("🎉 All JSON column validator checks passed!")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the memory tracing hook's leak detection
+
+    python test_memory_hooks.py
+"""
+import tempfile
+from pathlib import Path
+
+import memory_hooks
+from memory_hooks import LEAK_CONSECUTIVE_RUNS, LEAK_MIN_GROWTH_BYTES, is_growing, rss_is_growing, trace_memory_run
+
+MiB = 1024 * 1024
+LEAKED = []
+
+
+def check_leak_detection():
+    print("🧪 Checking which retained-memory histories are flagged...")
+    assert is_growing([MiB] * LEAK_CONSECUTIVE_RUNS), "a steady 1 MiB/run leak should be flagged"
+    assert is_growing([0, 0, MiB, 2 * MiB, 3 * MiB]), "an accelerating leak should be flagged"
+    assert not is_growing([MiB] * (LEAK_CONSECUTIVE_RUNS - 1)), "too few runs to tell"
+    assert not is_growing([MiB, MiB, 0]), "a run that retained nothing breaks the streak"
+    assert not is_growing([LEAK_MIN_GROWTH_BYTES - 1] * 5), "small retention is noise"
+
+    base = 200 * MiB
+    assert rss_is_growing([base + i * MiB for i in range(LEAK_CONSECUTIVE_RUNS + 1)]), "a rising worker RSS"
+    assert not rss_is_growing([base] * 5), "a flat worker RSS is not growth"
+    print("✅ Leak detection OK")
+
+
+def run_traced(leak_bytes: int):
+    with trace_memory_run(True):
+        if leak_bytes:
+            LEAKED.append(bytearray(leak_bytes))
+        else:
+            bytearray(MiB)
+
+
+def check_traced_runs():
+    print("🧪 Checking a steady 1 MiB/run leak is reported across traced runs...")
+    reports = []
+    original_publish, original_history = memory_hooks._publish_report, memory_hooks.HISTORY_FILE
+    memory_hooks._publish_report = lambda flow_name, markdown, growing: reports.append((markdown, growing))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            memory_hooks.HISTORY_FILE = Path(tmp) / "leaking.json"
+            for _ in range(LEAK_CONSECUTIVE_RUNS):
+                run_traced(MiB)
+            assert [growing for _, growing in reports] == [False] * (LEAK_CONSECUTIVE_RUNS - 1) + [True], reports
+            assert "Possible leak" in reports[-1][0]
+
+            reports.clear()
+            memory_hooks.HISTORY_FILE = Path(tmp) / "steady.json"
+            for _ in range(LEAK_CONSECUTIVE_RUNS + 1):
+                run_traced(0)
+            assert not any(growing for _, growing in reports), "freed allocations should not be flagged"
+    finally:
+        memory_hooks._publish_report, memory_hooks.HISTORY_FILE = original_publish, original_history
+        LEAKED.clear()
+    print("✅ Traced runs OK")
+
+
+if __name__ == "__main__":
+    check_leak_detection()
+    check_traced_runs()
+    print("🎉 All memory hook checks passed!")
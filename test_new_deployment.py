@@ -5,6 +5,7 @@ Test the new deployment
 import asyncio
 import time
 from prefect import get_client
+from prefect_pagination import deployments_named
 
 async def test_new_deployment():
     """Test the new deployment"""
@@ -14,13 +15,7 @@ async def test_new_deployment():
     try:
         async with get_client() as client:
             # Get the new deployment
-            deployments = await client.read_deployments()
-            target_deployment = None
-            
-            for deployment in deployments:
-                if deployment.name == "my-first-flow-process":
-                    target_deployment = deployment
-                    break
+            target_deployment = next(iter(await deployments_named(client, "my-first-flow-process")), None)
             
             if not target_deployment:
                 print("❌ Deployment 'my-first-flow-process' not found")
@@ -4,6 +4,7 @@ Create a fresh flow run to test if the workers are now working properly
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import iter_work_queues
 
 async def create_fresh_flow_run():
     """Create a new flow run to test current worker capacity"""
@@ -39,12 +40,7 @@ async def create_fresh_flow_run():
         # Also check current worker queue status
         print(f"\n🔍 CHECKING WORK QUEUE STATUS:")
         try:
-            work_queues = await client.read_work_queues(
-                work_pool_name="gellc-process-pool",
-                limit=5
-            )
-            
-            for wq in work_queues:
+            async for wq in iter_work_queues(client, "gellc-process-pool"):
                 if wq.name == "default":
                     print(f"  Queue: {wq.name}")
                     print(f"  Is paused: {wq.is_paused}")
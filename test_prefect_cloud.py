@@ -6,6 +6,7 @@ import os
 import sys
 import asyncio
 from prefect import get_client
+from prefect_pagination import collect, iter_work_pools
 
 async def test_prefect_cloud_connection():
     """Test connection to Prefect Cloud"""
@@ -32,7 +33,7 @@ async def test_prefect_cloud_connection():
         # Test the connection
         async with get_client() as client:
             # Try to get workspace info - test with a simple API call
-            work_pools = await client.read_work_pools()
+            work_pools = await collect(iter_work_pools(client))
             print(f"✅ Successfully connected to Prefect Cloud!")
             print(f"🏊 Available work pools: {len(work_pools)}")
             for pool in work_pools:
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the paginated iterators, against a fake endpoint and a temporary Prefect server
+
+    python test_prefect_pagination.py
+"""
+import asyncio
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from prefect_test_support import start_prefect_server
+from prefect_pagination import collect, iter_variables, paginate
+
+READ_SECONDS = 0.1
+
+
+class FakeEndpoint:
+    """A list endpoint over `total` integers that records every request"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.requests = []
+        self.cancelled = 0
+
+    async def read(self, limit: int, offset: int, **filters) -> list:
+        self.requests.append((offset, limit, filters))
+        try:
+            await asyncio.sleep(READ_SECONDS)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return list(range(offset, min(offset + limit, self.total)))
+
+
+async def check_pages():
+    print("🧪 Checking every page is read once...")
+    endpoint = FakeEndpoint(450)
+    items = await collect(paginate(endpoint.read, state="late"))
+    assert items == list(range(450)), "items should come back complete and in order"
+    assert [(offset, limit) for offset, limit, _ in endpoint.requests] == [(0, 200), (200, 200), (400, 200)]
+    assert all(filters == {"state": "late"} for _, _, filters in endpoint.requests), "filters go on every page"
+
+    endpoint = FakeEndpoint(400)
+    assert len(await collect(paginate(endpoint.read))) == 400
+    assert len(endpoint.requests) == 3, "a full last page needs one more (empty) request to be sure"
+    print("✅ Pages OK")
+
+
+async def check_limit():
+    print("🧪 Checking limit...")
+    endpoint = FakeEndpoint(1000)
+    assert await collect(paginate(endpoint.read, limit=5)) == [0, 1, 2, 3, 4]
+    assert [(offset, limit) for offset, limit, _ in endpoint.requests] == [(0, 5)], endpoint.requests
+
+    endpoint = FakeEndpoint(1000)
+    assert len(await collect(paginate(endpoint.read, limit=250))) == 250
+    assert [(offset, limit) for offset, limit, _ in endpoint.requests] == [(0, 200), (200, 50)], endpoint.requests
+    print("✅ Limit OK")
+
+
+async def check_prefetch():
+    print("🧪 Checking the next page is read while the current one is processed...")
+
+    async def consume(prefetch: bool) -> float:
+        started = time.perf_counter()
+        async for item in paginate(FakeEndpoint(600).read, prefetch=prefetch):
+            if item % 200 == 0:
+                await asyncio.sleep(READ_SECONDS)  # work on the page
+        return time.perf_counter() - started
+
+    serial, overlapped = await consume(False), await consume(True)
+    assert overlapped < serial - 2 * READ_SECONDS, f"prefetch {overlapped:.2f}s vs serial {serial:.2f}s"
+    print(f"✅ Prefetch OK ({serial:.2f}s serial, {overlapped:.2f}s prefetched)")
+
+
+async def check_early_break():
+    print("🧪 Checking an early break stops paging...")
+    endpoint = FakeEndpoint(10_000)
+    async for item in paginate(endpoint.read):
+        if item == 10:
+            break
+    for _ in range(3):
+        await asyncio.sleep(0)  # let the loop finalize the generator
+    assert len(endpoint.requests) == 2, "only the current page and one prefetch should be requested"
+    assert endpoint.cancelled == 1, "the outstanding prefetch should be cancelled"
+    print("✅ Early break OK")
+
+
+async def check_variables():
+    from prefect import get_client
+    from prefect.client.schemas.actions import VariableCreate
+    from prefect.client.schemas.filters import VariableFilter, VariableFilterName
+
+    print("🧪 Checking variables are paged past the server's page size...")
+    async with get_client() as client:
+        for i in range(210):
+            await client.create_variable(VariableCreate(name=f"page_var_{i:03d}", value=str(i)))
+        await client.create_variable(VariableCreate(name="other_var", value="x"))
+
+        names = [variable.name async for variable in iter_variables(client)]
+        assert len(names) == 211 and len(set(names)) == 211, len(names)
+        only_pages = VariableFilter(name=VariableFilterName(like_="page_var_%"))
+        assert len(await collect(iter_variables(client, variable_filter=only_pages))) == 210
+    print("✅ Variables OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(check_pages())
+    asyncio.run(check_limit())
+    asyncio.run(check_prefetch())
+    asyncio.run(check_early_break())
+
+    workdir = Path(tempfile.mkdtemp(prefix="pagination-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_variables())
+        print("🎉 All pagination checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the result serializers through persisted flow results on a temporary Prefect server
+
+    python test_result_serializers.py
+"""
+import json
+import os
+import shutil
+import struct
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from prefect_test_support import start_prefect_server
+from result_serializers import PICKLE5_MAGIC, Pickle5Serializer, get_result_serializer
+
+PLAIN = {"id": 7, "name": "claymore", "scores": [1.5, 2.25, None], "nested": {"ok": True, "tags": ["a", "b"]}}
+LARGE = os.urandom(256 * 1024)
+
+
+def persisted_round_trip(serializer_name: str, value, storage):
+    """Return (value read back through a fresh result reference, stored blob)"""
+    from prefect import flow
+
+    @flow(persist_result=True, result_storage=storage, result_serializer=get_result_serializer(serializer_name))
+    def produce():
+        return value
+
+    state = produce(return_state=True)
+    # A fresh reference has no in-memory copy, so get() reads and deserializes the stored blob
+    result = type(state.data).parse_obj(state.data.dict())
+    blob = json.loads((Path(storage.basepath) / result.storage_key).read_bytes())
+    return result.get(), blob
+
+
+def check_plain_data(storage):
+    print("🧪 Checking orjson and msgpack round-trip through persisted results...")
+    value, blob = persisted_round_trip("orjson", PLAIN, storage)
+    assert value == PLAIN, value
+    assert blob["serializer"]["type"] == "orjson", blob["serializer"]
+
+    with_bytes = {**PLAIN, "raw": b"\x00\xff" * 10}
+    value, blob = persisted_round_trip("msgpack", with_bytes, storage)
+    assert value == with_bytes, value
+    assert blob["serializer"]["type"] == "msgpack", blob["serializer"]
+    print("✅ Plain data OK")
+
+
+def check_pickle5(storage):
+    print("🧪 Checking pickle5 keeps large bytes out-of-band...")
+    value = {"payload": LARGE, "buffer": bytearray(LARGE[:100_000]), "small": b"abc",
+             "when": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+    frame = Pickle5Serializer(oob_threshold=64 * 1024).to_frame(value)
+    magic, count, payload_length = struct.unpack_from("<4sIQ", frame)
+    assert (magic, count) == (PICKLE5_MAGIC, 2), (magic, count)
+    assert payload_length < 1024, "large values should not be copied into the pickle stream"
+
+    restored, blob = persisted_round_trip("pickle5", value, storage)
+    assert restored == value
+    assert type(restored["payload"]) is bytes and type(restored["buffer"]) is bytearray
+    assert blob["serializer"]["type"] == "pickle5", blob["serializer"]
+    print("✅ Pickle5 OK")
+
+
+if __name__ == "__main__":
+    workdir = Path(tempfile.mkdtemp(prefix="result-serializers-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.filesystems import LocalFileSystem
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            storage = LocalFileSystem(basepath=str(workdir / "results"))
+            check_plain_data(storage)
+            check_pickle5(storage)
+        print("🎉 All result serializer checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
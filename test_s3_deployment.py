@@ -4,6 +4,7 @@ Test the S3 deployment by triggering a flow run
 """
 import asyncio
 from prefect.client.orchestration import get_client
+from prefect_pagination import deployments_named
 
 async def test_s3_deployment():
     """Test the S3 deployment by triggering a flow run"""
@@ -15,19 +16,10 @@ async def test_s3_deployment():
         try:
             # Get deployment
             print("🔍 Looking for 's3-ecs-flow' deployment...")
-            deployments = await client.read_deployments()
-            
-            s3_deployment = None
-            for deployment in deployments:
-                if deployment.name == "s3-ecs-flow":
-                    s3_deployment = deployment
-                    break
+            s3_deployment = next(iter(await deployments_named(client, "s3-ecs-flow")), None)
             
             if not s3_deployment:
                 print("❌ Could not find 's3-ecs-flow' deployment")
-                print("Available deployments:")
-                for dep in deployments:
-                    print(f"  - {dep.name}")
                 return None
             
             print(f"✅ Found deployment: {s3_deployment.name}")
@@ -82,15 +74,14 @@ async def check_s3_files():
     print("\n📦 Checking S3 bucket contents...")
     
     try:
-        import boto3
-        s3_client = boto3.client('s3')
+        from s3_io import list_objects
         
         bucket_name = "gellc-prefect-flows"
-        response = s3_client.list_objects_v2(Bucket=bucket_name)
+        objects = list(list_objects(bucket_name))
         
-        if 'Contents' in response:
+        if objects:
             print(f"✅ Files in S3 bucket '{bucket_name}':")
-            for obj in response['Contents']:
+            for obj in objects:
                 print(f"   📄 {obj['Key']} ({obj['Size']} bytes)")
         else:
             print(f"❌ No files found in bucket '{bucket_name}'")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the S3 I/O helpers against a moto server
+
+    pip install "moto[server]"
+    python test_s3_io.py
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from prefect_test_support import start_moto_server
+from s3_io import (
+    MiB,
+    copy_objects,
+    delete_objects,
+    download,
+    get_objects,
+    list_objects,
+    put_objects,
+    s3_client,
+    upload,
+)
+
+BUCKET = "s3-io-test"
+
+
+def check_client(endpoint_url: str):
+    print("🧪 Checking the client is shared...")
+    assert s3_client(endpoint_url=endpoint_url) is s3_client(endpoint_url=endpoint_url)
+    assert s3_client(endpoint_url=endpoint_url) is not s3_client("eu-west-1", endpoint_url=endpoint_url)
+    print("✅ Shared client OK")
+
+
+def check_small_objects(client):
+    print("🧪 Checking many small objects...")
+    objects = {f"small/{i:04d}.json": f'{{"i": {i}}}'.encode() for i in range(250)}
+    put_objects(BUCKET, objects, client=client, ContentType="application/json")
+    assert get_objects(BUCKET, objects, client=client) == objects
+    assert sorted(obj["Key"] for obj in list_objects(BUCKET, "small/", client=client)) == sorted(objects)
+    assert client.head_object(Bucket=BUCKET, Key="small/0000.json")["ContentType"] == "application/json"
+
+    copy_objects([(BUCKET, key, BUCKET, key.replace("small/", "copied/")) for key in objects], client=client)
+    assert len(list(list_objects(BUCKET, "copied/", client=client))) == 250
+    # More than one delete batch
+    assert delete_objects(BUCKET, list(objects) + [f"copied/{i:04d}.json" for i in range(1250)], client=client) == []
+    assert list(list_objects(BUCKET, client=client)) == []
+    print("✅ Small objects OK")
+
+
+def check_large_objects(client, workdir: Path):
+    print("🧪 Checking multipart uploads and ranged downloads...")
+    payload = os.urandom(12 * MiB + 123)
+    upload(BUCKET, "large/bytes.bin", payload, part_size=5 * MiB, client=client)
+    assert client.head_object(Bucket=BUCKET, Key="large/bytes.bin")["ETag"].endswith('-3"'), "expected 3 parts"
+    assert download(BUCKET, "large/bytes.bin", part_size=2 * MiB, client=client) == payload
+
+    source = workdir / "source.bin"
+    source.write_bytes(payload)
+    upload(BUCKET, "large/file.bin", source, part_size=5 * MiB, client=client)
+    dest = download(BUCKET, "large/file.bin", workdir / "dest.bin", part_size=3 * MiB, client=client)
+    assert dest.read_bytes() == payload
+    assert [p.name for p in workdir.iterdir() if p.name.endswith(".part")] == [], "no partial file should be left"
+
+    put_objects(BUCKET, {"large/empty": b""}, client=client)
+    assert download(BUCKET, "large/empty", client=client) == b""
+    print("✅ Large objects OK")
+
+    print("🧪 Checking a failed multipart upload is aborted...")
+    original_upload_part = client.upload_part
+
+    def failing_upload_part(**kwargs):
+        if kwargs["PartNumber"] == 2:
+            raise RuntimeError("connection reset")
+        return original_upload_part(**kwargs)
+
+    client.upload_part = failing_upload_part
+    try:
+        upload(BUCKET, "large/broken.bin", payload, part_size=5 * MiB, client=client)
+        raise AssertionError("the upload should have failed")
+    except RuntimeError:
+        pass
+    finally:
+        client.upload_part = original_upload_part
+    assert client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == [], "the upload should be aborted"
+    print("✅ Abort OK")
+
+
+if __name__ == "__main__":
+    os.environ.update({"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                       "AWS_DEFAULT_REGION": "us-east-1"})
+    server, endpoint_url = start_moto_server()
+    try:
+        check_client(endpoint_url)
+        client = s3_client(endpoint_url=endpoint_url)
+        client.create_bucket(Bucket=BUCKET)
+        check_small_objects(client)
+        with tempfile.TemporaryDirectory(prefix="s3-io-test-") as workdir:
+            check_large_objects(client, Path(workdir))
+        print("🎉 All S3 I/O checks passed!")
+    finally:
+        server.stop()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test the schedule planner offline and against a temporary Prefect server
+
+    python test_schedule_planner.py
+"""
+import asyncio
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from benchmark_flow_latency import latency_probe_flow
+from prefect_test_support import start_prefect_server
+from schedule_planner import apply_schedules, plan_pool, read_history, set_yaml_schedules, shift_cron, valid_offsets
+
+
+def hourly(names, duration=10.0, cron="0 * * * *"):
+    return [{"name": name, "cron": cron, "timezone": "UTC", "duration_minutes": duration} for name in names]
+
+
+def check_spreading():
+    print("🧪 Checking top-of-hour schedules are spread out...")
+    planned, projection = plan_pool(hourly(["a", "b", "c", "d"]), capacity=1, window=60)
+    assert (projection["peak_before"], projection["peak_after"]) == (4, 1), projection
+    assert projection["excess_after"] == 0, projection
+    offsets = sorted(entry["offset"] for entry in planned)
+    assert all(later - earlier >= 10 for earlier, later in zip(offsets, offsets[1:])), offsets
+    assert all(entry["planned_cron"] == f"{entry['offset']} * * * *" or entry["offset"] == 0 for entry in planned)
+
+    planned, projection = plan_pool(hourly([f"job-{i}" for i in range(8)]), capacity=2, window=15)
+    assert projection["peak_after"] < projection["peak_before"] == 8, projection
+    assert projection["excess_after"] < projection["excess_before"], projection
+    print(f"✅ Spreading OK (8 jobs in 15m on 2 slots: peak {projection['peak_before']} → {projection['peak_after']})")
+
+
+def check_deterministic():
+    print("🧪 Checking plans are deterministic...")
+    names = [f"job-{i}" for i in range(6)]
+    first, _ = plan_pool(hourly(names), capacity=1, window=15)
+    shuffled = names[:]
+    random.Random(7).shuffle(shuffled)
+    second, _ = plan_pool(hourly(shuffled), capacity=1, window=15)
+    assert [e["planned_cron"] for e in first] == [e["planned_cron"] for e in second], "input order changed the plan"
+    print("✅ Deterministic OK")
+
+
+def check_cron_shifts():
+    print("🧪 Checking offsets don't move runs into another hour...")
+    assert max(valid_offsets("50 9 * * 1-5", 15)) == 9, "09:50 can move to 09:59 at the latest"
+    assert len(valid_offsets("50 * * * *", 15)) == 15, "hourly crons can wrap into the next hour"
+    assert shift_cron("*/15 * * * *", 7) == "7,22,37,52 * * * *"
+    assert shift_cron("50 * * * *", 15) == "5 * * * *"
+    assert shift_cron("0 9 * * 1-5", 0) == "0 9 * * 1-5", "an unshifted cron is left as written"
+    print("✅ Cron shifts OK")
+
+
+def check_yaml_rewrite():
+    print("🧪 Checking prefect.yaml is rewritten in place...")
+    original = (Path(__file__).parent / "prefect.yaml").read_text()
+    text = original.replace("deployments:\n", "deployments:\n  - name: other\n    entrypoint: x.py:y\n    schedules: []\n", 1)
+    schedules = [{"cron": "7 * * * *", "timezone": "UTC"}]
+    written = set_yaml_schedules(text, "my-first-flow-ecs", schedules)
+    assert set_yaml_schedules(written, "my-first-flow-ecs", schedules) == written, "rewriting should be idempotent"
+    assert "# Pull configuration" in written, "comments should survive"
+    deployments = {d["name"]: d for d in yaml.safe_load(written)["deployments"]}
+    assert deployments["my-first-flow-ecs"]["schedules"] == schedules
+    assert deployments["my-first-flow-ecs"]["work_pool"]["name"] == "gellc-ecs-pool"
+    assert deployments["other"]["schedules"] == []
+    cleared = yaml.safe_load(set_yaml_schedules(written, "my-first-flow-ecs", []))
+    assert cleared["deployments"][1]["schedules"] == []
+    print("✅ YAML rewrite OK")
+
+
+async def check_apply():
+    from prefect import get_client
+    from prefect.states import Completed, Running
+
+    print("🧪 Checking history and --apply against the API...")
+    async with get_client() as client:
+        flow_id = await client.create_flow(latency_probe_flow)
+        deployment_id = await client.create_deployment(flow_id=flow_id, name="planned")
+        for _ in range(2):
+            run = await client.create_flow_run_from_deployment(deployment_id)
+            await client.set_flow_run_state(run.id, Running(), force=True)
+            await asyncio.sleep(1.2)
+            await client.set_flow_run_state(run.id, Completed(), force=True)
+
+    history, _ = await read_history(["planned", "missing"])
+    assert list(history) == ["planned"], history
+    assert len(history["planned"]["durations"]) == 2 and min(history["planned"]["durations"]) > 1 / 60, history
+
+    planned = [{"name": "planned", "planned_cron": "7 * * * *", "timezone": "UTC"}]
+    assert await apply_schedules(history, planned) == ["planned"]
+    assert await apply_schedules(history, planned) == [], "an unchanged plan should not touch the deployment"
+    async with get_client() as client:
+        schedules = await client.read_deployment_schedules(deployment_id)
+    assert [s.schedule.cron for s in schedules] == ["7 * * * *"], schedules
+    print("✅ Apply OK")
+
+
+if __name__ == "__main__":
+    check_spreading()
+    check_deterministic()
+    check_cron_shifts()
+    check_yaml_rewrite()
+
+    workdir = Path(tempfile.mkdtemp(prefix="schedule-planner-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_apply())
+        print("🎉 All schedule planner checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
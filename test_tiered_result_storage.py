@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the tiered result storage against moto and a temporary Prefect server
+
+    pip install "moto[server]"
+    python test_tiered_result_storage.py
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from prefect_test_support import start_moto_server, start_prefect_server
+from s3_io import s3_client
+from tiered_result_storage import ZSTD_MAGIC, TieredResultStorage, flush
+
+BUCKET = "tiered-results-test"
+ENTRY = 10_000
+
+
+def cached_entries(block: TieredResultStorage) -> list:
+    return [p for p in Path(block.cache_dir).iterdir() if p.name != ".lock"]
+
+
+def count_gets(client) -> list:
+    calls = []
+    original = client.get_object
+
+    def get_object(**kwargs):
+        calls.append(kwargs["Key"])
+        return original(**kwargs)
+
+    client.get_object = get_object
+    return calls
+
+
+def check_tiers(block: TieredResultStorage):
+    import zstandard
+
+    print("🧪 Checking writes reach both tiers and reads prefer the cache...")
+    content = b'{"rows": [' + b"1, " * 5000 + b"1]}"
+    block.write_path("first", content)
+    assert flush() == []
+    stored = s3_client(endpoint_url=block.endpoint_url).get_object(Bucket=BUCKET, Key="results/first")["Body"].read()
+    assert stored.startswith(ZSTD_MAGIC) and len(stored) < len(content) / 10, "the S3 copy should be zstd-compressed"
+    assert zstandard.ZstdDecompressor().decompress(stored) == content
+
+    client = s3_client(endpoint_url=block.endpoint_url)
+    gets = count_gets(client)
+    try:
+        assert block.read_path("first") == content
+        assert gets == [], "a cached result should not be read from S3"
+        for entry in cached_entries(block):
+            entry.unlink()
+        assert block.read_path("first") == content
+        assert gets == ["results/first"], gets
+        assert block.read_path("first") == content and len(gets) == 1, "the S3 read should refill the cache"
+    finally:
+        del client.get_object
+    print("✅ Tiers OK")
+
+
+def check_lru(block: TieredResultStorage):
+    print("🧪 Checking eviction is least recently used...")
+    lru = block.copy(update={"cache_dir": str(Path(block.cache_dir).parent / "lru"), "cache_max_bytes": 3 * ENTRY})
+    for name in ("a", "b", "c"):
+        lru.write_path(name, name.encode() * ENTRY)
+    lru.read_path("a")
+    lru.write_path("d", b"d" * ENTRY)
+    cached = {p.read_bytes()[:1].decode() for p in cached_entries(lru)}
+    assert cached == {"a", "c", "d"}, f"b was least recently used, but the cache holds {sorted(cached)}"
+    assert flush() == []
+    assert lru.read_path("b") == b"b" * ENTRY, "an evicted result is still in S3"
+    print("✅ LRU OK")
+
+
+def write_many(block_json: str, worker: int, count: int):
+    block = TieredResultStorage.parse_raw(block_json)
+    for i in range(count):
+        block.write_path(f"worker-{worker}/{i}", bytes([worker]) * ENTRY)
+        block.read_path(f"worker-{worker}/{i // 2}")
+    # multiprocessing children skip interpreter shutdown, which would otherwise wait for the uploads
+    assert flush() == []
+
+
+def check_processes(block: TieredResultStorage):
+    print("🧪 Checking concurrent processes share one bounded cache...")
+    shared = block.copy(update={"cache_dir": str(Path(block.cache_dir).parent / "shared"), "cache_max_bytes": 40 * ENTRY})
+    workers = [multiprocessing.Process(target=write_many, args=(shared.json(), worker, 40)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=120)
+        assert process.exitcode == 0, f"a writer exited with {process.exitcode}"
+    entries = cached_entries(shared)
+    assert sum(entry.stat().st_size for entry in entries) <= shared.cache_max_bytes, "the cache is over its limit"
+    assert not any(entry.name.endswith(".tmp") for entry in entries), "temporary files were left behind"
+    assert all(shared.read_path(f"worker-{w}/{i}") == bytes([w]) * ENTRY for w in range(4) for i in range(40))
+    print(f"✅ Processes OK ({len(entries)} of 160 results cached)")
+
+
+def check_flow_results(block: TieredResultStorage):
+    from prefect import flow
+
+    print("🧪 Checking a flow's persisted result round-trips...")
+    block.save("tiered-test", overwrite=True)
+    saved = TieredResultStorage.load("tiered-test")
+
+    @flow(persist_result=True, result_storage=saved)
+    def produce():
+        return {"rows": list(range(1000))}
+
+    state = produce(return_state=True)
+    assert flush() == []
+    for entry in cached_entries(saved):
+        entry.unlink()
+    # A fresh reference, as a downstream run would see it, without the in-memory copy
+    result = type(state.data).parse_obj(state.data.dict())
+    assert result.get() == {"rows": list(range(1000))}
+    assert cached_entries(saved), "the result should be cached again after reading it from S3"
+    print("✅ Flow results OK")
+
+
+if __name__ == "__main__":
+    os.environ.update({"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                       "AWS_DEFAULT_REGION": "us-east-1"})
+    workdir = Path(tempfile.mkdtemp(prefix="tiered-results-test-"))
+    moto, endpoint_url = start_moto_server()
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        s3_client(endpoint_url=endpoint_url).create_bucket(Bucket=BUCKET)
+        block = TieredResultStorage(bucket_name=BUCKET, bucket_folder="results", endpoint_url=endpoint_url,
+                                    cache_dir=str(workdir / "cache" / "main"))
+        check_tiers(block)
+        check_lru(block)
+        check_processes(block)
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            check_flow_results(block)
+        print("🎉 All tiered result storage checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        moto.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
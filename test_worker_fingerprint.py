@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test the worker environment fingerprint
+
+    python test_worker_fingerprint.py
+"""
+from worker_fingerprint import fingerprint
+
+ENVIRONMENT = {
+    "python": {"python": "3.11.7", "hostname": "worker-1"},
+    "packages": {"packages": {"prefect": "2.20.26"}},
+    "aws": {"aws": "ecs", "cluster": "gellc", "task_family": "worker"},
+}
+
+
+def check_failed_probes_ignored():
+    """A probe that fails or times out on one start doesn't change the fingerprint"""
+    print("🧪 Checking failed probes are left out of the fingerprint...")
+    original = fingerprint(ENVIRONMENT)
+    assert fingerprint(dict(ENVIRONMENT)) == original, "the fingerprint should be deterministic"
+
+    timed_out = {**ENVIRONMENT, "aws": {"error": "timeout", "deadline_seconds": 1.5}}
+    failed = {**ENVIRONMENT, "aws": {"aws": "ecs", "error": "timed out"}}
+    assert fingerprint(timed_out) == fingerprint(failed), "failures should hash the same, whatever the message"
+    assert fingerprint(timed_out) == fingerprint({k: v for k, v in ENVIRONMENT.items() if k != "aws"})
+
+    upgraded = {**ENVIRONMENT, "packages": {"packages": {"prefect": "2.20.27"}}}
+    assert fingerprint(upgraded) != original, "a real change should still change the fingerprint"
+    print("✅ Fingerprint OK")
+
+
+if __name__ == "__main__":
+    check_failed_probes_ignored()
+    print("🎉 All worker fingerprint checks passed!")
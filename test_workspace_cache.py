@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test the workspace metadata cache against a temporary Prefect server
+
+    python test_workspace_cache.py
+"""
+import asyncio
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_flow_latency import latency_probe_flow
+from prefect_test_support import ensure_work_pool, start_prefect_server
+import workspace_cache
+from workspace_cache import WorkspaceCache
+
+POOL = "cache-pool"
+
+
+async def check_cache(workdir: Path):
+    from prefect import get_client
+
+    cache = WorkspaceCache(workdir / "cache.sqlite")
+    async with get_client() as client:
+        await ensure_work_pool(client, POOL)
+        flow_id = await client.create_flow(latency_probe_flow)
+        ids = {
+            name: await client.create_deployment(flow_id=flow_id, name=name, work_pool_name=POOL)
+            for name in ["alpha", "beta", "gamma"]
+        }
+
+        print("🧪 Checking the first sync...")
+        fetched = await cache.sync(max_age=0)
+        assert fetched == {"work_pools": 1, "work_queues": 1, "deployments": 3, "flows": 1}, fetched
+        assert [d.name for d in cache.deployments()] == ["alpha", "beta", "gamma"]
+        assert cache.work_pool(POOL).type == "process"
+        assert [q.name for q in cache.work_queues(POOL)] == ["default"]
+        assert cache.flows_by_id()[str(flow_id)].name == latency_probe_flow.name
+        print("✅ First sync OK")
+
+        print("🧪 Checking reads within max_age...")
+        assert await cache.sync(max_age=60) == {}, "a fresh cache should not call the API"
+        started = time.perf_counter()
+        for _ in range(100):
+            cache.deployments()
+        per_read = (time.perf_counter() - started) / 100
+        assert per_read < 0.05, f"local reads took {per_read * 1000:.1f}ms"
+        print(f"✅ Local reads OK ({per_read * 1000:.2f}ms)")
+
+        print("🧪 Checking incremental syncs...")
+        workspace_cache.WATERMARK_OVERLAP_SECONDS = 0.2
+        await asyncio.sleep(0.5)
+        await client._client.patch(f"/deployments/{ids['gamma']}", json={"tags": ["first"]})
+        await cache.sync(["deployments"], max_age=0)
+        await asyncio.sleep(0.5)
+        await client._client.patch(f"/deployments/{ids['beta']}", json={"tags": ["changed"]})
+        fetched = await cache.sync(["deployments"], max_age=0)
+        # beta changed and gamma sits at the previous watermark; alpha is older and isn't fetched again
+        assert fetched == {"deployments": 2}, f"only recently updated deployments should be fetched: {fetched}"
+        beta = next(d for d in cache.deployments() if d.name == "beta")
+        assert beta.tags == ["changed"], beta.tags
+
+        await client.delete_deployment(ids["gamma"])
+        fetched = await cache.sync(["deployments"], max_age=0)
+        assert fetched == {"deployments": 2}, f"a deletion should reload the deployments: {fetched}"
+        assert [d.name for d in cache.deployments()] == ["alpha", "beta"]
+        print("✅ Incremental syncs OK")
+
+
+if __name__ == "__main__":
+    workdir = Path(tempfile.mkdtemp(prefix="workspace-cache-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_cache(workdir))
+        print("🎉 All workspace cache checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
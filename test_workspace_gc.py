@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test workspace GC selectors and deletes against a temporary Prefect server
+
+    python test_workspace_gc.py
+"""
+import asyncio
+import shutil
+import tempfile
+import time
+from argparse import Namespace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmark_flow_latency import latency_probe_flow
+from prefect_test_support import start_prefect_server
+from workspace_gc import delete_all, gc_deployments, gc_flow_runs, select_deployments, select_flow_runs
+
+
+async def make_run(client, deployment_id, days_ago: float):
+    """A completed run of `deployment_id` that was expected to start `days_ago` days ago"""
+    from prefect.states import Completed, Scheduled
+
+    flow_run = await client.create_flow_run_from_deployment(
+        deployment_id,
+        state=Scheduled(scheduled_time=datetime.now(timezone.utc) - timedelta(days=days_ago)),
+    )
+    await client.set_flow_run_state(flow_run.id, Completed(), force=True)
+    return flow_run.id
+
+
+async def check_gc():
+    from prefect import get_client
+
+    async with get_client() as client:
+        flow_id = await client.create_flow(latency_probe_flow)
+        ids = {}
+        for name, tags in [("fresh-a", []), ("fresh-b", []), ("FIXED-x", ["diagnostic"]), ("keep-me", ["diagnostic"])]:
+            ids[name] = await client.create_deployment(flow_id=flow_id, name=name, tags=tags)
+        old_run = await make_run(client, ids["fresh-b"], days_ago=30)
+        recent_run = await make_run(client, ids["fresh-b"], days_ago=0)
+
+        print("🧪 Checking deployment selectors...")
+        selected = await select_deployments(client, ["fresh-*"], [], None, None)
+        assert [d.name for d in selected] == ["fresh-a", "fresh-b"], selected
+        selected = await select_deployments(client, ["fresh-*"], [], None, no_runs_since=1)
+        assert [d.name for d in selected] == ["fresh-a"], "fresh-b ran today and must be kept"
+        selected = await select_deployments(client, ["*-x", "keep-*"], ["diagnostic"], None, None)
+        assert [d.name for d in selected] == ["FIXED-x", "keep-me"], selected
+        assert not await select_deployments(client, ["fresh-*"], [], older_than=1, no_runs_since=None)
+        print("✅ Deployment selectors OK")
+
+        print("🧪 Checking dry run and delete...")
+        args = Namespace(name=["fresh-*", "FIXED-*"], tag=[], older_than=None, no_runs_since=1,
+                         delete=False, concurrency=4, rate=50.0)
+        assert await gc_deployments(args) == 0
+        assert len(await client.read_deployments()) == 4, "a dry run must not delete anything"
+        args.delete = True
+        assert await gc_deployments(args) == 0
+        remaining = sorted(d.name for d in await client.read_deployments())
+        assert remaining == ["fresh-b", "keep-me"], remaining
+        print("✅ Dry run and delete OK")
+
+        print("🧪 Checking flow-run pruning...")
+        runs = await select_flow_runs(client, older_than=7, states=["COMPLETED"], tags=[], deployment_names=["fresh-*"])
+        assert [run.id for run in runs] == [old_run], runs
+        assert not await select_flow_runs(client, older_than=7, states=["COMPLETED"], tags=[], deployment_names=["keep-*"])
+        args = Namespace(older_than=7, state=["COMPLETED"], tag=[], deployment=[], show=20,
+                         delete=True, concurrency=4, rate=50.0)
+        assert await gc_flow_runs(args) == 0
+        remaining = [run.id for run in await client.read_flow_runs()]
+        assert remaining == [recent_run], remaining
+        print("✅ Flow-run pruning OK")
+
+    print("🧪 Checking the delete rate limit...")
+    deleted = []
+
+    async def record(object_id):
+        deleted.append((object_id, time.monotonic()))
+
+    started = time.monotonic()
+    assert await delete_all(list(range(21)), record, concurrency=8, rate=40.0) == []
+    elapsed = time.monotonic() - started
+    assert len(deleted) == 21 and elapsed >= 0.45, f"21 deletes at 40/s took {elapsed:.2f}s"
+    print(f"✅ Rate limit OK ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    workdir = Path(tempfile.mkdtemp(prefix="workspace-gc-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_gc())
+        print("🎉 All workspace GC checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
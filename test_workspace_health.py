@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the workspace health report against a temporary Prefect server
+
+    python test_workspace_health.py
+"""
+import asyncio
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmark_flow_latency import latency_probe_flow
+from prefect_test_support import start_prefect_server
+from workspace_health import correlate, read_snapshot
+
+POOL = "health-pool"
+DELAY = 0.5
+
+
+def messages(findings) -> str:
+    return "\n".join(f"{level}: {message}" for level, message in findings)
+
+
+async def check_health():
+    from prefect import get_client
+    from prefect.client.schemas.actions import WorkPoolCreate
+    from prefect.states import Late, Running
+
+    async with get_client() as client:
+        await client.create_work_pool(WorkPoolCreate(name=POOL, type="process"))
+        await client.create_work_queue("limited", concurrency_limit=1, work_pool_name=POOL)
+        flow_id = await client.create_flow(latency_probe_flow)
+        default = await client.create_deployment(flow_id=flow_id, name="on-default", work_pool_name=POOL)
+        limited = await client.create_deployment(
+            flow_id=flow_id, name="on-limited", work_pool_name=POOL, work_queue_name="limited"
+        )
+        overdue = datetime.now(timezone.utc) - timedelta(minutes=5)
+        for _ in range(3):
+            await client.create_flow_run_from_deployment(default, state=Late(scheduled_time=overdue))
+        await client.create_flow_run_from_deployment(limited, state=Late(scheduled_time=overdue))
+        running = await client.create_flow_run_from_deployment(limited)
+        await client.set_flow_run_state(running.id, Running(), force=True)
+
+        print("🧪 Checking Late runs without workers...")
+        rows, findings = correlate(await read_snapshot(client), POOL)
+        default_row = next(row for row in rows if row["queue"] == "default")
+        assert (default_row["late"], default_row["live_workers"], default_row["deployments"]) == (3, 0, 1), default_row
+        assert ("error", f"queue default in {POOL} has 3 Late runs and 0 live workers") in findings, messages(findings)
+        assert ("warning", f"pool {POOL} has 2 deployments and no workers") in findings, messages(findings)
+        assert findings[0][0] == "error", "errors should come first"
+        print("✅ No workers OK")
+
+        print("🧪 Checking Late runs with a live worker...")
+        await client.send_worker_heartbeat(POOL, "health-worker")
+        rows, findings = correlate(await read_snapshot(client), POOL)
+        assert all(row["live_workers"] == 1 for row in rows), rows
+        assert any("none polled this queue" in message for _, message in findings), messages(findings)
+        assert ("warning", f"queue limited in {POOL} has 1 Late runs and is at its concurrency limit "
+                           f"(1/1 pending or running)") in findings, messages(findings)
+
+        await client.get_scheduled_flow_runs_for_work_pool(POOL, work_queue_names=["default"])
+        rows, findings = correlate(await read_snapshot(client), POOL)
+        assert any("picked up slower than scheduled" in message for _, message in findings), messages(findings)
+        print("✅ Live worker OK")
+
+        print("🧪 Checking a paused queue...")
+        queue = await client.read_work_queue_by_name("default", work_pool_name=POOL)
+        await client.update_work_queue(queue.id, is_paused=True)
+        _, findings = correlate(await read_snapshot(client), POOL)
+        assert ("error", f"queue default in {POOL} has 3 Late runs and the queue is paused") in findings, messages(findings)
+        print("✅ Paused queue OK")
+
+        print(f"🧪 Checking the reads are concurrent ({DELAY}s added to every request)...")
+        send = client._client.send
+        requests = []
+
+        async def slow_send(request, *args, **kwargs):
+            requests.append(request.url.path)
+            await asyncio.sleep(DELAY)
+            return await send(request, *args, **kwargs)
+
+        client._client.send = slow_send
+        started = time.perf_counter()
+        await read_snapshot(client)
+        elapsed = time.perf_counter() - started
+        client._client.send = send
+        # Pools, then their workers: two round trips however many requests there are
+        assert elapsed < 3 * DELAY, f"{len(requests)} requests took {elapsed:.2f}s"
+        print(f"✅ Concurrent reads OK ({len(requests)} requests in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    workdir = Path(tempfile.mkdtemp(prefix="workspace-health-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_health())
+        print("🎉 All workspace health checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
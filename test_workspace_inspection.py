@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test that the batched inspection lookups stay at a handful of requests
+
+    python test_workspace_inspection.py
+"""
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from prefect_test_support import start_prefect_server
+from workspace_inspection import read_deployments_by_id, read_flows_by_id, read_queues_by_pool, read_workers_by_pool
+
+FLOWS = 250
+
+
+def count_requests(client) -> list:
+    """Record the path of every request the client sends"""
+    requests = []
+    send = client._client.send
+
+    async def counting_send(request, *args, **kwargs):
+        requests.append(request.url.path)
+        return await send(request, *args, **kwargs)
+
+    client._client.send = counting_send
+    return requests
+
+
+async def check_batched_lookups():
+    from prefect import flow, get_client
+    from prefect.client.schemas.actions import WorkPoolCreate
+
+    async with get_client() as client:
+        print(f"🧪 Creating {FLOWS} flows and deployments...")
+        deployment_ids, flow_ids = [], []
+        for i in range(FLOWS):
+            flow_id = await client.create_flow(flow(lambda: None, name=f"flow-{i:03d}"))
+            flow_ids.append(flow_id)
+            deployment_ids.append(await client.create_deployment(flow_id=flow_id, name=f"deployment-{i:03d}"))
+        pools = [f"pool-{i}" for i in range(4)]
+        for pool in pools:
+            await client.create_work_pool(WorkPoolCreate(name=pool, type="process"))
+
+        print("🧪 Checking batched lookups...")
+        requests = count_requests(client)
+        flows = await read_flows_by_id(client, flow_ids + flow_ids[:10])
+        assert set(flows) == set(flow_ids), "every flow should be found once"
+        assert flows[flow_ids[7]].name == "flow-007"
+        assert len(requests) == 2, f"{FLOWS} flows should take 2 requests, took {len(requests)}"
+
+        requests.clear()
+        deployments = await read_deployments_by_id(client, deployment_ids)
+        assert len(deployments) == FLOWS and len(requests) == 2, (len(deployments), requests)
+
+        requests.clear()
+        workers, queues = await asyncio.gather(read_workers_by_pool(client, pools), read_queues_by_pool(client, pools))
+        assert set(workers) == set(pools) and all(q[0].name == "default" for q in queues.values()), queues
+        assert len(requests) == 2 * len(pools), requests
+        print(f"✅ Batched lookups OK ({FLOWS} flows in 2 requests)")
+
+
+if __name__ == "__main__":
+    workdir = Path(tempfile.mkdtemp(prefix="workspace-inspection-test-"))
+    server, api_url = start_prefect_server(workdir)
+    try:
+        from prefect.settings import PREFECT_API_URL, temporary_settings
+
+        with temporary_settings({PREFECT_API_URL: api_url}):
+            asyncio.run(check_batched_lookups())
+        print("🎉 All workspace inspection checks passed!")
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Result storage with a local disk cache in front of S3
+
+Results are written to a size-bounded cache directory and uploaded to S3 in
+the background, zstd-compressed. Reads check the cache first and fall back to
+S3, putting what they read back in the cache. The least recently used entries
+are evicted once the cache is over cache_max_bytes. Eviction holds a file
+lock, so worker processes sharing a cache directory can evict safely.
+
+Save the block once, then use it as the default result storage (the flow
+module has to import tiered_result_storage so Prefect knows the block type):
+
+    python tiered_result_storage.py gellc-results --bucket gellc-prefect-results --folder results
+    export PREFECT_DEFAULT_RESULT_STORAGE_BLOCK=tiered-result-storage/gellc-results
+
+or per flow:
+
+    @flow(persist_result=True, result_storage=TieredResultStorage.load("gellc-results"))
+
+Uploads still pending when the process exits normally are finished first.
+A result written just before the process is killed may never reach S3.
+"""
+import argparse
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from prefect._internal.pydantic import HAS_PYDANTIC_V2
+
+if HAS_PYDANTIC_V2:
+    from pydantic.v1 import Field
+else:
+    from pydantic import Field
+
+from prefect.filesystems import WritableFileSystem
+from prefect.logging import get_logger
+from prefect.utilities.asyncutils import run_sync_in_worker_thread, sync_compatible
+
+from s3_io import download, s3_client, upload
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+STALE_TMP_SECONDS = 3600
+
+logger = get_logger("tiered_result_storage")
+
+# Background uploads for every block in this process. The executor's threads are
+# joined at interpreter exit, so queued uploads finish before a normal exit.
+_uploads = ThreadPoolExecutor(max_workers=8, thread_name_prefix="result-upload")
+_pending: Dict[Tuple[str, str], Tuple[Future, bytes]] = {}
+_pending_lock = threading.Lock()
+
+
+class TieredResultStorage(WritableFileSystem):
+    """
+    Stores results on local disk and in S3, reading the local copy first.
+
+    Attributes:
+        bucket_name: The S3 bucket results are uploaded to.
+        bucket_folder: Key prefix for results within the bucket.
+        region_name: AWS region of the bucket; boto3's default when empty.
+        endpoint_url: S3-compatible endpoint (MinIO, moto); AWS when empty.
+        cache_dir: Local cache directory, shared by processes on the same host.
+        cache_max_bytes: Size the local cache is evicted down to.
+        compression_level: zstd level for the S3 copy.
+    """
+
+    _block_type_name = "Tiered Result Storage"
+
+    bucket_name: str = Field(default=..., description="The S3 bucket results are uploaded to.")
+    bucket_folder: str = Field(default="", description="Key prefix for results within the bucket.")
+    region_name: Optional[str] = Field(default=None, description="AWS region of the bucket.")
+    endpoint_url: Optional[str] = Field(default=None, description="S3-compatible endpoint; AWS when empty.")
+    cache_dir: str = Field(default="~/.prefect/result-cache", description="Local cache directory.")
+    cache_max_bytes: int = Field(default=1024 ** 3, description="Size the local cache is evicted down to.")
+    compression_level: int = Field(default=3, description="zstd level for the S3 copy.")
+
+    def _resolve_path(self, path: str) -> str:
+        key = f"{self.bucket_folder.strip('/')}/{path}" if self.bucket_folder else path
+        return f"s3://{self.bucket_name}/{key}"
+
+    def _key(self, path: str) -> str:
+        return self._resolve_path(path)[len(f"s3://{self.bucket_name}/"):]
+
+    def _cache_root(self) -> Path:
+        root = Path(self.cache_dir).expanduser()
+        root.mkdir(parents=True, exist_ok=True)
+        return root
+
+    def _cache_path(self, path: str) -> Path:
+        name = hashlib.sha256(self._resolve_path(path).encode()).hexdigest()
+        return self._cache_root() / name
+
+    def _client(self):
+        return s3_client(self.region_name, self.endpoint_url)
+
+    @sync_compatible
+    async def write_path(self, path: str, content: bytes) -> str:
+        await run_sync_in_worker_thread(self._write, path, content)
+        return path
+
+    @sync_compatible
+    async def read_path(self, path: str) -> bytes:
+        return await run_sync_in_worker_thread(self._read, path)
+
+    def _write(self, path: str, content: bytes):
+        pending = (self.bucket_name, self._key(path))
+        with _pending_lock:
+            future = _uploads.submit(self._upload, self._key(path), content)
+            _pending[pending] = (future, content)
+        future.add_done_callback(lambda f: self._upload_done(pending, f))
+        self._cache_put(path, content)
+
+    def _upload(self, key: str, content: bytes):
+        import zstandard
+
+        compressed = zstandard.ZstdCompressor(level=self.compression_level).compress(content)
+        upload(self.bucket_name, key, compressed, client=self._client())
+
+    def _upload_done(self, pending: Tuple[str, str], future: Future):
+        with _pending_lock:
+            if _pending.get(pending, (None,))[0] is future:
+                del _pending[pending]
+        if future.exception() is not None:
+            logger.error("Result upload to s3://%s/%s failed: %s", *pending, future.exception())
+
+    def _read(self, path: str) -> bytes:
+        content = self._cache_get(path)
+        if content is not None:
+            return content
+        with _pending_lock:
+            pending = _pending.get((self.bucket_name, self._key(path)))
+        if pending is not None:
+            return pending[1]
+
+        content = download(self.bucket_name, self._key(path), client=self._client())
+        if content.startswith(ZSTD_MAGIC):
+            import zstandard
+
+            content = zstandard.ZstdDecompressor().decompress(content)
+        self._cache_put(path, content)
+        return content
+
+    def _cache_get(self, path: str) -> Optional[bytes]:
+        cache_path = self._cache_path(path)
+        try:
+            with open(cache_path, "rb") as f:
+                content = f.read()
+            # mtime is the LRU clock; the entry may have been evicted since it was opened
+            os.utime(cache_path)
+        except FileNotFoundError:
+            return None
+        return content
+
+    def _cache_put(self, path: str, content: bytes):
+        if len(content) > self.cache_max_bytes:
+            return
+        cache_path = self._cache_path(path)
+        tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, cache_path)
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits; returns how many were deleted"""
+        root = self._cache_root()
+        with open(root / ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                entries, total, now = [], 0, time.time()
+                for entry in os.scandir(root):
+                    if entry.name == ".lock":
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(".tmp"):
+                        # Left behind by a writer that died before renaming it
+                        if now - stat.st_mtime > STALE_TMP_SECONDS:
+                            Path(entry.path).unlink(missing_ok=True)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+                deleted = 0
+                for _, size, entry_path in sorted(entries):
+                    if total <= self.cache_max_bytes:
+                        break
+                    Path(entry_path).unlink(missing_ok=True)
+                    total -= size
+                    deleted += 1
+                return deleted
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def flush(timeout: Optional[float] = None) -> List[BaseException]:
+    """Wait for this process's pending uploads; returns the errors of those that failed"""
+    with _pending_lock:
+        futures = [future for future, _ in _pending.values()]
+    done, _ = wait(futures, timeout=timeout)
+    return [future.exception() for future in done if future.exception() is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save a tiered result storage block")
+    parser.add_argument("name", help="Block document name")
+    parser.add_argument("--bucket", required=True, help="S3 bucket for results")
+    parser.add_argument("--folder", default="", help="Key prefix within the bucket")
+    parser.add_argument("--region", help="AWS region of the bucket")
+    parser.add_argument("--endpoint-url", help="S3-compatible endpoint (MinIO)")
+    parser.add_argument("--cache-dir", default="~/.prefect/result-cache")
+    parser.add_argument("--cache-max-gb", type=float, default=1.0)
+    parser.add_argument("--compression-level", type=int, default=3)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    block = TieredResultStorage(
+        bucket_name=args.bucket, bucket_folder=args.folder, region_name=args.region,
+        endpoint_url=args.endpoint_url, cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_max_gb * 1024 ** 3), compression_level=args.compression_level,
+    )
+    block.save(args.name, overwrite=args.overwrite)
+    print(f"✅ Saved {TieredResultStorage.get_block_type_slug()}/{args.name} → {block._resolve_path('')}")
+    print(f"   export PREFECT_DEFAULT_RESULT_STORAGE_BLOCK={TieredResultStorage.get_block_type_slug()}/{args.name}")
+
+
+if __name__ == "__main__":
+    main()
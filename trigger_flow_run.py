@@ -5,6 +5,10 @@ Trigger a flow run via API and monitor it
 import asyncio
 import time
 from prefect import get_client
+from prefect.client.schemas.filters import LogFilter, LogFilterFlowRunId
+from prefect.client.schemas.sorting import LogSort
+
+from prefect_pagination import collect, deployments_named, iter_logs
 
 async def trigger_and_monitor_flow_run():
     """Trigger a flow run and monitor its progress"""
@@ -14,13 +18,7 @@ async def trigger_and_monitor_flow_run():
     try:
         async with get_client() as client:
             # Get the deployment
-            deployments = await client.read_deployments()
-            target_deployment = None
-            
-            for deployment in deployments:
-                if deployment.name == "my-first-flow-ecs":
-                    target_deployment = deployment
-                    break
+            target_deployment = next(iter(await deployments_named(client, "my-first-flow-ecs")), None)
             
             if not target_deployment:
                 print("❌ Deployment 'my-first-flow-ecs' not found")
@@ -56,10 +54,12 @@ async def trigger_and_monitor_flow_run():
                     
                     # Try to get logs
                     try:
-                        logs = await client.read_logs(flow_run_id=flow_run.id)
+                        log_filter = LogFilter(flow_run_id=LogFilterFlowRunId(any_=[flow_run.id]))
+                        # Last 10 log entries, newest first from the server
+                        logs = await collect(iter_logs(client, log_filter=log_filter, sort=LogSort.TIMESTAMP_DESC, limit=10))
                         if logs:
                             print(f"\n📝 Flow run logs:")
-                            for log in logs[-10:]:  # Last 10 log entries
+                            for log in reversed(logs):
                                 print(f"  {log.timestamp}: {log.message}")
                         else:
                             print("📝 No logs available")
@@ -4,6 +4,7 @@ Trigger a test flow run to verify S3 + ECS integration
 """
 import asyncio
 from prefect.client.orchestration import get_client
+from prefect_pagination import deployments_named, iter_work_pools
 
 async def trigger_test_run():
     """Trigger a new flow run for testing"""
@@ -14,13 +15,7 @@ async def trigger_test_run():
     async with get_client() as client:
         try:
             # Get S3 deployment
-            deployments = await client.read_deployments()
-            
-            s3_deployment = None
-            for deployment in deployments:
-                if deployment.name == "s3-ecs-flow":
-                    s3_deployment = deployment
-                    break
+            s3_deployment = next(iter(await deployments_named(client, "s3-ecs-flow")), None)
             
             if not s3_deployment:
                 print("❌ Could not find 's3-ecs-flow' deployment")
@@ -31,8 +26,7 @@ async def trigger_test_run():
             
             # Check work pools first
             print(f"\n🔍 Checking work pools...")
-            work_pools = await client.read_work_pools()
-            for pool in work_pools:
+            async for pool in iter_work_pools(client):
                 print(f"   - {pool.name} (type: {pool.type}, paused: {pool.is_paused})")
             
             # Trigger flow run
@@ -4,6 +4,7 @@ Troubleshoot UI visibility issues
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import iter_deployments
 
 async def troubleshoot_deployments():
     """Debug why deployments aren't showing in UI"""
@@ -25,14 +26,9 @@ async def troubleshoot_deployments():
         
         # List ALL deployments with more details
         print("\n📋 ALL DEPLOYMENTS IN YOUR ACCOUNT:")
-        deployments = await client.read_deployments()
-        
-        if not deployments:
-            print("❌ NO DEPLOYMENTS FOUND AT ALL!")
-            print("This suggests a connection or workspace issue.")
-            return
-        
-        for i, dep in enumerate(deployments, 1):
+        i = 0
+        async for dep in iter_deployments(client):
+            i += 1
             print(f"\n{i}. NAME: {dep.name}")
             print(f"   ID: {dep.id}")
             print(f"   CREATED: {dep.created}")
@@ -45,6 +41,11 @@ async def troubleshoot_deployments():
             url = f"https://app.prefect.cloud/account/ab61b83d-af98-4940-ac58-024d88160a03/workspace/e31cc9e9-de96-4558-acdc-1ded94493b8d/deployments/deployment/{dep.id}"
             print(f"   DIRECT URL: {url}")
         
+        if not i:
+            print("❌ NO DEPLOYMENTS FOUND AT ALL!")
+            print("This suggests a connection or workspace issue.")
+            return
+        
         # Check workspace
         print(f"\n🏢 WORKSPACE INFO:")
         print(f"Account ID: ab61b83d-af98-4940-ac58-024d88160a03")
@@ -4,6 +4,7 @@ Update deployment to use the new process work pool
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import deployments_named
 
 async def update_deployment_work_pool():
     """Update the deployment to use the new process work pool"""
@@ -13,13 +14,7 @@ async def update_deployment_work_pool():
     try:
         async with get_client() as client:
             # Get the current deployment
-            deployments = await client.read_deployments()
-            target_deployment = None
-            
-            for deployment in deployments:
-                if deployment.name == "my-first-flow-ecs":
-                    target_deployment = deployment
-                    break
+            target_deployment = next(iter(await deployments_named(client, "my-first-flow-ecs")), None)
             
             if not target_deployment:
                 print("❌ Deployment not found")
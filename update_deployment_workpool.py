@@ -4,6 +4,7 @@ Update the deployment to use gellc-process-pool instead of gellc-ecs-final
 """
 import asyncio
 from prefect import get_client
+from prefect_pagination import collect, iter_workers
 
 async def update_deployment_workpool():
     """Update deployment to use the running process pool"""
@@ -27,7 +28,7 @@ async def update_deployment_workpool():
             print(f"✅ Work pool exists: {process_pool.name} (Type: {process_pool.type})")
             
             # Check for workers
-            workers = await client.read_workers_for_work_pool("gellc-process-pool")
+            workers = await collect(iter_workers(client, "gellc-process-pool"))
             print(f"✅ Active workers: {len(workers)}")
             for worker in workers:
                 print(f"  - {worker.name} (Last seen: {worker.last_heartbeat_time})")
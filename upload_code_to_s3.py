@@ -8,7 +8,7 @@ import tempfile
 import zipfile
 from pathlib import Path
 from prefect.filesystems import S3
-import boto3
+from s3_io import s3_client as pooled_s3_client
 
 # Configuration
 BUCKET_NAME = "gellc-prefect-code-storage"
@@ -113,7 +113,7 @@ def verify_upload():
     print("🔍 Verifying upload...")
     
     try:
-        s3_client = boto3.client('s3', region_name=AWS_REGION)
+        s3_client = pooled_s3_client(region_name=AWS_REGION)
         
         # Check if object exists
         response = s3_client.head_object(
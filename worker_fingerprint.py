@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Worker environment fingerprints, published once at startup instead of diagnostic flow runs
+
+`start` computes the environment (environment_probes.py) and publishes it, then
+runs `prefect worker start` under a fixed worker name. Every --refresh-seconds the
+environment is probed again and republished only when its fingerprint changed.
+Publishing is best effort: if it fails (API or storage unreachable) the worker
+starts anyway and the next refresh tries again.
+
+Published per worker:
+- a Prefect Variable `worker_env__<worker>` (tag worker-env) with a compact
+  summary: fingerprint, Python, key package versions, container/AWS details, cwd
+- the full environment as JSON in the run-files storage (run_artifacts.py),
+  at worker-env/<worker>.json
+
+`show --full` can only read that JSON from another machine when the workers
+use a remote run-files block (GELLC_RUN_FILES_BLOCK or
+PREFECT_DEFAULT_RESULT_STORAGE_BLOCK, e.g. an S3 bucket). Without one it is
+written under ~/.prefect/run-files on the worker itself.
+
+`show` reads the summaries straight from the API, so no flow run is scheduled:
+
+    python worker_fingerprint.py start --pool gellc-process-pool
+    python worker_fingerprint.py show [--pool gellc-process-pool] [--worker NAME] [--full]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import unquote, urlsplit
+
+from environment_probes import collect_environment
+from prefect_pagination import collect, iter_variables, iter_workers
+from run_artifacts import RUN_FILES_BLOCK_ENV, _storage_uri, get_run_files_storage
+
+VARIABLE_PREFIX = "worker_env__"
+VARIABLE_TAG = "worker-env"
+KEY_PACKAGES = ["prefect", "prefect-aws", "prefect-github", "boto3", "s3fs", "dbt-core", "duckdb", "pyarrow"]
+DEFAULT_REFRESH_SECONDS = 300
+SUMMARY_LISTING_LIMIT = 20
+
+
+def fingerprint(environment: dict) -> str:
+    """Hash of the probes that succeeded; failed or timed-out ones only appear in the published JSON"""
+    # A flaky probe (metadata endpoint, slow subprocess) would otherwise change the hash between starts
+    stable = {
+        name: section for name, section in environment.items()
+        if not (isinstance(section, dict) and "error" in section)
+    }
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _safe_name(worker_name: str) -> str:
+    return re.sub(r"[^a-z0-9_]+", "_", worker_name.lower()).strip("_")
+
+
+def storage_path(worker_name: str) -> str:
+    return f"worker-env/{_safe_name(worker_name)}.json"
+
+
+def summarize(environment: dict, worker_name: str, pool: str, full_uri: str) -> dict:
+    """The compact summary stored in the worker's Variable"""
+    python = environment.get("python", {})
+    packages = environment.get("packages", {}).get("packages", {})
+    cwd = environment.get("cwd", {})
+    return {
+        "worker": worker_name,
+        "pool": pool,
+        "fingerprint": fingerprint(environment)[:16],
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "hostname": python.get("hostname"),
+        "python": python.get("python"),
+        "platform": python.get("platform"),
+        "packages": len(packages),
+        "key_packages": {name: packages[name] for name in KEY_PACKAGES if name in packages},
+        "container": environment.get("container", {}),
+        "aws": environment.get("aws", {}),
+        "cwd": cwd.get("cwd"),
+        "cwd_entries": cwd.get("cwd_entries"),
+        "cwd_listing": (cwd.get("cwd_listing") or [])[:SUMMARY_LISTING_LIMIT],
+        "full": full_uri,
+    }
+
+
+def publish_environment(environment: dict, worker_name: str, pool: str) -> dict:
+    """Store the full environment and the worker's summary Variable"""
+    from prefect.variables import Variable
+
+    storage = get_run_files_storage()
+    path = storage_path(worker_name)
+    storage.write_path(path, json.dumps(environment, indent=2, sort_keys=True).encode())
+    summary = summarize(environment, worker_name, pool, _storage_uri(storage, path))
+    if summary["full"].startswith("file://"):
+        print(f"⚠️  Full environment stored on this host only ({summary['full']}); "
+              f"set {RUN_FILES_BLOCK_ENV} to a remote block to read it with `show --full` elsewhere")
+    Variable.set(
+        name=f"{VARIABLE_PREFIX}{_safe_name(worker_name)}",
+        value=json.dumps(summary, sort_keys=True),
+        tags=[VARIABLE_TAG, pool],
+        overwrite=True,
+    )
+    return summary
+
+
+def start(pool: str, worker_name: str, worker_type: str, refresh_seconds: float, worker_args: List[str]) -> int:
+    """Publish the environment, run the worker and republish when the environment changes"""
+    # The fingerprint last published; None until a publish succeeds, so the next refresh retries
+    current = None
+    try:
+        environment = collect_environment()
+        publish_environment(environment, worker_name, pool)
+        current = fingerprint(environment)
+        print(f"🧬 Published environment {current[:16]} for {worker_name}")
+    except Exception as e:
+        print(f"⚠️  Could not publish the environment fingerprint, starting the worker anyway: {e}")
+
+    worker = subprocess.Popen(
+        ["prefect", "worker", "start", "--pool", pool, "--name", worker_name, "--type", worker_type, *worker_args]
+    )
+    # Ctrl+C already reaches the worker through the process group; SIGTERM (ECS stop) doesn't
+    signal.signal(signal.SIGTERM, lambda signum, _: worker.send_signal(signum))
+    signal.signal(signal.SIGINT, lambda signum, _: None)
+
+    next_refresh = time.monotonic() + refresh_seconds
+    while worker.poll() is None:
+        time.sleep(1)
+        if time.monotonic() < next_refresh:
+            continue
+        next_refresh = time.monotonic() + refresh_seconds
+        try:
+            environment = collect_environment()
+            if fingerprint(environment) != current:
+                publish_environment(environment, worker_name, pool)
+                current = fingerprint(environment)
+                print(f"🧬 Environment changed, published {current[:16]}")
+        except Exception as e:
+            print(f"⚠️  Could not refresh the environment fingerprint: {e}")
+    return worker.returncode
+
+
+async def read_summaries(pool: Optional[str] = None, worker: Optional[str] = None) -> List[dict]:
+    """Published summaries joined with each worker's status and last heartbeat"""
+    from prefect import get_client
+    from prefect.client.schemas.filters import VariableFilter, VariableFilterName, VariableFilterTags
+
+    async with get_client() as client:
+        variable_filter = VariableFilter(
+            name=VariableFilterName(like_=f"{VARIABLE_PREFIX}%"), tags=VariableFilterTags(all_=[VARIABLE_TAG])
+        )
+        summaries = [
+            json.loads(variable.value)
+            async for variable in iter_variables(client, variable_filter=variable_filter)
+            if variable.name.startswith(VARIABLE_PREFIX)
+        ]
+        summaries = [
+            summary for summary in summaries
+            if (not pool or summary["pool"] == pool) and (not worker or summary["worker"] == worker)
+        ]
+        pool_names = sorted({summary["pool"] for summary in summaries})
+        pool_workers = await asyncio.gather(
+            *(collect(iter_workers(client, pool_name)) for pool_name in pool_names), return_exceptions=True
+        )
+        for pool_name, workers in zip(pool_names, pool_workers):
+            workers = {} if isinstance(workers, Exception) else {w.name: w for w in workers}
+            for summary in summaries:
+                if summary["pool"] == pool_name and summary["worker"] in workers:
+                    state = workers[summary["worker"]]
+                    summary["status"] = getattr(state.status, "value", state.status)
+                    summary["last_heartbeat"] = (
+                        state.last_heartbeat_time.isoformat(timespec="seconds") if state.last_heartbeat_time else None
+                    )
+    return sorted(summaries, key=lambda summary: (summary["pool"], summary["worker"]))
+
+
+def read_full_environment(summary: dict) -> Optional[str]:
+    """The worker's full environment JSON, or None when it can't be read from here"""
+    full = summary.get("full") or ""
+    if full.startswith("file://"):
+        # Written to the worker's own disk; only readable on that host
+        path = Path(unquote(urlsplit(full).path))
+        if summary.get("hostname") != socket.gethostname() or not path.is_file():
+            return None
+        return path.read_text()
+    try:
+        return get_run_files_storage().read_path(storage_path(summary["worker"])).decode()
+    except Exception:
+        return None
+
+
+def show(pool: Optional[str], worker: Optional[str], full: bool):
+    summaries = asyncio.run(read_summaries(pool, worker))
+    if not summaries:
+        print("❌ No worker environments published yet")
+        return
+    if full:
+        for summary in summaries:
+            print(f"🧬 {summary['worker']} ({summary['pool']})")
+            environment = read_full_environment(summary)
+            if environment is None:
+                print(f"⚠️  Can't read {summary.get('full') or storage_path(summary['worker'])} "
+                      f"(written on {summary.get('hostname')}) from here; give the workers a remote "
+                      f"run-files block with {RUN_FILES_BLOCK_ENV} or PREFECT_DEFAULT_RESULT_STORAGE_BLOCK")
+                continue
+            print(environment)
+        return
+
+    for summary in summaries:
+        container = summary["container"]
+        aws = summary["aws"]
+        where = aws.get("aws") or ("container" if container.get("container") else "host")
+        print(f"🧬 {summary['worker']} ({summary['pool']}) — {summary.get('status', 'unknown')}, "
+              f"heartbeat {summary.get('last_heartbeat') or '-'}")
+        print(f"   fingerprint {summary['fingerprint']} updated {summary['updated_at']}")
+        print(f"   {summary['hostname']} | Python {summary['python']} | {summary['platform']} | {where}")
+        if aws.get("aws") == "ecs":
+            print(f"   ECS {aws.get('cluster')} {aws.get('task_family')}:{aws.get('task_revision')} "
+                  f"{aws.get('availability_zone')}")
+        print(f"   📦 {summary['packages']} packages: "
+              + ", ".join(f"{name}=={version}" for name, version in summary["key_packages"].items()))
+        print(f"   📁 {summary['cwd']} ({summary['cwd_entries']} entries): {', '.join(summary['cwd_listing'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish and query worker environment fingerprints")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = commands.add_parser("start", help="Publish the environment and start a worker")
+    start_parser.add_argument("--pool", default="gellc-process-pool")
+    start_parser.add_argument("--name", default=f"gellc-{socket.gethostname()}", help="Worker name")
+    start_parser.add_argument("--type", default="process", help="Worker type")
+    start_parser.add_argument("--refresh-seconds", type=float, default=DEFAULT_REFRESH_SECONDS)
+
+    show_parser = commands.add_parser("show", help="Show published worker environments")
+    show_parser.add_argument("--pool")
+    show_parser.add_argument("--worker")
+    show_parser.add_argument("--full", action="store_true", help="Print the full environment JSON")
+
+    args, worker_args = parser.parse_known_args()
+    if args.command == "start":
+        sys.exit(start(args.pool, args.name, args.type, args.refresh_seconds, worker_args))
+    if worker_args:
+        parser.error(f"unrecognized arguments: {' '.join(worker_args)}")
+    show(args.pool, args.worker, args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Read-through local cache of workspace metadata
+
+Work pools, work queues, deployments and flows are kept in a SQLite file
+(GELLC_WORKSPACE_CACHE, default ~/.prefect/workspace-cache.sqlite), per API URL.
+Reads are served locally. A sync only runs once the cache is older than
+`max_age` seconds, and it only fetches what changed:
+
+- deployments and flows are paged newest-`updated` first, stopping at the
+  last synced `updated` timestamp. A count request then catches deletions,
+  which trigger a full reload of that kind.
+- work pools and their queues are few; they are reloaded whole.
+
+Workers, heartbeats and flow runs are live state and are never cached.
+
+    python workspace_cache.py sync [--full]
+    python workspace_cache.py show
+    python workspace_cache.py clear
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from prefect_pagination import collect, iter_work_pools, iter_work_queues, paginate
+
+WORKSPACE_CACHE_ENV = "GELLC_WORKSPACE_CACHE"
+DEFAULT_WORKSPACE_CACHE = Path.home() / ".prefect" / "workspace-cache.sqlite"
+DEFAULT_MAX_AGE_SECONDS = 60.0
+# Re-read objects updated this close to the watermark, in case they were written in the same instant
+WATERMARK_OVERLAP_SECONDS = 1.0
+KINDS = ["work_pools", "work_queues", "deployments", "flows"]
+
+SCHEMA = """
+create table if not exists objects (
+    api_url text not null,
+    kind text not null,
+    id text not null,
+    name text,
+    parent text,
+    updated text,
+    body text not null,
+    primary key (api_url, kind, id)
+);
+create table if not exists sync_state (
+    api_url text not null,
+    kind text not null,
+    synced_at real not null,
+    watermark text,
+    primary key (api_url, kind)
+);
+"""
+
+
+def _models() -> dict:
+    from prefect.client.schemas.objects import Flow, WorkPool, WorkQueue
+    from prefect.client.schemas.responses import DeploymentResponse
+
+    return {"work_pools": WorkPool, "work_queues": WorkQueue, "deployments": DeploymentResponse, "flows": Flow}
+
+
+def cache_path() -> Path:
+    return Path(os.environ.get(WORKSPACE_CACHE_ENV, DEFAULT_WORKSPACE_CACHE))
+
+
+def _current_api_url() -> str:
+    from prefect.settings import PREFECT_API_URL
+
+    return PREFECT_API_URL.value() or "ephemeral"
+
+
+class WorkspaceCache:
+    def __init__(self, path: Optional[Path] = None, api_url: Optional[str] = None):
+        self.path = Path(path) if path else cache_path()
+        self.api_url = api_url or _current_api_url()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30)
+        # Readers in other processes keep going while a sync writes
+        db.execute("pragma journal_mode=wal")
+        return db
+
+    # Reads
+
+    def _read(self, kind: str, where: str = "", args: tuple = ()) -> list:
+        model = _models()[kind]
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                f"select body from objects where api_url = ? and kind = ? {where} order by name",
+                (self.api_url, kind, *args),
+            ).fetchall()
+        return [model.parse_raw(body) for (body,) in rows]
+
+    def work_pools(self) -> list:
+        return self._read("work_pools")
+
+    def work_pool(self, name: str):
+        return next(iter(self._read("work_pools", "and name = ?", (name,))), None)
+
+    def work_queues(self, work_pool_name: Optional[str] = None) -> list:
+        if work_pool_name:
+            return self._read("work_queues", "and parent = ?", (work_pool_name,))
+        return self._read("work_queues")
+
+    def deployments(self) -> list:
+        return self._read("deployments")
+
+    def flows(self) -> list:
+        return self._read("flows")
+
+    def flows_by_id(self) -> Dict[str, object]:
+        return {str(flow.id): flow for flow in self.flows()}
+
+    def sync_state(self) -> Dict[str, dict]:
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "select kind, synced_at, watermark from sync_state where api_url = ?", (self.api_url,)
+            ).fetchall()
+            counts = dict(db.execute(
+                "select kind, count(*) from objects where api_url = ? group by kind", (self.api_url,)
+            ).fetchall())
+        return {
+            kind: {"synced_at": synced_at, "watermark": watermark, "objects": counts.get(kind, 0)}
+            for kind, synced_at, watermark in rows
+        }
+
+    def stale_kinds(self, kinds: List[str], max_age: float) -> List[str]:
+        state = self.sync_state()
+        now = time.time()
+        return [kind for kind in kinds if kind not in state or now - state[kind]["synced_at"] > max_age]
+
+    # Writes
+
+    def _store(self, kind: str, objects: list, replace: bool, watermark: Optional[str], parent=None):
+        with closing(self._connect()) as db, db:
+            if replace:
+                db.execute("delete from objects where api_url = ? and kind = ?", (self.api_url, kind))
+            db.executemany(
+                "insert or replace into objects (api_url, kind, id, name, parent, updated, body) "
+                "values (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        self.api_url, kind, str(obj.id), obj.name, parent(obj) if parent else None,
+                        obj.updated.isoformat() if obj.updated else None, obj.json(),
+                    )
+                    for obj in objects
+                ],
+            )
+            db.execute(
+                "insert or replace into sync_state (api_url, kind, synced_at, watermark) values (?, ?, ?, ?)",
+                (self.api_url, kind, time.time(), watermark),
+            )
+
+    def _local_count(self, kind: str) -> int:
+        with closing(self._connect()) as db:
+            return db.execute(
+                "select count(*) from objects where api_url = ? and kind = ?", (self.api_url, kind)
+            ).fetchone()[0]
+
+    def clear(self):
+        with closing(self._connect()) as db, db:
+            db.execute("delete from objects where api_url = ?", (self.api_url,))
+            db.execute("delete from sync_state where api_url = ?", (self.api_url,))
+
+    # Syncing
+
+    async def _sync_pools_and_queues(self, client) -> Dict[str, int]:
+        pools = await collect(iter_work_pools(client))
+        queues = await asyncio.gather(*(collect(iter_work_queues(client, pool.name)) for pool in pools))
+        pool_names = {pool.id: pool.name for pool in pools}
+        self._store("work_pools", pools, replace=True, watermark=None)
+        self._store(
+            "work_queues", [queue for pool_queues in queues for queue in pool_queues], replace=True, watermark=None,
+            parent=lambda queue: queue.work_pool_name or pool_names.get(queue.work_pool_id),
+        )
+        return {"work_pools": len(pools), "work_queues": sum(len(pool_queues) for pool_queues in queues)}
+
+    async def _sync_incremental(self, client, kind: str, full: bool) -> Dict[str, int]:
+        """Fetch the objects updated since the watermark; reload everything when something was deleted"""
+        import pendulum
+        from prefect.client.schemas.sorting import DeploymentSort, FlowSort
+
+        read, sort, endpoint = {
+            "deployments": (client.read_deployments, DeploymentSort.UPDATED_DESC, "/deployments/count"),
+            "flows": (client.read_flows, FlowSort.UPDATED_DESC, "/flows/count"),
+        }[kind]
+        watermark = None if full else self.sync_state().get(kind, {}).get("watermark")
+        stop_at = pendulum.parse(watermark).subtract(seconds=WATERMARK_OVERLAP_SECONDS) if watermark else None
+
+        changed = []
+        async for obj in paginate(read, sort=sort):
+            if stop_at is not None and obj.updated < stop_at:
+                break
+            changed.append(obj)
+
+        newest = max([obj.updated for obj in changed], default=None)
+        new_watermark = newest.isoformat() if newest else watermark
+        self._store(kind, changed, replace=stop_at is None, watermark=new_watermark)
+        if stop_at is not None:
+            # Deletions don't show up as updates; a count mismatch reveals them
+            remote = (await client._client.post(endpoint, json={})).json()
+            if remote != self._local_count(kind):
+                return await self._sync_incremental(client, kind, full=True)
+        return {kind: len(changed)}
+
+    async def sync(self, kinds: Optional[List[str]] = None, max_age: float = DEFAULT_MAX_AGE_SECONDS, full=False) -> dict:
+        """Bring stale kinds up to date concurrently; returns {kind: objects fetched}"""
+        from prefect import get_client
+
+        kinds = kinds or KINDS
+        stale = kinds if full else self.stale_kinds(kinds, max_age)
+        if not stale:
+            return {}
+        async with get_client() as client:
+            jobs = []
+            if {"work_pools", "work_queues"} & set(stale):
+                jobs.append(self._sync_pools_and_queues(client))
+            for kind in ("deployments", "flows"):
+                if kind in stale:
+                    jobs.append(self._sync_incremental(client, kind, full))
+            fetched = {}
+            for result in await asyncio.gather(*jobs):
+                fetched.update(result)
+        return fetched
+
+
+async def cached_workspace(
+    kinds: Optional[List[str]] = None, max_age: float = DEFAULT_MAX_AGE_SECONDS, refresh: bool = False
+) -> WorkspaceCache:
+    """The workspace cache, synced when older than `max_age` (or always with `refresh`)"""
+    cache = WorkspaceCache()
+    await cache.sync(kinds, max_age=0 if refresh else max_age)
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local cache of workspace metadata")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync = commands.add_parser("sync", help="Fetch what changed since the last sync")
+    sync.add_argument("--full", action="store_true", help="Reload everything")
+    commands.add_parser("show", help="Show what is cached")
+    commands.add_parser("clear", help="Drop the cache for the current API")
+    args = parser.parse_args()
+
+    cache = WorkspaceCache()
+    if args.command == "sync":
+        started = time.perf_counter()
+        fetched = asyncio.run(cache.sync(max_age=0, full=args.full))
+        print(f"🔄 Synced in {time.perf_counter() - started:.2f}s: "
+              + ", ".join(f"{kind} {count}" for kind, count in fetched.items()))
+    elif args.command == "clear":
+        cache.clear()
+        print(f"🧹 Cleared the cache for {cache.api_url}")
+        return
+
+    print(f"💾 {cache.path} ({cache.api_url})")
+    for kind, state in sorted(cache.sync_state().items()):
+        age = time.time() - state["synced_at"]
+        print(f"  {kind:<12} {state['objects']:>5} objects, synced {age:.0f}s ago"
+              + (f", watermark {state['watermark']}" if state["watermark"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Garbage-collect stale deployments and old flow runs
+
+Selects deployments by name glob, tag, age and last run, and flow runs by age,
+state, tag and deployment. Matches are paged from the API and listed. Nothing is
+deleted unless --delete is given; deletes then run concurrently under a rate limit.
+
+    python workspace_gc.py deployments --name 'fresh-*' 'FIXED-*' 'WORKING-*' DIAGNOSTIC-deployment
+    python workspace_gc.py deployments --tag diagnostic --older-than 30 --no-runs-since 30 --delete
+    python workspace_gc.py flow-runs --older-than 14 --delete
+
+Deleting a flow run removes its task runs and states. Prefect 2 has no API to
+delete logs; they expire with the workspace's log retention.
+"""
+import argparse
+import asyncio
+import fnmatch
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from prefect_pagination import collect, paginate
+
+ID_CHUNK = 200
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 10.0
+FINAL_STATES = ["COMPLETED", "FAILED", "CANCELLED", "CRASHED"]
+
+
+class RateLimiter:
+    """Space out calls to at most `rate` per second, shared by all concurrent deletes"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _days_ago(days: Optional[float]) -> Optional[datetime]:
+    return datetime.now(timezone.utc) - timedelta(days=days) if days is not None else None
+
+
+def matches_name(name: str, globs: List[str]) -> bool:
+    return not globs or any(fnmatch.fnmatchcase(name, glob) for glob in globs)
+
+
+async def recently_run(client, deployment_ids: list, since: datetime) -> set:
+    """Ids of the deployments that have a run expected to start after `since`"""
+    from prefect.client.schemas.filters import (
+        FlowRunFilter,
+        FlowRunFilterDeploymentId,
+        FlowRunFilterExpectedStartTime,
+    )
+
+    active = set()
+    for i in range(0, len(deployment_ids), ID_CHUNK):
+        runs = paginate(
+            client.read_flow_runs,
+            flow_run_filter=FlowRunFilter(
+                deployment_id=FlowRunFilterDeploymentId(any_=deployment_ids[i:i + ID_CHUNK]),
+                expected_start_time=FlowRunFilterExpectedStartTime(after_=since),
+            ),
+        )
+        active |= {run.deployment_id async for run in runs}
+    return active
+
+
+async def select_deployments(
+    client,
+    names: List[str],
+    tags: List[str],
+    older_than: Optional[float],
+    no_runs_since: Optional[float],
+) -> list:
+    from prefect.client.schemas.filters import DeploymentFilter, DeploymentFilterTags
+    from prefect.client.schemas.sorting import DeploymentSort
+
+    deployment_filter = DeploymentFilter(tags=DeploymentFilterTags(all_=tags)) if tags else None
+    deployments = paginate(client.read_deployments, deployment_filter=deployment_filter, sort=DeploymentSort.NAME_ASC)
+    created_before = _days_ago(older_than)
+    selected = [
+        deployment async for deployment in deployments
+        if matches_name(deployment.name, names) and (not created_before or deployment.created < created_before)
+    ]
+    if no_runs_since is not None and selected:
+        active = await recently_run(client, [deployment.id for deployment in selected], _days_ago(no_runs_since))
+        selected = [deployment for deployment in selected if deployment.id not in active]
+    return selected
+
+
+async def select_flow_runs(
+    client,
+    older_than: float,
+    states: List[str],
+    tags: List[str],
+    deployment_names: List[str],
+) -> list:
+    from prefect.client.schemas.filters import (
+        FlowRunFilter,
+        FlowRunFilterDeploymentId,
+        FlowRunFilterExpectedStartTime,
+        FlowRunFilterState,
+        FlowRunFilterStateType,
+        FlowRunFilterTags,
+    )
+    from prefect.client.schemas.sorting import FlowRunSort
+
+    criteria = dict(
+        expected_start_time=FlowRunFilterExpectedStartTime(before_=_days_ago(older_than)),
+        state=FlowRunFilterState(type=FlowRunFilterStateType(any_=states)),
+        tags=FlowRunFilterTags(all_=tags) if tags else None,
+    )
+    if not deployment_names:
+        return await collect(paginate(client.read_flow_runs, flow_run_filter=FlowRunFilter(**criteria), sort=FlowRunSort.ID_DESC))
+
+    deployments = [
+        deployment async for deployment in paginate(client.read_deployments)
+        if matches_name(deployment.name, deployment_names)
+    ]
+    runs = []
+    for i in range(0, len(deployments), ID_CHUNK):
+        deployment_id = FlowRunFilterDeploymentId(any_=[deployment.id for deployment in deployments[i:i + ID_CHUNK]])
+        runs += await collect(paginate(
+            client.read_flow_runs,
+            flow_run_filter=FlowRunFilter(**criteria, deployment_id=deployment_id),
+            sort=FlowRunSort.ID_DESC,
+        ))
+    return runs
+
+
+async def delete_all(ids: list, delete: Callable[..., Awaitable], concurrency: int, rate: float) -> List[str]:
+    """Delete `ids` concurrently, returning the errors"""
+    from prefect.exceptions import ObjectNotFound
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    errors: List[str] = []
+    done = 0
+
+    async def delete_one(object_id):
+        nonlocal done
+        async with semaphore:
+            await limiter.wait()
+            try:
+                await delete(object_id)
+            except ObjectNotFound:
+                pass
+            except Exception as e:
+                errors.append(f"{object_id}: {e}")
+        done += 1
+        if done % 100 == 0:
+            print(f"🗑️  {done}/{len(ids)} deleted")
+
+    await asyncio.gather(*(delete_one(object_id) for object_id in ids))
+    return errors
+
+
+async def gc_deployments(args) -> int:
+    from prefect import get_client
+
+    async with get_client() as client:
+        deployments = await select_deployments(client, args.name, args.tag, args.older_than, args.no_runs_since)
+        for deployment in deployments:
+            print(f"  📦 {deployment.name:<40} {deployment.id}  created {deployment.created:%Y-%m-%d}  tags {deployment.tags}")
+        print(f"🔍 {len(deployments)} deployments selected")
+        if not args.delete or not deployments:
+            if deployments:
+                print("💡 Dry run: pass --delete to remove them")
+            return 0
+        errors = await delete_all([d.id for d in deployments], client.delete_deployment, args.concurrency, args.rate)
+    return report(len(deployments), errors, "deployments")
+
+
+async def gc_flow_runs(args) -> int:
+    from prefect import get_client
+
+    async with get_client() as client:
+        runs = await select_flow_runs(client, args.older_than, args.state, args.tag, args.deployment)
+        for run in runs[:args.show]:
+            print(f"  🌊 {run.name:<30} {run.id}  {run.state_type.value if run.state_type else '-':<10} "
+                  f"expected {run.expected_start_time:%Y-%m-%d %H:%M}")
+        if len(runs) > args.show:
+            print(f"  ... and {len(runs) - args.show} more")
+        print(f"🔍 {len(runs)} flow runs selected")
+        if not args.delete or not runs:
+            if runs:
+                print("💡 Dry run: pass --delete to remove them")
+            return 0
+        errors = await delete_all([run.id for run in runs], client.delete_flow_run, args.concurrency, args.rate)
+    return report(len(runs), errors, "flow runs")
+
+
+def report(total: int, errors: List[str], what: str) -> int:
+    for error in errors[:10]:
+        print(f"❌ {error}")
+    print(f"✅ Deleted {total - len(errors)}/{total} {what}")
+    return 1 if errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage-collect stale deployments and old flow runs (dry run by default)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    deployments = commands.add_parser("deployments", help="Delete deployments")
+    deployments.add_argument("--name", nargs="+", default=[], help="Name globs, e.g. 'fresh-*'")
+    deployments.add_argument("--tag", nargs="+", default=[], help="Deployments carrying all of these tags")
+    deployments.add_argument("--older-than", type=float, metavar="DAYS", help="Created more than DAYS ago")
+    deployments.add_argument("--no-runs-since", type=float, metavar="DAYS", help="No flow run in the last DAYS")
+
+    flow_runs = commands.add_parser("flow-runs", help="Delete flow runs")
+    flow_runs.add_argument("--older-than", type=float, metavar="DAYS", required=True,
+                           help="Expected to start more than DAYS ago")
+    flow_runs.add_argument("--state", nargs="+", default=FINAL_STATES, type=str.upper,
+                           help=f"State types to delete (default: {' '.join(FINAL_STATES)})")
+    flow_runs.add_argument("--tag", nargs="+", default=[], help="Runs carrying all of these tags")
+    flow_runs.add_argument("--deployment", nargs="+", default=[], help="Only runs of deployments matching these globs")
+    flow_runs.add_argument("--show", type=int, default=20, help="How many matches to list")
+
+    for command in (deployments, flow_runs):
+        command.add_argument("--delete", action="store_true", help="Actually delete (default: dry run)")
+        command.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+        command.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Deletes per second")
+
+    args = parser.parse_args()
+    if args.command == "deployments":
+        if not (args.name or args.tag or args.older_than is not None or args.no_runs_since is not None):
+            parser.error("deployments needs at least one selector: --name, --tag, --older-than or --no-runs-since")
+        raise SystemExit(asyncio.run(gc_deployments(args)))
+    raise SystemExit(asyncio.run(gc_flow_runs(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+One health report across work pools, queues, workers, deployments and runs
+
+Everything is read concurrently: pools (with each pool's workers read as soon as
+the pool list arrives), all work queues, all deployments, the runs that should
+have started already and the runs that finished in the last --hours. The
+readings are then joined per (pool, queue) and correlated into findings, e.g.
+
+    ❌ queue default in gellc-process-pool has 14 Late runs and 0 live workers
+
+    python workspace_health.py [--pool gellc-process-pool] [--hours 1] [--json]
+
+Replaces running check_worker_status.py, check_workpools.py,
+check_specific_flow_run.py and check_deployment_status.py one after another.
+Exits 1 when there is an error-level finding.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from prefect_pagination import collect, iter_deployments, iter_flow_runs, iter_work_pools, iter_workers, paginate
+
+DEFAULT_WINDOW_HOURS = 1.0
+# A worker (or queue poll) older than this is not live, for servers that don't report worker status
+LIVE_HEARTBEAT_SECONDS = 90
+# A Scheduled run this far past its start time is counted as Late before the server relabels it
+LATE_AFTER_SECONDS = 15
+ACTIVE_STATES = ["SCHEDULED", "PENDING", "RUNNING"]
+FINISHED_STATES = ["COMPLETED", "FAILED", "CRASHED"]
+
+
+async def read_snapshot(client, hours: float = DEFAULT_WINDOW_HOURS) -> dict:
+    """Everything the report needs, read concurrently"""
+    from prefect.client.schemas.filters import (
+        FlowRunFilter,
+        FlowRunFilterExpectedStartTime,
+        FlowRunFilterStartTime,
+        FlowRunFilterState,
+        FlowRunFilterStateType,
+    )
+
+    now = datetime.now(timezone.utc)
+
+    async def pools_and_workers():
+        pools = await collect(iter_work_pools(client))
+        workers = await asyncio.gather(*(collect(iter_workers(client, pool.name)) for pool in pools))
+        return pools, {pool.name: pool_workers for pool, pool_workers in zip(pools, workers)}
+
+    def runs(states: List[str], **times):
+        return collect(iter_flow_runs(
+            client, flow_run_filter=FlowRunFilter(state=FlowRunFilterState(type=FlowRunFilterStateType(any_=states)), **times)
+        ))
+
+    (pools, workers), queues, deployments, active, finished = await asyncio.gather(
+        pools_and_workers(),
+        # Without a pool name this lists the queues of every pool
+        collect(paginate(client.read_work_queues)),
+        collect(iter_deployments(client)),
+        runs(ACTIVE_STATES, expected_start_time=FlowRunFilterExpectedStartTime(before_=now)),
+        runs(FINISHED_STATES, start_time=FlowRunFilterStartTime(after_=now - timedelta(hours=hours))),
+    )
+    return {
+        "now": now, "hours": hours, "pools": pools, "workers": workers, "queues": queues,
+        "deployments": deployments, "runs": active + finished,
+    }
+
+
+def _age(now: datetime, then: Optional[datetime]) -> Optional[float]:
+    return (now - then).total_seconds() if then else None
+
+
+def _ago(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "never"
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.0f}{unit} ago"
+    return f"{seconds:.0f}s ago"
+
+
+def is_live(worker, now: datetime) -> bool:
+    if worker.status:
+        return str(worker.status.value if hasattr(worker.status, "value") else worker.status).upper() == "ONLINE"
+    age = _age(now, worker.last_heartbeat_time)
+    return age is not None and age <= LIVE_HEARTBEAT_SECONDS
+
+
+def run_status(run, now: datetime) -> str:
+    """late, pending, running, or the finished state type in lower case"""
+    state_type = run.state.type.value
+    if state_type == "SCHEDULED":
+        overdue = _age(now, run.expected_start_time) or 0
+        return "late" if run.state.name == "Late" or overdue > LATE_AFTER_SECONDS else "scheduled"
+    return state_type.lower()
+
+
+def correlate(snapshot: dict, pool_name: Optional[str] = None) -> Tuple[List[dict], List[Tuple[str, str]]]:
+    """One row per (pool, queue) and the findings as (level, message), errors first"""
+    now = snapshot["now"]
+    pools = {pool.name: pool for pool in snapshot["pools"] if not pool_name or pool.name == pool_name}
+    queues = {
+        (queue.work_pool_name, queue.name): queue
+        for queue in snapshot["queues"] if queue.work_pool_name in pools
+    }
+    live_workers = {name: sum(is_live(w, now) for w in snapshot["workers"].get(name, [])) for name in pools}
+
+    counts: Dict[tuple, Counter] = defaultdict(Counter)
+    late_by_deployment: Counter = Counter()
+    for run in snapshot["runs"]:
+        if run.work_pool_name in pools:
+            status = run_status(run, now)
+            counts[(run.work_pool_name, run.work_queue_name)][status] += 1
+            if status == "late" and run.deployment_id:
+                late_by_deployment[run.deployment_id] += 1
+
+    deployments = [d for d in snapshot["deployments"] if not pool_name or d.work_pool_name == pool_name]
+    deployments_per_queue = Counter((d.work_pool_name, d.work_queue_name or "default") for d in deployments)
+
+    findings = []
+
+    def add(level: str, message: str):
+        findings.append((level, message))
+
+    for deployment in deployments:
+        if not deployment.work_pool_name:
+            continue
+        if deployment.work_pool_name not in pools:
+            add("error", f"deployment {deployment.name} targets pool {deployment.work_pool_name}, which does not exist")
+        elif (deployment.work_pool_name, deployment.work_queue_name or "default") not in queues:
+            add("error", f"deployment {deployment.name} targets queue {deployment.work_queue_name} "
+                         f"in {deployment.work_pool_name}, which does not exist")
+        if deployment.paused and late_by_deployment[deployment.id]:
+            add("warning", f"deployment {deployment.name} is paused but has "
+                           f"{late_by_deployment[deployment.id]} Late runs")
+
+    rows = []
+    for (pool, queue_name), queue in sorted(queues.items()):
+        work_pool, count = pools[pool], counts[(pool, queue_name)]
+        workers = snapshot["workers"].get(pool, [])
+        polled = _age(now, queue.last_polled)
+        row = {
+            "pool": pool, "queue": queue_name, "pool_paused": work_pool.is_paused, "queue_paused": queue.is_paused,
+            "pool_limit": work_pool.concurrency_limit, "queue_limit": queue.concurrency_limit,
+            "workers": len(workers), "live_workers": live_workers[pool], "last_polled_seconds": polled,
+            "deployments": deployments_per_queue[(pool, queue_name)],
+            **{status: count[status] for status in ("late", "pending", "running", "completed", "failed", "crashed")},
+        }
+        rows.append(row)
+
+        where = f"queue {queue_name} in {pool}"
+        late, busy = row["late"], row["pending"] + row["running"]
+        pool_busy = sum(counts[key]["pending"] + counts[key]["running"] for key in counts if key[0] == pool)
+        if late and work_pool.is_paused:
+            add("error", f"{where} has {late} Late runs and the pool is paused")
+        elif late and queue.is_paused:
+            add("error", f"{where} has {late} Late runs and the queue is paused")
+        elif late and not live_workers[pool]:
+            last_seen = max((w.last_heartbeat_time for w in workers if w.last_heartbeat_time), default=None)
+            add("error", f"{where} has {late} Late runs and 0 live workers"
+                         + (f" (last heartbeat {_ago(_age(now, last_seen))})" if workers else ""))
+        elif late and queue.concurrency_limit is not None and busy >= queue.concurrency_limit:
+            add("warning", f"{where} has {late} Late runs and is at its concurrency limit "
+                           f"({busy}/{queue.concurrency_limit} pending or running)")
+        elif late and work_pool.concurrency_limit is not None and pool_busy >= work_pool.concurrency_limit:
+            add("warning", f"{where} has {late} Late runs and {pool} is at its concurrency limit "
+                           f"({pool_busy}/{work_pool.concurrency_limit} pending or running)")
+        elif late and (polled is None or polled > LIVE_HEARTBEAT_SECONDS):
+            add("error", f"{where} has {late} Late runs and {live_workers[pool]} live workers, "
+                         f"but none polled this queue (last poll {_ago(polled)}); check the workers' --work-queue")
+        elif late:
+            add("warning", f"{where} has {late} Late runs with {live_workers[pool]} live workers; "
+                           f"they are being picked up slower than scheduled")
+        if row["crashed"]:
+            add("warning", f"{where} had {row['crashed']} crashed runs in the last {snapshot['hours']:g}h")
+
+    for pool in sorted(pools):
+        pool_deployments = sum(n for (name, _), n in deployments_per_queue.items() if name == pool)
+        if pool_deployments and not snapshot["workers"].get(pool):
+            add("warning", f"pool {pool} has {pool_deployments} deployments and no workers")
+
+    findings.sort(key=lambda finding: finding[0] != "error")
+    return rows, findings
+
+
+def print_report(rows: List[dict], findings: List[Tuple[str, str]], hours: float, elapsed: float):
+    print(f"🩺 Workspace health (read in {elapsed:.2f}s)")
+    print(f"{'POOL / QUEUE':<36} {'PAUSED':<7} {'LIMIT':<7} {'WORKERS':<8} {'LATE':>5} {'PEND':>5} {'RUN':>5}"
+          f"  LAST {hours:g}h OK/FAIL/CRASH")
+    for row in rows:
+        paused = "pool" if row["pool_paused"] else "queue" if row["queue_paused"] else "-"
+        limit = f"{row['queue_limit'] if row['queue_limit'] is not None else '-'}/" \
+                f"{row['pool_limit'] if row['pool_limit'] is not None else '-'}"
+        print(f"{row['pool'] + ' / ' + row['queue']:<36} {paused:<7} {limit:<7} "
+              f"{row['live_workers']}/{row['workers']:<6} {row['late']:>5} {row['pending']:>5} {row['running']:>5}"
+              f"  {row['completed']}/{row['failed']}/{row['crashed']}")
+    print()
+    if not findings:
+        print("✅ No problems found")
+    for level, message in findings:
+        print(f"{'❌' if level == 'error' else '⚠️ '} {message}")
+
+
+async def health(args) -> int:
+    from prefect import get_client
+
+    started = time.perf_counter()
+    async with get_client() as client:
+        snapshot = await read_snapshot(client, args.hours)
+    elapsed = time.perf_counter() - started
+    rows, findings = correlate(snapshot, args.pool)
+    if args.json:
+        print(json.dumps({"rows": rows, "findings": [{"level": l, "message": m} for l, m in findings]}, indent=2))
+    else:
+        print_report(rows, findings, args.hours, elapsed)
+    return 1 if any(level == "error" for level, _ in findings) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Health report across work pools, queues, workers and runs")
+    parser.add_argument("--pool", help="Only this work pool")
+    parser.add_argument("--hours", type=float, default=DEFAULT_WINDOW_HOURS, help="Window for finished runs")
+    parser.add_argument("--json", action="store_true", help="Print rows and findings as JSON")
+    raise SystemExit(asyncio.run(health(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
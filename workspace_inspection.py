@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Batched lookups shared by the check_*.py inspection scripts
+
+Instead of one request per deployment or per pool, related objects are read
+with id-set filters (a chunk of ids per request) and independent reads run
+concurrently with asyncio.gather.
+"""
+import asyncio
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from prefect_pagination import collect, iter_work_queues, iter_workers
+
+# Ids per filter request, which keeps request bodies and query plans small
+ID_CHUNK = 200
+
+
+def _chunks(ids: List, size: int = ID_CHUNK) -> List[List]:
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+async def read_flows_by_id(client, flow_ids: Iterable[UUID]) -> Dict[UUID, object]:
+    """{flow_id: flow} for every distinct id, in one request per ID_CHUNK ids"""
+    from prefect.client.schemas.filters import FlowFilter, FlowFilterId
+
+    ids = list(dict.fromkeys(flow_ids))
+    pages = await asyncio.gather(*(
+        client.read_flows(flow_filter=FlowFilter(id=FlowFilterId(any_=chunk)), limit=len(chunk))
+        for chunk in _chunks(ids)
+    ))
+    return {flow.id: flow for page in pages for flow in page}
+
+
+async def read_deployments_by_id(client, deployment_ids: Iterable[UUID]) -> Dict[UUID, object]:
+    """{deployment_id: deployment} for every distinct id, in one request per ID_CHUNK ids"""
+    from prefect.client.schemas.filters import DeploymentFilter, DeploymentFilterId
+
+    ids = list(dict.fromkeys(deployment_ids))
+    pages = await asyncio.gather(*(
+        client.read_deployments(deployment_filter=DeploymentFilter(id=DeploymentFilterId(any_=chunk)), limit=len(chunk))
+        for chunk in _chunks(ids)
+    ))
+    return {deployment.id: deployment for page in pages for deployment in page}
+
+
+async def read_workers_by_pool(client, pool_names: Iterable[str]) -> Dict[str, list]:
+    """{pool_name: workers}, reading every pool concurrently"""
+    names = list(dict.fromkeys(pool_names))
+    workers = await asyncio.gather(*(collect(iter_workers(client, name)) for name in names))
+    return dict(zip(names, workers))
+
+
+async def read_queues_by_pool(client, pool_names: Iterable[str]) -> Dict[str, list]:
+    """{pool_name: work queues}, reading every pool concurrently"""
+    names = list(dict.fromkeys(pool_names))
+    queues = await asyncio.gather(*(collect(iter_work_queues(client, name)) for name in names))
+    return dict(zip(names, queues))